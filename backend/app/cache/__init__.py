@@ -0,0 +1,113 @@
+import threading
+from typing import Any, Dict, Optional
+from ..config import settings
+from .base import CacheBackend, NullCache
+from .lru import LRUCache
+from .pages import GenerationCounters, page_key
+from .bus import (
+    InvalidationBus, PostgresInvalidationBus, note_key, category_key, related_snapshot_key, parse_key,
+    NOTE_NAMESPACE, CATEGORY_NAMESPACE, WILDCARD
+)
+
+_caches: Dict[str, CacheBackend] = {}
+_bus: Optional[InvalidationBus] = None
+_lock = threading.Lock()
+
+# Generation counters versioning the result page cache, one per table
+generations = GenerationCounters()
+NOTES_TABLE = "notes"
+CATEGORIES_TABLE = "categories"
+
+# Key of the cached full category list; single categories are keyed by id
+ALL_CATEGORIES_KEY = "all"
+
+
+def _build_cache(name: str) -> CacheBackend:
+    if settings.cache_backend == "none":
+        return NullCache()
+    if name == "pages":
+        return LRUCache(
+            max_entries=settings.page_cache_max_entries,
+            max_bytes=settings.page_cache_max_bytes,
+            ttl_seconds=settings.cache_ttl_seconds
+        )
+    return LRUCache(
+        max_entries=settings.cache_max_entries,
+        max_bytes=settings.cache_max_bytes,
+        ttl_seconds=settings.cache_ttl_seconds
+    )
+
+
+def get_cache(name: str) -> CacheBackend:
+    """Get the process-wide cache registered under name, creating it from settings"""
+    with _lock:
+        if name not in _caches:
+            _caches[name] = _build_cache(name)
+        return _caches[name]
+
+
+def register_cache(name: str, cache: CacheBackend) -> None:
+    """Plug in a different backend for a named cache (e.g. NullCache in tests)"""
+    with _lock:
+        _caches[name] = cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def _evict(key: str) -> None:
+    """Apply an invalidation key to the entity caches"""
+    namespace, ident = parse_key(key)
+    if namespace == NOTE_NAMESPACE:
+        generations.bump(NOTES_TABLE)
+        notes = get_cache("notes")
+        if ident == WILDCARD:
+            notes.clear()
+        else:
+            notes.delete(int(ident))
+    elif namespace == CATEGORY_NAMESPACE:
+        generations.bump(CATEGORIES_TABLE)
+        categories = get_cache("categories")
+        if ident == WILDCARD:
+            categories.clear()
+        else:
+            categories.delete(int(ident))
+            categories.delete(ALL_CATEGORIES_KEY)
+        # Cached notes embed their categories; drop only the notes carrying this one
+        notes = get_cache("notes")
+        if ident == WILDCARD:
+            notes.clear()
+        else:
+            category_id = int(ident)
+            notes.delete_where(lambda _, note: any(category.id == category_id for category in note.categories))
+
+
+def _build_bus() -> InvalidationBus:
+    from ..database import engine
+
+    transport = settings.cache_bus
+    if transport == "auto":
+        transport = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if transport == "postgres":
+        return PostgresInvalidationBus(engine)
+    return InvalidationBus()
+
+
+def get_bus() -> InvalidationBus:
+    """Get the process-wide invalidation bus, subscribed to the entity caches"""
+    global _bus
+    with _lock:
+        if _bus is None:
+            _bus = _build_bus()
+            _bus.subscribe(_evict)
+        return _bus
+
+
+__all__ = [
+    "CacheBackend", "NullCache", "LRUCache", "get_cache", "register_cache", "cache_stats",
+    "InvalidationBus", "PostgresInvalidationBus", "get_bus",
+    "note_key", "category_key", "related_snapshot_key", "ALL_CATEGORIES_KEY",
+    "GenerationCounters", "generations", "page_key", "NOTES_TABLE", "CATEGORIES_TABLE"
+]
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CacheBackend(ABC):
+    """Interface for the read-through caches sitting between services and repositories"""
+    
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None on a miss"""
+    
+    @abstractmethod
+    def version(self, key: Hashable) -> Optional[Hashable]:
+        """
+        Token that changes whenever key is invalidated. Take it before reading
+        the value from the database and pass it to set, so a read that raced
+        with an invalidation does not put its stale result back.
+        """
+    
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, version: Optional[Hashable] = None) -> None:
+        """Store a value, unless version was given and key has been invalidated since"""
+    
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Drop a single key"""
+    
+    @abstractmethod
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """Drop the keys whose (key, value) match predicate"""
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every key"""
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Counters reported on the metrics endpoint"""
+
+
+class NullCache(CacheBackend):
+    """Cache that never stores anything, used when caching is disabled"""
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        return None
+    
+    def version(self, key: Hashable) -> Optional[Hashable]:
+        return None
+    
+    def set(self, key: Hashable, value: Any, version: Optional[Hashable] = None) -> None:
+        pass
+    
+    def delete(self, key: Hashable) -> None:
+        pass
+    
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        pass
+    
+    def clear(self) -> None:
+        pass
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "none"}
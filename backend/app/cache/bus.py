@@ -0,0 +1,119 @@
+import json
+import logging
+import threading
+import uuid
+from typing import Callable, Iterable, List
+from sqlalchemy.engine import Engine
+from ..utils.pg_notify import PgNotifyListener, pg_notify
+
+logger = logging.getLogger(__name__)
+
+# Keys are "<namespace>:<id>" or "<namespace>:*" for the whole namespace
+NOTE_NAMESPACE = "note"
+CATEGORY_NAMESPACE = "category"
+# Announces a new related-notes snapshot file; the index restores it on next use
+RELATED_NAMESPACE = "related"
+WILDCARD = "*"
+
+
+def note_key(note_id) -> str:
+    return f"{NOTE_NAMESPACE}:{note_id}"
+
+
+def category_key(category_id) -> str:
+    return f"{CATEGORY_NAMESPACE}:{category_id}"
+
+
+def related_snapshot_key() -> str:
+    return f"{RELATED_NAMESPACE}:{WILDCARD}"
+
+
+def parse_key(key: str) -> tuple[str, str]:
+    namespace, _, ident = key.partition(":")
+    return namespace, ident
+
+
+class InvalidationBus:
+    """
+    In-memory invalidation bus: publishing delivers keys to the subscribers of
+    this process only. Used for tests and single-process deployments.
+    """
+
+    def __init__(self):
+        self._handlers: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Callable[[str], None]) -> None:
+        with self._lock:
+            self._handlers.append(handler)
+
+    def publish(self, *keys: str) -> None:
+        self._deliver(keys)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def _deliver(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            handlers = list(self._handlers)
+        for key in keys:
+            for handler in handlers:
+                try:
+                    handler(key)
+                except Exception:
+                    logger.exception("Invalidation handler failed for %s", key)
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """
+    Invalidation bus fanning keys out to every worker through LISTEN/NOTIFY.
+    Local subscribers are served synchronously; other workers evict from
+    their background listener. Messages from this process are skipped on receipt.
+    """
+
+    channel = "notes_cache_invalidation"
+    # Stay well below the 8000 byte NOTIFY payload limit
+    max_keys_per_message = 200
+
+    def __init__(self, engine: Engine):
+        super().__init__()
+        self.engine = engine
+        self.origin = uuid.uuid4().hex
+        self._listener = PgNotifyListener(
+            engine,
+            self.channel,
+            self._on_message,
+            on_connect=self._on_connect
+        )
+
+    def publish(self, *keys: str) -> None:
+        self._deliver(keys)
+        for start in range(0, len(keys), self.max_keys_per_message):
+            payload = json.dumps({
+                "origin": self.origin,
+                "keys": list(keys[start:start + self.max_keys_per_message])
+            })
+            try:
+                pg_notify(self.engine, self.channel, payload)
+            except Exception:
+                # Remote caches fall back to their TTL if the notification is lost
+                logger.exception("Failed to publish invalidation for %s", keys)
+
+    def start(self) -> None:
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._listener.stop()
+
+    def _on_message(self, payload: str) -> None:
+        message = json.loads(payload)
+        if message.get("origin") == self.origin:
+            return
+        self._deliver(message.get("keys", []))
+
+    def _on_connect(self) -> None:
+        # Anything published while we were not listening is lost; start clean
+        self._deliver([f"{NOTE_NAMESPACE}:{WILDCARD}", f"{CATEGORY_NAMESPACE}:{WILDCARD}"])
@@ -0,0 +1,129 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from pydantic import BaseModel
+from .base import CacheBackend
+
+# Invalidation counters are kept per hash stripe rather than per key, so they take
+# fixed memory; keys sharing a stripe only make a racing fill skip its set
+VERSION_STRIPES = 1024
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache(CacheBackend):
+    """
+    Thread-safe LRU cache bounded by entry count and estimated bytes,
+    with a per-entry time to live. Versions are (generation, stripe counter):
+    delete bumps the key's stripe, clear and delete_where bump the generation.
+    """
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stripes = [0] * VERSION_STRIPES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_sets = 0
+    
+    def version(self, key: Hashable) -> Optional[Hashable]:
+        with self._lock:
+            return self._version(key)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, version: Optional[Hashable] = None) -> None:
+        size = estimate_size(value)
+        # A single value larger than the whole budget is never worth caching
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if version is not None and version != self._version(key):
+                self.stale_sets += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._stripes[hash(key) % VERSION_STRIPES] += 1
+            if key in self._entries:
+                self._remove(key)
+    
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        with self._lock:
+            # Fills in flight may be for matching keys that are not cached yet
+            self._generation += 1
+            for key in [key for key, (value, _, _) in self._entries.items() if predicate(key, value)]:
+                self._remove(key)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_sets": self.stale_sets,
+            }
+    
+    def _version(self, key: Hashable) -> Hashable:
+        return self._generation, self._stripes[hash(key) % VERSION_STRIPES]
+    
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
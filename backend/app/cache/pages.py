@@ -0,0 +1,46 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Tuple
+
+
+class GenerationCounters:
+    """
+    Per-table generation numbers. Every write bumps the table's generation,
+    which makes all result pages keyed on the previous generation unreachable;
+    the LRU then ages them out, so no per-key bookkeeping is needed.
+    """
+    
+    def __init__(self):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def get(self, *tables: str) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._counters[table] for table in tables)
+    
+    def bump(self, table: str) -> None:
+        with self._lock:
+            self._counters[table] += 1
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+def _normalize(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(set(value)))
+    return value
+
+
+def page_key(kind: str, generation: Tuple[int, ...], **params: Any) -> Hashable:
+    """
+    Cache key for a result page: filters are normalized so equivalent requests
+    (category id order, duplicates) share an entry
+    """
+    normalized = tuple(
+        (name, _normalize(value))
+        for name, value in sorted(params.items())
+        if value is not None and value != []
+    )
+    return kind, generation, normalized
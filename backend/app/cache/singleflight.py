@@ -0,0 +1,94 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+from fastapi import Request
+from ..config import settings
+from ..utils.http_cache import request_scope
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+    The first caller runs the function; callers arriving while it is in flight
+    wait up to timeout seconds for its result (or exception) instead of running
+    their own. A follower that times out runs the function itself, so a slow
+    leader can delay but never block a request indefinitely.
+    """
+    
+    def __init__(self, timeout: float = 5.0, enabled: bool = True):
+        self.timeout = timeout
+        self.enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+        self.timeouts = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        if not self.enabled:
+            return fn()
+        
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+        
+        if not leader:
+            if call.done.wait(self.timeout):
+                with self._lock:
+                    self.shared += 1
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            with self._lock:
+                self.timeouts += 1
+                self.executions += 1
+            return fn()
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+            }
+
+
+# Shared by the GET routes that opt in through coalesce()
+request_flight = SingleFlight(
+    timeout=settings.single_flight_timeout_seconds,
+    enabled=settings.single_flight_enabled
+)
+
+
+def coalesce(request: Request, fn: Callable[[], T]) -> T:
+    """
+    Run an idempotent read once for all identical concurrent requests,
+    keyed by path and normalized query string.
+    fn must return data that does not depend on the caller's session.
+    """
+    return request_flight.do(request_scope(request), fn)
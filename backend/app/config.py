@@ -15,6 +15,73 @@ class Settings(BaseSettings):
     # CORS
     allowed_origins: list[str] = ["http://localhost:8501", "http://localhost:3000"]
     
+    # Cache ("memory" or "none")
+    cache_backend: str = "memory"
+    cache_max_entries: int = 10000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_ttl_seconds: float = 300
+    # Result page cache for list and search endpoints, budgeted separately
+    page_cache_max_entries: int = 2000
+    page_cache_max_bytes: int = 32 * 1024 * 1024
+    # Invalidation transport: "auto" (postgres when the database is PostgreSQL), "postgres" or "memory"
+    cache_bus: str = "auto"
+    
+    # Request coalescing for idempotent GET routes
+    single_flight_enabled: bool = True
+    single_flight_timeout_seconds: float = 5.0
+    
+    # Search
+    search_stream_max_results: int = 10000
+    search_stream_batch_size: int = 500
+    # Minimum trigram word similarity for fuzzy search (pg_trgm default is 0.6; 0.3 is friendlier to typos)
+    fuzzy_search_threshold: float = 0.3
+    # Substring search without pg_trgm narrows rows with the in-process trigram index,
+    # unless the term's trigrams leave more candidates than this (then a scan is as cheap)
+    substring_candidate_limit: int = 10000
+    # Related notes: optional snapshot written by `python -m app.tools.rebuild_related`,
+    # and how many edited notes to collect before re-weighting the whole TF-IDF matrix
+    related_index_path: Optional[str] = None
+    related_index_delta_limit: int = 1000
+    # Rows fetched per server-side cursor round trip by /export
+    export_batch_size: int = 1000
+    # Bulk import: notes per insert and commit, longest accepted line (or multi-line CSV record),
+    # issues listed in the report
+    import_batch_size: int = 1000
+    import_max_line_bytes: int = 1024 * 1024
+    import_max_issues: int = 100
+    # Imports of up to this many notes invalidate them one by one; larger ones rebuild everything note-derived
+    import_max_note_keys: int = 100
+    # Near-duplicate detection: estimated Jaccard similarity of word shingles, and
+    # MinHash/LSH shape (bands must divide permutations; more bands catch looser matches)
+    duplicate_threshold: float = 0.8
+    minhash_permutations: int = 128
+    minhash_bands: int = 32
+    
+    # POST /batch: calls per batch, and how many run at once when concurrent
+    batch_max_requests: int = 50
+    batch_max_concurrency: int = 8
+    
+    # Change events (/events): transport ("auto", "postgres" or "memory"), events buffered per
+    # client before it is dropped, events kept for Last-Event-ID resumption, idle heartbeat interval
+    events_backend: str = "auto"
+    events_queue_size: int = 256
+    events_replay_size: int = 1000
+    events_heartbeat_seconds: float = 15.0
+    
+    # GET /sync: change-log entries per call by default and at most
+    sync_page_size: int = 500
+    sync_max_page_size: int = 5000
+    
+    # Background jobs (/jobs, python -m app.tools.job_worker): notes per chunk, runs before a job fails,
+    # first retry delay (doubling), idle poll interval, heartbeat age after which a job is taken
+    # over, and worker threads inside the API process (for setups without a worker process)
+    jobs_chunk_size: int = 500
+    jobs_max_attempts: int = 3
+    jobs_retry_backoff_seconds: float = 10.0
+    jobs_poll_seconds: float = 1.0
+    jobs_lock_timeout_seconds: float = 300.0
+    jobs_embedded_workers: int = 0
+    
     # Environment
     environment: str = "development"
     debug: bool = True
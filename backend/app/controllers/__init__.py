@@ -1,4 +1,13 @@
 from .note_controller import router as note_router
 from .category_controller import router as category_router
+from .export_controller import router as export_router
+from .import_controller import router as import_router
+from .batch_controller import router as batch_router
+from .events_controller import router as events_router
+from .sync_controller import router as sync_router
+from .job_controller import router as job_router
 
-__all__ = ["note_router", "category_router"]
\ No newline at end of file
+__all__ = [
+    "note_router", "category_router", "export_router", "import_router", "batch_router", "events_router",
+    "sync_router", "job_router"
+]
\ No newline at end of file
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+from typing import List, Optional
+from urllib.parse import quote, urlencode
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal, SHARED_SESSION_SCOPE_KEY
+from ..schemas.batch import BatchItem, BatchRequest, BatchItemResponse, BatchResponse
+from ..utils.exceptions import ValidationError, to_http_exception
+from .events_controller import router as events_router
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Endless streams cannot be collected into a batch response
+UNBATCHABLE_PREFIXES = (router.prefix, events_router.prefix)
+
+# Connection details every sub-request inherits from the batch request
+INHERITED_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "state")
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(request: Request, batch: BatchRequest):
+    """
+    Make several API calls in one round trip. Each call goes through the
+    full application (validation, caching, conditional requests) as if it
+    had been sent on its own, and gets its own status code; a failing call
+    does not fail the batch. Calls run in order on one shared session, or,
+    with concurrent, in parallel with a session each (a session cannot be
+    used from several threads at once).
+    """
+    if len(batch.requests) > settings.batch_max_requests:
+        raise to_http_exception(ValidationError(f"A batch is limited to {settings.batch_max_requests} requests"))
+    for item in batch.requests:
+        for prefix in UNBATCHABLE_PREFIXES:
+            if item.path == prefix or item.path.startswith(f"{prefix}/"):
+                raise to_http_exception(ValidationError(f"{prefix} cannot be called from a batch"))
+    api_root = request.url.path[:-len(router.prefix)]
+
+    if batch.concurrent:
+        slots = asyncio.Semaphore(settings.batch_max_concurrency)
+
+        async def run(item: BatchItem) -> BatchItemResponse:
+            async with slots:
+                return await _dispatch(request, api_root, item)
+
+        responses = await asyncio.gather(*(run(item) for item in batch.requests))
+        return BatchResponse(responses=responses)
+
+    db = SessionLocal()
+    try:
+        responses: List[BatchItemResponse] = []
+        for item in batch.requests:
+            responses.append(await _dispatch(request, api_root, item, db))
+        return BatchResponse(responses=responses)
+    finally:
+        await run_in_threadpool(db.close)
+
+
+def _query_string(item: BatchItem) -> bytes:
+    def encode(value):
+        return str(value).lower() if isinstance(value, bool) else value
+
+    query = {key: [encode(v) for v in value] if isinstance(value, list) else encode(value) for key, value in item.query.items()}
+    return urlencode(query, doseq=True).encode("latin-1")
+
+
+async def _dispatch(request: Request, api_root: str, item: BatchItem, db: Optional[Session] = None) -> BatchItemResponse:
+    """Run one call through the ASGI app in-process and collect its response"""
+    path = api_root + item.path
+    body = b"" if item.body is None else json.dumps(item.body).encode("utf-8")
+    headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in item.headers.items()]
+    if item.body is not None:
+        headers.append((b"content-type", b"application/json"))
+    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+    scope = {key: request.scope[key] for key in INHERITED_SCOPE_KEYS if key in request.scope}
+    scope.update({
+        "method": item.method,
+        "path": path,
+        "raw_path": quote(path).encode("latin-1"),
+        "query_string": _query_string(item),
+        "headers": headers
+    })
+    if db is not None:
+        scope[SHARED_SESSION_SCOPE_KEY] = db
+
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive() -> dict:
+        if pending:
+            return pending.pop()
+        # The caller never disconnects; streaming responses cancel this wait when they finish
+        await asyncio.Event().wait()
+
+    status = 500
+    response_headers = {}
+    chunks = []
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode("latin-1")
+                if name != "content-length":
+                    response_headers[name] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The error middleware has already sent a 500; keep it to this call
+        logger.exception("Batch call %s %s failed", item.method, item.path)
+        if db is not None:
+            await run_in_threadpool(db.rollback)
+
+    content = b"".join(chunks)
+    if not content:
+        return BatchItemResponse(status=status, headers=response_headers)
+    if "json" in response_headers.get("content-type", ""):
+        return BatchItemResponse(status=status, headers=response_headers, body=json.loads(content))
+    return BatchItemResponse(status=status, headers=response_headers, body=content.decode("utf-8", errors="replace"))
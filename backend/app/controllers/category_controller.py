@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from ..database import get_db
 from ..services.category_service import CategoryService
 from ..schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithNotesCount
+from ..schemas.suggestion import Suggestion
 from ..utils.exceptions import NotesAppException, to_http_exception
+from ..utils.http_cache import is_not_modified, not_modified_response, request_scope, set_cache_headers
+from ..cache.singleflight import coalesce
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
@@ -23,47 +26,85 @@ def create_category(
 
 
 @router.get("/", response_model=List[CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     try:
         service = CategoryService(db)
-        categories = service.get_all_categories()
+        etag, last_modified = service.get_categories_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        categories = coalesce(request, service.get_all_categories)
+        set_cache_headers(response, etag, last_modified)
         return categories
     except NotesAppException as e:
         raise to_http_exception(e)
 
 
 @router.get("/with-count", response_model=List[CategoryWithNotesCount])
-def get_categories_with_count(db: Session = Depends(get_db)):
+def get_categories_with_count(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     try:
         service = CategoryService(db)
-        categories_data = service.get_categories_with_count()
+        etag, last_modified = service.get_categories_etag(*request_scope(request), include_notes=True)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        def load_with_count() -> List[CategoryWithNotesCount]:
+            result = []
+            for item in service.get_categories_with_count():
+                category = item["category"]
+                count = item["notes_count"]
+                result.append(CategoryWithNotesCount(
+                    id=category.id,
+                    name=category.name,
+                    color=category.color,
+                    created_at=category.created_at,
+                    updated_at=category.updated_at,
+                    notes_count=count
+                ))
+            return result
         
-        result = []
-        for item in categories_data:
-            category = item["category"]
-            count = item["notes_count"]
-            result.append(CategoryWithNotesCount(
-                id=category.id,
-                name=category.name,
-                color=category.color,
-                created_at=category.created_at,
-                updated_at=category.updated_at,
-                notes_count=count
-            ))
+        # Built into response models inside the flight so followers never touch our session
+        result = coalesce(request, load_with_count)
         
+        set_cache_headers(response, etag, last_modified)
         return result
     except NotesAppException as e:
         raise to_http_exception(e)
 
 
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest_categories(
+    prefix: str = Query(..., min_length=1, description="Name prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum suggestions"),
+    db: Session = Depends(get_db)
+):
+    service = CategoryService(db)
+    return service.suggest_categories(prefix, limit)
+
+
 @router.get("/{category_id}", response_model=CategoryResponse)
 def get_category(
     category_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     try:
         service = CategoryService(db)
+        etag, last_modified = service.get_category_etag(category_id)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
         category = service.get_category(category_id)
+        set_cache_headers(response, etag, last_modified)
         return category
     except NotesAppException as e:
         raise to_http_exception(e)
@@ -98,11 +139,20 @@ def delete_category(
 @router.get("/search/{search_term}", response_model=List[CategoryResponse])
 def search_categories(
     search_term: str,
+    request: Request,
+    response: Response,
+    mode: Literal["substring", "fuzzy"] = Query("substring", description="Substring match or typo-tolerant trigram match"),
+    threshold: Optional[float] = Query(None, gt=0, le=1, description="Minimum similarity for fuzzy mode"),
     db: Session = Depends(get_db)
 ):
     try:
         service = CategoryService(db)
-        categories = service.search_categories(search_term)
+        etag, last_modified = service.get_categories_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        categories = coalesce(request, lambda: service.search_categories(search_term, mode, threshold))
+        set_cache_headers(response, etag, last_modified)
         return categories
     except NotesAppException as e:
         raise to_http_exception(e)
\ No newline at end of file
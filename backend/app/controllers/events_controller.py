@@ -0,0 +1,66 @@
+import asyncio
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from ..config import settings
+from ..events import get_broker
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Reconnect delay EventSource clients are told to use, in milliseconds
+RETRY_MS = 3000
+
+
+def _message(event: str, data: str, id: Optional[str] = None) -> str:
+    lines = [f"id: {id}"] if id else []
+    lines += [f"event: {event}", f"data: {data}"]
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("")
+async def stream_events(
+    kinds: Optional[List[Literal["note", "category"]]] = Query(None, description="Only these kinds of change"),
+    last_event_id: Optional[str] = Header(None, description="Resume after this event; sent by EventSource on reconnect")
+):
+    """
+    Server-Sent Events stream of committed note and category changes
+    ("change" events carrying a ChangeEvent). Clients that cannot be resumed
+    get a "reset" event and should refetch; clients that fall too far behind
+    get "dropped" and the stream ends. Idle streams carry heartbeat comments.
+    """
+    broker = get_broker()
+    subscriber = broker.subscribe(last_event_id)
+    
+    def wanted(kind: str) -> bool:
+        return not kinds or kind in kinds
+    
+    async def generate():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if subscriber.backlog is None:
+                yield _message("reset", "{}")
+            for id, kind, payload in subscriber.backlog or []:
+                if wanted(kind):
+                    yield _message("change", payload, id)
+            
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), settings.events_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if item is None:
+                    yield _message("dropped", "{}")
+                    return
+                id, kind, payload = item
+                if wanted(kind):
+                    yield _message("change", payload, id)
+        finally:
+            broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
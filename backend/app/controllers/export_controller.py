@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from ..database import SessionLocal
+from ..services.export_service import ExportService
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+
+@router.get("")
+def export_notes(
+    export_format: Literal["ndjson", "csv", "arrow", "parquet"] = Query("ndjson", alias="format", description="Output format; arrow and parquet are typed columnar files for analytics"),
+    archived: Optional[bool] = Query(None, description="Only archived (true) or active (false) notes; all when omitted"),
+    note_type: Optional[Literal["note", "todo"]] = Query(None, description="Filter by note type"),
+    category_ids: Optional[List[int]] = Query(None, description="Filter by category IDs")
+):
+    """Stream every matching note, with its categories inline"""
+    def generate():
+        # The stream outlives the request scope, so it owns its session
+        db = SessionLocal()
+        try:
+            service = ExportService(db)
+            export = getattr(service, f"export_{export_format}")
+            yield from export(archived=archived, note_type=note_type, category_ids=category_ids)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="notes.{export_format}"'}
+    )
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from ..config import settings
+from ..database import get_db
+from ..services.import_service import ImportService, iter_lines, iter_ndjson_records, iter_csv_records
+from ..schemas.bulk import ImportSummary
+from ..utils.exceptions import NotesAppException, to_http_exception
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+
+@router.post("", response_model=ImportSummary)
+async def import_notes(
+    request: Request,
+    import_format: Optional[Literal["ndjson", "csv"]] = Query(None, alias="format", description="Body format; defaults from Content-Type"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Notes per insert and commit (default IMPORT_BATCH_SIZE)"),
+    dedupe: Optional[Literal["warn", "reject"]] = Query(None, description="Check each note for near-duplicates: warn reports them, reject skips them"),
+    db: Session = Depends(get_db)
+):
+    """
+    Import notes from a streamed NDJSON or CSV body (the formats /export writes).
+    The body is parsed as it arrives and written batch by batch; the next chunk
+    is not read until the current batch is committed, so memory stays bounded
+    and a fast client is slowed to the database's pace.
+    """
+    if import_format is None:
+        import_format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    batch_size = batch_size or settings.import_batch_size
+    
+    service = ImportService(db, dedupe=dedupe)
+    lines = iter_lines(request.stream(), settings.import_max_line_bytes)
+    records = iter_csv_records(lines, settings.import_max_line_bytes) if import_format == "csv" else iter_ndjson_records(lines)
+    
+    batch = []
+    try:
+        async for line, record, error in records:
+            if error:
+                service.reject(line, error)
+                continue
+            batch.append((line, record))
+            if len(batch) >= batch_size:
+                await run_in_threadpool(service.import_batch, batch)
+                batch = []
+        if batch:
+            await run_in_threadpool(service.import_batch, batch)
+    except NotesAppException as e:
+        raise to_http_exception(e)
+    finally:
+        summary = await run_in_threadpool(service.finish)
+    return summary
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_db
+from ..services.job_service import JobService
+from ..schemas.job import JobCreate, JobResponse, JobStatus
+from ..utils.exceptions import NotesAppException, to_http_exception
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+def create_job(
+    job_data: JobCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a long-running operation for the job workers. Poll
+    GET /jobs/{id} for its status and progress.
+    """
+    try:
+        service = JobService(db)
+        return service.create_job(job_data)
+    except NotesAppException as e:
+        raise to_http_exception(e)
+
+
+@router.get("", response_model=List[JobResponse])
+def list_jobs(
+    status: Optional[JobStatus] = Query(None, description="Filter by status"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum jobs, most recent first"),
+    db: Session = Depends(get_db)
+):
+    service = JobService(db)
+    return service.list_jobs(status.value if status else None, limit)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+):
+    try:
+        service = JobService(db)
+        return service.get_job(job_id)
+    except NotesAppException as e:
+        raise to_http_exception(e)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+):
+    try:
+        service = JobService(db)
+        return service.cancel_job(job_id)
+    except NotesAppException as e:
+        raise to_http_exception(e)
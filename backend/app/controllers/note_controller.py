@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..database import get_db
+from typing import List, Literal, Optional
+from ..database import get_db, SessionLocal
 from ..services.note_service import NoteService
-from ..schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteListResponse
+from ..schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteListResponse, RelatedNote, DuplicateNote
+from ..schemas.suggestion import Suggestion
 from ..utils.exceptions import NotesAppException, to_http_exception
+from ..utils.http_cache import is_not_modified, not_modified_response, request_scope, set_cache_headers
+from ..cache.singleflight import coalesce
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
+# IDs of near-duplicate notes found by POST /notes/?dedupe=warn
+DUPLICATES_HEADER = "X-Possible-Duplicates"
+
 
 @router.post("/", response_model=NoteResponse, status_code=201)
 def create_note(
     note_data: NoteCreate,
+    response: Response,
+    dedupe: Optional[Literal["warn", "reject"]] = Query(None, description="Check for near-duplicate notes: warn lists them in X-Possible-Duplicates, reject returns 409"),
     db: Session = Depends(get_db)
 ):
     try:
         service = NoteService(db)
-        note = service.create_note(note_data)
+        duplicates, signature = [], None
+        if dedupe:
+            duplicates, signature = service.check_duplicates(note_data.title, note_data.content, reject=dedupe == "reject")
+        note = service.create_note(note_data, signature)
+        if duplicates:
+            response.headers[DUPLICATES_HEADER] = ",".join(str(id) for id in duplicates)
         return note
     except NotesAppException as e:
         raise to_http_exception(e)
@@ -24,18 +38,27 @@ def create_note(
 
 @router.get("/active", response_model=NoteListResponse)
 def get_active_notes(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
     category_ids: Optional[List[int]] = Query(None, description="Filter by category IDs"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; continues by keyset and ignores page"),
     db: Session = Depends(get_db)
 ):
     try:
         service = NoteService(db)
-        result = service.get_active_notes(
+        etag, last_modified = service.get_notes_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        result = coalesce(request, lambda: service.get_active_notes(
             page=page,
             page_size=page_size,
-            category_ids=category_ids
-        )
+            category_ids=category_ids,
+            cursor=cursor
+        ))
+        set_cache_headers(response, etag, last_modified)
         return result
     except NotesAppException as e:
         raise to_http_exception(e)
@@ -43,36 +66,150 @@ def get_active_notes(
 
 @router.get("/archived", response_model=NoteListResponse)
 def get_archived_notes(
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    category_ids: Optional[List[int]] = Query(None, description="Filter by category IDs"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; continues by keyset and ignores page"),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = NoteService(db)
+        etag, last_modified = service.get_notes_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        result = coalesce(request, lambda: service.get_archived_notes(
+            page=page,
+            page_size=page_size,
+            category_ids=category_ids,
+            cursor=cursor
+        ))
+        set_cache_headers(response, etag, last_modified)
+        return result
+    except NotesAppException as e:
+        raise to_http_exception(e)
+
+
+@router.get("/todos", response_model=NoteListResponse)
+def get_todos(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    status: Optional[str] = Query(None, description="Filter by todo status"),
+    priority: Optional[str] = Query(None, description="Filter by priority"),
     category_ids: Optional[List[int]] = Query(None, description="Filter by category IDs"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; continues by keyset and ignores page"),
     db: Session = Depends(get_db)
 ):
     try:
         service = NoteService(db)
-        result = service.get_archived_notes(
+        etag, last_modified = service.get_notes_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        result = coalesce(request, lambda: service.get_todos(
             page=page,
             page_size=page_size,
-            category_ids=category_ids
-        )
+            status=status,
+            priority=priority,
+            category_ids=category_ids,
+            cursor=cursor
+        ))
+        set_cache_headers(response, etag, last_modified)
         return result
     except NotesAppException as e:
         raise to_http_exception(e)
 
 
+@router.get("/query", response_model=NoteListResponse)
+def query_notes(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, description='Structured query, e.g. title:"release" status:open priority:high due<2026-11-01 cat:work -cat:personal'),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = NoteService(db)
+        etag, last_modified = service.get_notes_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        result = coalesce(request, lambda: service.query_notes(q, page=page, page_size=page_size))
+        set_cache_headers(response, etag, last_modified)
+        return result
+    except NotesAppException as e:
+        raise to_http_exception(e)
+
+
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest_notes(
+    prefix: str = Query(..., min_length=1, description="Title prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum suggestions"),
+    db: Session = Depends(get_db)
+):
+    service = NoteService(db)
+    return service.suggest_notes(prefix, limit)
+
+
 @router.get("/{note_id}", response_model=NoteResponse)
 def get_note(
     note_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     try:
         service = NoteService(db)
+        etag, last_modified = service.get_note_etag(note_id)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
         note = service.get_note(note_id)
+        set_cache_headers(response, etag, last_modified)
         return note
     except NotesAppException as e:
         raise to_http_exception(e)
 
 
+@router.get("/{note_id}/related", response_model=List[RelatedNote])
+def get_related_notes(
+    note_id: int,
+    request: Request,
+    response: Response,
+    k: int = Query(10, ge=1, le=100, description="Number of related notes"),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = NoteService(db)
+        etag, last_modified = service.get_notes_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        result = coalesce(request, lambda: service.get_related_notes(note_id, k))
+        set_cache_headers(response, etag, last_modified)
+        return result
+    except NotesAppException as e:
+        raise to_http_exception(e)
+
+
+@router.get("/{note_id}/duplicates", response_model=List[DuplicateNote])
+def get_duplicate_notes(
+    note_id: int,
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0, description="Minimum estimated similarity (default DUPLICATE_THRESHOLD)"),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = NoteService(db)
+        return service.get_duplicate_notes(note_id, threshold)
+    except NotesAppException as e:
+        raise to_http_exception(e)
+
+
 @router.put("/{note_id}", response_model=NoteResponse)
 def update_note(
     note_id: int,
@@ -125,29 +262,6 @@ def unarchive_note(
         raise to_http_exception(e)
 
 
-@router.get("/todos", response_model=NoteListResponse)
-def get_todos(
-    page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    status: Optional[str] = Query(None, description="Filter by todo status"),
-    priority: Optional[str] = Query(None, description="Filter by priority"),
-    category_ids: Optional[List[int]] = Query(None, description="Filter by category IDs"),
-    db: Session = Depends(get_db)
-):
-    try:
-        service = NoteService(db)
-        result = service.get_todos(
-            page=page,
-            page_size=page_size,
-            status=status,
-            priority=priority,
-            category_ids=category_ids
-        )
-        return result
-    except NotesAppException as e:
-        raise to_http_exception(e)
-
-
 @router.patch("/{note_id}/status", response_model=NoteResponse)
 def update_todo_status(
     note_id: int,
@@ -162,20 +276,60 @@ def update_todo_status(
         raise to_http_exception(e)
 
 
-@router.get("/search/{search_term}", response_model=List[NoteResponse])
+@router.get("/search/{search_term}", response_model=NoteListResponse)
 def search_notes(
     search_term: str,
+    request: Request,
+    response: Response,
     include_archived: bool = Query(False, description="Include archived notes in search"),
     category_ids: Optional[List[int]] = Query(None, description="Filter by category IDs"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    mode: Literal["substring", "fuzzy"] = Query("substring", description="Substring match or typo-tolerant trigram match"),
+    threshold: Optional[float] = Query(None, gt=0, le=1, description="Minimum similarity for fuzzy mode"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; continues by keyset and ignores page"),
     db: Session = Depends(get_db)
 ):
     try:
         service = NoteService(db)
-        notes = service.search_notes(
+        etag, last_modified = service.get_notes_etag(*request_scope(request))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        result = coalesce(request, lambda: service.search_notes(
             search_term=search_term,
             include_archived=include_archived,
-            category_ids=category_ids
-        )
-        return notes
+            category_ids=category_ids,
+            page=page,
+            page_size=page_size,
+            mode=mode,
+            threshold=threshold,
+            cursor=cursor
+        ))
+        set_cache_headers(response, etag, last_modified)
+        return result
     except NotesAppException as e:
-        raise to_http_exception(e)
\ No newline at end of file
+        raise to_http_exception(e)
+
+
+@router.get("/search/{search_term}/stream")
+def stream_search_notes(
+    search_term: str,
+    include_archived: bool = Query(False, description="Include archived notes in search"),
+    category_ids: Optional[List[int]] = Query(None, description="Filter by category IDs")
+):
+    """Stream every match (up to the server-side cap) as newline-delimited JSON"""
+    def generate():
+        # The stream outlives the request scope, so it owns its session
+        db = SessionLocal()
+        try:
+            service = NoteService(db)
+            yield from service.stream_search_notes(
+                search_term=search_term,
+                include_archived=include_archived,
+                category_ids=category_ids
+            )
+        finally:
+            db.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
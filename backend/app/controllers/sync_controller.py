@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_db
+from ..services.sync_service import SyncService
+from ..schemas.sync import SyncResponse
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+def sync(
+    since: int = Query(0, ge=0, description="next_since of the previous call; 0 for a full sync"),
+    limit: int = Query(settings.sync_page_size, ge=1, le=settings.sync_max_page_size, description="Change-log entries to read"),
+    db: Session = Depends(get_db)
+):
+    """
+    Notes and categories changed after since, in change-log order: upserts
+    carry the current row, tombstones (deleted) only the ID. Repeat with
+    next_since while has_more is set.
+    """
+    service = SyncService(db)
+    return service.get_changes(since, limit)
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
@@ -16,11 +17,20 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class for models
 Base = declarative_base()
 
+# ASGI scope key under which POST /batch hands its session to the sub-requests it dispatches
+SHARED_SESSION_SCOPE_KEY = "notes.db_session"
 
-def get_db() -> Generator[Session, None, None]:
+
+def get_db(request: Request) -> Generator[Session, None, None]:
     """
-    Dependency to get database session
+    Dependency to get database session.
+    Sub-requests of a batch reuse the batch's session instead of opening one.
     """
+    shared = request.scope.get(SHARED_SESSION_SCOPE_KEY)
+    if shared is not None:
+        yield shared
+        return
+    
     db = SessionLocal()
     try:
         yield db
@@ -32,4 +42,61 @@ def create_tables():
     """
     Create all tables in the database
     """
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+    create_search_indexes()
+    backfill_change_log()
+
+
+def create_missing_indexes():
+    """
+    Add indexes declared after their table was first created, since
+    create_all skips existing tables. IF NOT EXISTS (PostgreSQL and SQLite
+    alike) also covers expression indexes, which cannot be reflected.
+    """
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_categories_name_lower ON categories (lower(name))"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_note_categories_category_id ON note_categories (category_id)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_change_log_kind_seq ON change_log (kind, seq)"
+        ))
+
+
+def backfill_change_log():
+    """
+    Log the notes and categories the change log has no entry for,
+    so a full sync (since=0) returns every row
+    """
+    from .repositories.change_log_repository import ChangeLogRepository
+    
+    db = SessionLocal()
+    try:
+        ChangeLogRepository(db).backfill()
+        db.commit()
+    finally:
+        db.close()
+
+
+def create_search_indexes():
+    """
+    Create the pg_trgm GIN indexes backing fuzzy and substring search.
+    PostgreSQL only; other databases use the in-process trigram index.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    
+    with engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_notes_title_trgm ON notes USING gin (title gin_trgm_ops)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_notes_content_trgm ON notes USING gin (content gin_trgm_ops)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_categories_name_trgm ON categories USING gin (name gin_trgm_ops)"
+        ))
@@ -0,0 +1,31 @@
+import threading
+from typing import Optional
+from ..config import settings
+from ..schemas.event import ChangeEvent
+from .broker import EventBroker, PostgresEventBroker, Subscriber
+
+_broker: Optional[EventBroker] = None
+_lock = threading.Lock()
+
+
+def _build_broker() -> EventBroker:
+    from ..database import engine
+
+    transport = settings.events_backend
+    if transport == "auto":
+        transport = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if transport == "postgres":
+        return PostgresEventBroker(engine, settings.events_queue_size, settings.events_replay_size)
+    return EventBroker(settings.events_queue_size, settings.events_replay_size)
+
+
+def get_broker() -> EventBroker:
+    """Get the process-wide change event broker"""
+    global _broker
+    with _lock:
+        if _broker is None:
+            _broker = _build_broker()
+        return _broker
+
+
+__all__ = ["ChangeEvent", "EventBroker", "PostgresEventBroker", "Subscriber", "get_broker"]
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+from sqlalchemy.engine import Engine
+from ..schemas.event import ChangeEvent
+from ..utils.pg_notify import PgNotifyListener, pg_notify
+
+logger = logging.getLogger(__name__)
+
+# (event id, kind, JSON payload) as queued for subscribers
+Item = Tuple[str, str, str]
+
+
+class Subscriber:
+    """
+    One SSE client: a bounded queue on the client's event loop. A client
+    that lets the queue fill up is dropped (its stream ends and it reconnects
+    from its Last-Event-ID) rather than holding events in memory for it.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int, backlog: Optional[List[Item]]):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Events since the client's Last-Event-ID, or None when they are no longer known
+        self.backlog = backlog
+        self.dropped = False
+
+    def offer(self, item: Optional[Item]) -> None:
+        """Queue an event from any thread; None closes the stream"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, item)
+        except RuntimeError:
+            # The client's loop has shut down
+            self.dropped = True
+
+    def _put(self, item: Optional[Item]) -> None:
+        if self.dropped:
+            return
+        if item is None:
+            self._close()
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._close()
+
+    def _close(self) -> None:
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """
+    In-process fan-out of change events to SSE subscribers. Event IDs are
+    "<epoch>-<sequence>"; the last events are kept so a reconnecting client
+    can resume from its Last-Event-ID. Used for single-process deployments.
+    """
+
+    def __init__(self, queue_size: int = 256, replay_size: int = 1000):
+        self.queue_size = queue_size
+        self.epoch = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._recent: Deque[Tuple[int, Item]] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, *events: ChangeEvent) -> None:
+        self._deliver([(event.kind, event.model_dump_json()) for event in events])
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """Register a client on the running event loop, with what it missed since last_event_id"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            subscriber = Subscriber(loop, self.queue_size, self._since(last_event_id))
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(None)
+
+    def _since(self, last_event_id: Optional[str]) -> Optional[List[Item]]:
+        if not last_event_id:
+            return []
+        epoch, _, sequence = last_event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        oldest = self._recent[0][0] if self._recent else self._sequence + 1
+        if sequence < oldest - 1:
+            return None
+        return [item for number, item in self._recent if number > sequence]
+
+    def _deliver(self, events: List[Tuple[str, str]]) -> None:
+        items = []
+        with self._lock:
+            for kind, payload in events:
+                self._sequence += 1
+                item = (f"{self.epoch}-{self._sequence}", kind, payload)
+                self._recent.append((self._sequence, item))
+                items.append(item)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            for item in items:
+                subscriber.offer(item)
+
+
+class PostgresEventBroker(EventBroker):
+    """
+    Event broker fanning events out to every worker through LISTEN/NOTIFY,
+    like PostgresInvalidationBus. Each worker numbers the events it delivers,
+    so resuming only works against the same worker; elsewhere the client is
+    told to reset.
+    """
+
+    channel = "notes_change_events"
+    # Stay well below the 8000 byte NOTIFY payload limit
+    max_events_per_message = 40
+
+    def __init__(self, engine: Engine, queue_size: int = 256, replay_size: int = 1000):
+        super().__init__(queue_size, replay_size)
+        self.engine = engine
+        self.origin = uuid.uuid4().hex
+        self._listener = PgNotifyListener(engine, self.channel, self._on_message, on_connect=self._on_connect)
+
+    def publish(self, *events: ChangeEvent) -> None:
+        super().publish(*events)
+        for start in range(0, len(events), self.max_events_per_message):
+            payload = json.dumps({
+                "origin": self.origin,
+                "events": [event.model_dump(mode="json") for event in events[start:start + self.max_events_per_message]]
+            })
+            try:
+                pg_notify(self.engine, self.channel, payload)
+            except Exception:
+                # Clients of other workers catch up on their next reset or refetch
+                logger.exception("Failed to publish change events")
+
+    def start(self) -> None:
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._listener.stop()
+        super().stop()
+
+    def _on_message(self, payload: str) -> None:
+        message = json.loads(payload)
+        if message.get("origin") == self.origin:
+            return
+        self._deliver([(event["kind"], json.dumps(event)) for event in message.get("events", [])])
+
+    def _on_connect(self) -> None:
+        # Events published while we were not listening are lost; have clients refetch
+        self._deliver([
+            (kind, ChangeEvent(kind=kind, action="reset").model_dump_json()) for kind in ("note", "category")
+        ])
@@ -0,0 +1,30 @@
+import threading
+from typing import List, Tuple
+from .handlers import HANDLERS, JobHandler
+from .worker import Worker
+
+_embedded: List[Tuple[Worker, threading.Thread]] = []
+
+
+def start_embedded_workers(count: int) -> None:
+    """
+    Run count workers as threads of this process, for single-process setups
+    (e.g. SQLite) with no separate `python -m app.tools.job_worker`
+    """
+    for i in range(count):
+        worker = Worker()
+        thread = threading.Thread(target=worker.run_forever, name=f"job-worker-{i}", daemon=True)
+        thread.start()
+        _embedded.append((worker, thread))
+
+
+def stop_embedded_workers(timeout: float = 10) -> None:
+    """Stop the embedded workers; a running job finishes its chunk and goes back in the queue"""
+    for worker, _ in _embedded:
+        worker.stop()
+    for _, thread in _embedded:
+        thread.join(timeout)
+    _embedded.clear()
+
+
+__all__ = ["HANDLERS", "JobHandler", "Worker", "start_embedded_workers", "stop_embedded_workers"]
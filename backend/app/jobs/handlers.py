@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..config import settings
+from ..models.note import Note
+from ..repositories.note_repository import NoteRepository
+from ..repositories.category_repository import CategoryRepository
+from ..schemas.job import JobParams
+from ..search.query_language import SearchQuery, parse_query
+from ..utils.exceptions import ValidationError
+from ..cache import get_bus, related_snapshot_key
+
+# (IDs of the notes changed, new cursor, finished) for one chunk
+ChunkResult = Tuple[List[int], Optional[int], bool]
+
+
+class JobHandler(ABC):
+    """
+    One kind of job. The worker calls count once, then run_chunk until it
+    reports finished, committing each chunk together with the job's progress;
+    run_chunk must therefore leave its changes uncommitted. A chunk that may
+    outlast JOBS_LOCK_TIMEOUT_SECONDS calls heartbeat as it goes, or another
+    worker takes the job over and runs it again.
+    """
+
+    def validate(self, db: Session, params: JobParams) -> None:
+        """Reject bad parameters when the job is submitted; raises ValidationError"""
+
+    def count(self, db: Session, params: JobParams) -> int:
+        return 1
+
+    @abstractmethod
+    def run_chunk(
+        self,
+        db: Session,
+        params: JobParams,
+        cursor: Optional[int],
+        limit: int,
+        heartbeat: Callable[[], None]
+    ) -> ChunkResult:
+        pass
+
+
+class NoteBatchHandler(JobHandler):
+    """Applies a change to the targeted notes, limit notes per chunk in ID order"""
+
+    def validate(self, db: Session, params: JobParams) -> None:
+        if params.query is None and params.note_ids is None:
+            raise ValidationError("Select the notes with query and/or note_ids")
+        self._search_query(params)
+
+    def count(self, db: Session, params: JobParams) -> int:
+        return NoteRepository(db).count_targets(self._search_query(params), params.note_ids)
+
+    def run_chunk(
+        self,
+        db: Session,
+        params: JobParams,
+        cursor: Optional[int],
+        limit: int,
+        heartbeat: Callable[[], None]
+    ) -> ChunkResult:
+        repository = NoteRepository(db)
+        ids = repository.get_target_ids(self._search_query(params), params.note_ids, after=cursor, limit=limit)
+        if not ids:
+            return [], cursor, True
+        self.apply(db, repository.get_by_ids_with_categories(ids), params)
+        return ids, ids[-1], len(ids) < limit
+
+    @abstractmethod
+    def apply(self, db: Session, notes: List[Note], params: JobParams) -> None:
+        pass
+
+    @staticmethod
+    def _search_query(params: JobParams) -> Optional[SearchQuery]:
+        return parse_query(params.query) if params.query is not None else None
+
+
+class ArchiveHandler(NoteBatchHandler):
+    def apply(self, db: Session, notes: List[Note], params: JobParams) -> None:
+        for note in notes:
+            if note.is_archived != params.archived:
+                note.is_archived = params.archived
+
+
+class DeleteHandler(NoteBatchHandler):
+    def apply(self, db: Session, notes: List[Note], params: JobParams) -> None:
+        for note in notes:
+            db.delete(note)
+
+
+class RetagHandler(NoteBatchHandler):
+    def validate(self, db: Session, params: JobParams) -> None:
+        super().validate(db, params)
+        if not params.add_category_ids and not params.remove_category_ids:
+            raise ValidationError("Give add_category_ids and/or remove_category_ids")
+        category_ids = set(params.add_category_ids) | set(params.remove_category_ids)
+        if len(CategoryRepository(db).get_categories_by_ids(list(category_ids))) != len(category_ids):
+            raise ValidationError("One or more category IDs are invalid")
+
+    def apply(self, db: Session, notes: List[Note], params: JobParams) -> None:
+        added = CategoryRepository(db).get_categories_by_ids(params.add_category_ids) if params.add_category_ids else []
+        removed = set(params.remove_category_ids)
+        for note in notes:
+            categories = [category for category in note.categories if category.id not in removed]
+            categories += [category for category in added if category not in categories]
+            if categories != note.categories:
+                note.categories = categories
+                # Membership changes do not touch the notes row; bump it so validators change
+                note.updated_at = func.now()
+
+
+class RebuildRelatedHandler(JobHandler):
+    """Writes the related-notes snapshot (app.tools.rebuild_related) and has the API processes restore it"""
+
+    def validate(self, db: Session, params: JobParams) -> None:
+        if not settings.related_index_path:
+            raise ValidationError("RELATED_INDEX_PATH is not set")
+
+    def run_chunk(
+        self,
+        db: Session,
+        params: JobParams,
+        cursor: Optional[int],
+        limit: int,
+        heartbeat: Callable[[], None]
+    ) -> ChunkResult:
+        from ..tools.rebuild_related import rebuild
+
+        # One chunk for the whole rebuild, kept alive after every ID range it reads
+        rebuild(settings.related_index_path, workers=1, chunk_size=20000, progress=heartbeat)
+        get_bus().publish(related_snapshot_key())
+        return [], None, True
+
+
+HANDLERS: Dict[str, JobHandler] = {
+    "archive": ArchiveHandler(),
+    "delete": DeleteHandler(),
+    "retag": RetagHandler(),
+    "rebuild_related": RebuildRelatedHandler()
+}
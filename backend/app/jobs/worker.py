@@ -0,0 +1,153 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models.job import Job, JobStatus
+from ..repositories.job_repository import JobRepository
+from ..schemas.event import ChangeEvent
+from ..schemas.job import JobParams
+from ..cache import get_bus, note_key
+from ..events import get_broker
+from .handlers import HANDLERS
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Worker:
+    """
+    Claims and runs jobs until stopped, one at a time. Each chunk is committed
+    with the job's progress and heartbeat, so a job whose worker dies is taken
+    over after JOBS_LOCK_TIMEOUT_SECONDS and resumes from its last chunk.
+    Failed runs are retried with exponential backoff up to max_attempts.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.bus = get_bus()
+        self.events = get_broker()
+        self._stopping = threading.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def run_forever(self) -> None:
+        logger.info("Job worker %s started", self.worker_id)
+        while not self._stopping.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Job worker %s failed to claim a job", self.worker_id)
+            self._stopping.wait(settings.jobs_poll_seconds)
+        logger.info("Job worker %s stopped", self.worker_id)
+
+    def run_once(self) -> bool:
+        """Claim and run one job; False when none was due"""
+        db = SessionLocal()
+        try:
+            now = _now()
+            stale_before = now - timedelta(seconds=settings.jobs_lock_timeout_seconds)
+            job = JobRepository(db).claim(self.worker_id, now, stale_before)
+            if job is None:
+                return False
+            self._run(db, job)
+            return True
+        finally:
+            db.close()
+
+    def _run(self, db: Session, job: Job) -> None:
+        if job.attempts > job.max_attempts:
+            # Reclaimed from a worker that stopped heartbeating on its last attempt
+            self._finish(db, job, JobStatus.FAILED, job.error or "Worker stopped responding")
+            return
+
+        logger.info("Running job %d (%s), attempt %d/%d", job.id, job.kind, job.attempts, job.max_attempts)
+        handler = HANDLERS[job.kind]
+        params = JobParams.model_validate(job.params)
+        changed = False
+        try:
+            if job.started_at is None:
+                job.started_at = _now()
+            if job.total is None:
+                job.total = handler.count(db, params)
+            db.commit()
+
+            finished = False
+            while not finished:
+                db.refresh(job)
+                if job.status != JobStatus.RUNNING or job.locked_by != self.worker_id:
+                    logger.info("Job %d was %s; leaving it", job.id, job.status.value)
+                    return
+                if self._stopping.is_set():
+                    self._release(db, job)
+                    return
+
+                ids, job.cursor, finished = handler.run_chunk(
+                    db, params, job.cursor, settings.jobs_chunk_size, lambda: self._heartbeat(job.id)
+                )
+                job.done += len(ids)
+                job.heartbeat_at = _now()
+                db.commit()
+                if ids:
+                    changed = True
+                    self.bus.publish(*(note_key(id) for id in ids))
+
+            self._finish(db, job, JobStatus.SUCCEEDED)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Job %d (%s) failed", job.id, job.kind)
+            self._retry_or_fail(db, job, f"{e.__class__.__name__}: {e}")
+        finally:
+            if changed:
+                # Like an import: too many rows for per-note events
+                self.events.publish(ChangeEvent(kind="note", action="reset"))
+
+    def _heartbeat(self, job_id: int) -> None:
+        """Refresh the lock during a long chunk, from its own session so the chunk's changes stay uncommitted"""
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id, Job.locked_by == self.worker_id).update(
+                {"heartbeat_at": _now()}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _finish(self, db: Session, job: Job, status: JobStatus, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = _now()
+        job.locked_by = None
+        db.commit()
+        logger.info("Job %d %s", job.id, status.value)
+
+    def _release(self, db: Session, job: Job) -> None:
+        """Put a job back in the queue on shutdown without counting the attempt"""
+        job.status = JobStatus.QUEUED
+        job.attempts -= 1
+        job.locked_by = None
+        job.run_after = _now()
+        db.commit()
+
+    def _retry_or_fail(self, db: Session, job: Job, error: str) -> None:
+        db.refresh(job)
+        if job.status != JobStatus.RUNNING or job.locked_by != self.worker_id:
+            return
+        if job.attempts >= job.max_attempts:
+            self._finish(db, job, JobStatus.FAILED, error)
+            return
+        job.status = JobStatus.QUEUED
+        job.error = error
+        job.locked_by = None
+        job.run_after = _now() + timedelta(seconds=settings.jobs_retry_backoff_seconds * 2 ** (job.attempts - 1))
+        db.commit()
@@ -2,7 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 from .database import create_tables
-from .controllers import note_router, category_router
+from .controllers import note_router, category_router, export_router, import_router, batch_router, events_router, sync_router, job_router
+from .cache import cache_stats, get_bus, generations
+from .cache.singleflight import request_flight
+from .search import get_suggest_indexes, get_duplicate_index
+from .events import get_broker
+from .jobs import start_embedded_workers, stop_embedded_workers
 
 app = FastAPI(
     title=settings.api_title,
@@ -22,11 +27,29 @@ app.add_middleware(
 # Include routers
 app.include_router(note_router, prefix="/api/v1")
 app.include_router(category_router, prefix="/api/v1")
+app.include_router(export_router, prefix="/api/v1")
+app.include_router(import_router, prefix="/api/v1")
+app.include_router(batch_router, prefix="/api/v1")
+app.include_router(events_router, prefix="/api/v1")
+app.include_router(sync_router, prefix="/api/v1")
+app.include_router(job_router, prefix="/api/v1")
 
 
 @app.on_event("startup")
 async def startup_event():
     create_tables()
+    get_bus().start()
+    get_broker().start()
+    get_suggest_indexes().build()
+    get_duplicate_index().load_in_background()
+    start_embedded_workers(settings.jobs_embedded_workers)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    stop_embedded_workers()
+    get_broker().stop()
+    get_bus().stop()
 
 
 @app.get("/")
@@ -36,4 +59,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "notes-api"}
\ No newline at end of file
+    return {"status": "healthy", "service": "notes-api"}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "caches": cache_stats(),
+        "generations": generations.snapshot(),
+        "single_flight": request_flight.stats(),
+        "event_subscribers": get_broker().subscriber_count()
+    }
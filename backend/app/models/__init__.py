@@ -1,4 +1,6 @@
 from .note import Note, note_categories
 from .category import Category
+from .change_log import ChangeLog, record_changes, lock_change_log
+from .job import Job, JobStatus
 
-__all__ = ["Note", "Category", "note_categories"]
\ No newline at end of file
+__all__ = ["Note", "Category", "note_categories", "ChangeLog", "record_changes", "lock_change_log", "Job", "JobStatus"]
\ No newline at end of file
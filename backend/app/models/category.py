@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -17,4 +17,8 @@ class Category(Base):
     notes = relationship("Note", secondary="note_categories", back_populates="categories")
     
     def __repr__(self):
-        return f"<Category(id={self.id}, name='{self.name}')>"
\ No newline at end of file
+        return f"<Category(id={self.id}, name='{self.name}')>"
+
+
+# Case-insensitive name lookups (cat: in structured queries)
+Index("ix_categories_name_lower", func.lower(Category.name))
@@ -0,0 +1,107 @@
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String, event, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..database import Base
+from .note import Note, note_categories
+from .category import Category
+
+# Session.info key holding the changes seen by before_flush until after_flush writes them
+PENDING_CHANGES_KEY = "notes.pending_changes"
+
+# pg_advisory_xact_lock key serializing change-log writers (see record_changes)
+CHANGE_LOG_LOCK_KEY = 0x6e6f746573
+
+
+class ChangeLog(Base):
+    """
+    One row per write to a note or category, numbered by seq in commit order.
+    Deletes leave a row with deleted set (a tombstone), so /sync clients can
+    tell a deleted row from one they have never seen.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_entity", "kind", "entity_id"),
+        # Latest change of one kind, for validators
+        Index("ix_change_log_kind_seq", "kind", "seq"),
+        {"sqlite_autoincrement": True}
+    )
+    
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    kind = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, default=False, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ChangeLog(seq={self.seq}, kind='{self.kind}', id={self.entity_id}, deleted={self.deleted})>"
+
+
+def record_changes(session: Session, changes: Iterable[Tuple[str, int, bool]]) -> None:
+    """
+    Append (kind, entity_id, deleted) rows to the change log in the session's
+    transaction. On PostgreSQL writers take a transaction-scoped advisory lock
+    first, so sequence numbers are handed out in commit order and a client
+    never skips a seq that commits after a higher one it has already read.
+    """
+    rows = [{"kind": kind, "entity_id": entity_id, "deleted": deleted} for kind, entity_id, deleted in changes]
+    if not rows:
+        return
+    lock_change_log(session)
+    session.execute(ChangeLog.__table__.insert(), rows)
+
+
+def lock_change_log(session: Session) -> None:
+    """Hold the change-log writer lock until the session's transaction ends (PostgreSQL only)"""
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK_KEY})
+
+
+def _kind(obj) -> Optional[str]:
+    if isinstance(obj, Note):
+        return "note"
+    if isinstance(obj, Category):
+        return "category"
+    return None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changes(session: Session, flush_context, instances) -> None:
+    # New rows have no ID yet, so keep the objects and resolve them after the flush
+    pending = session.info[PENDING_CHANGES_KEY] = []
+    for obj in session.new:
+        if _kind(obj):
+            pending.append((obj, _kind(obj), False))
+    for obj in session.dirty:
+        # A note's categories are part of it; a category's notes are not
+        if isinstance(obj, Note) and session.is_modified(obj):
+            pending.append((obj, "note", False))
+        elif isinstance(obj, Category) and session.is_modified(obj, include_collections=False):
+            pending.append((obj, "category", False))
+    
+    deleted_categories = [obj.id for obj in session.deleted if isinstance(obj, Category)]
+    if deleted_categories:
+        # Notes losing a deleted category change too
+        with session.no_autoflush:
+            note_ids = session.execute(
+                select(note_categories.c.note_id)
+                .where(note_categories.c.category_id.in_(deleted_categories))
+                .distinct()
+            ).scalars().all()
+        pending.extend((note_id, "note", False) for note_id in note_ids)
+    for obj in session.deleted:
+        if _kind(obj):
+            pending.append((obj, _kind(obj), True))
+
+
+@event.listens_for(Session, "after_flush")
+def _write_changes(session: Session, flush_context) -> None:
+    pending = session.info.pop(PENDING_CHANGES_KEY, None)
+    if not pending:
+        return
+    changes = {}
+    for obj, kind, deleted in pending:
+        entity_id = obj if isinstance(obj, int) else obj.id
+        # A tombstone wins over an update of the same row in this flush
+        changes[(kind, entity_id)] = changes.get((kind, entity_id), False) or deleted
+    record_changes(session, [(kind, entity_id, deleted) for (kind, entity_id), deleted in changes.items()])
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index, JSON
+from sqlalchemy.sql import func
+from ..database import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    """
+    A background job run by app.jobs workers. Chunked jobs record their
+    progress (done, and cursor, the last note ID processed) in the same
+    transaction as each chunk's changes, so a retry resumes where it stopped.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    total = Column(Integer, nullable=True)
+    done = Column(Integer, default=0, nullable=False)
+    cursor = Column(Integer, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    error = Column(Text, nullable=True)
+    # Job timing is written from Python in UTC so it compares the same way on every database
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', status={self.status})>"
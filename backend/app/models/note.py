@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Table, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Table, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -9,7 +9,9 @@ note_categories = Table(
     'note_categories',
     Base.metadata,
     Column('note_id', Integer, ForeignKey('notes.id'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    # The primary key serves lookups by note; category filters go through this one
+    Index('ix_note_categories_category_id', 'category_id')
 )
 
 class NoteType(str, enum.Enum):
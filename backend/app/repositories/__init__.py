@@ -1,5 +1,7 @@
 from .base import BaseRepository
 from .note_repository import NoteRepository
 from .category_repository import CategoryRepository
+from .change_log_repository import ChangeLogRepository
+from .job_repository import JobRepository
 
-__all__ = ["BaseRepository", "NoteRepository", "CategoryRepository"]
\ No newline at end of file
+__all__ = ["BaseRepository", "NoteRepository", "CategoryRepository", "ChangeLogRepository", "JobRepository"]
\ No newline at end of file
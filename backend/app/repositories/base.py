@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, List, Optional, Type, Any
+from datetime import datetime
+from typing import TypeVar, Generic, List, Optional, Type, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, func
 from ..database import Base
 
 T = TypeVar('T', bound=Base)
@@ -22,6 +23,13 @@ class BaseRepository(ABC, Generic[T]):
         self.db.refresh(db_obj)
         return db_obj
     
+    def add(self, obj_in: dict) -> T:
+        """Add a new record to the current transaction; flushed for its ID, committed by the caller"""
+        db_obj = self.model(**obj_in)
+        self.db.add(db_obj)
+        self.db.flush()
+        return db_obj
+    
     def get_by_id(self, id: int) -> Optional[T]:
         """Get record by ID"""
         return self.db.query(self.model).filter(self.model.id == id).first()
@@ -72,4 +80,23 @@ class BaseRepository(ABC, Generic[T]):
     
     def count(self) -> int:
         """Count total records"""
-        return self.db.query(self.model).count()
\ No newline at end of file
+        return self.db.query(self.model).count()
+    
+    def get_version(self, id: int) -> Optional[datetime]:
+        """Get the last modification time of a record without loading it"""
+        return (
+            self.db.query(func.coalesce(self.model.updated_at, self.model.created_at))
+            .filter(self.model.id == id)
+            .scalar()
+        )
+    
+    def get_collection_version(self) -> Tuple[int, Optional[datetime]]:
+        """Get (row count, latest modification time) for the whole table"""
+        count, last_modified = (
+            self.db.query(
+                func.count(self.model.id),
+                func.max(func.coalesce(self.model.updated_at, self.model.created_at))
+            )
+            .one()
+        )
+        return count, last_modified
@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, desc, text
 from .base import BaseRepository
 from ..models.category import Category
 from ..models.note import Note, note_categories
@@ -34,11 +34,38 @@ class CategoryRepository(BaseRepository[Category]):
             .all()
         )
     
-    def search_by_name(self, search_term: str) -> List[Category]:
-        """Search categories by name (case insensitive)"""
+    def search_by_name(self, search_term: str, candidate_ids: Optional[Iterable[int]] = None) -> List[Category]:
+        """Search categories by name (case insensitive); candidate_ids narrows the rows to check"""
+        query = self.db.query(Category)
+        if candidate_ids is not None:
+            query = query.filter(Category.id.in_(list(candidate_ids)))
         return (
-            self.db.query(Category)
+            query
             .filter(Category.name.ilike(f"%{search_term}%"))
             .order_by(Category.name)
             .all()
-        )
\ No newline at end of file
+        )
+    
+    def fuzzy_search_by_name(self, search_term: str, threshold: float) -> List[Category]:
+        """
+        Typo-tolerant name search ordered by trigram similarity (PostgreSQL only);
+        the %> operator is served by the pg_trgm GIN index on name
+        """
+        self.db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(threshold)}
+        )
+        return (
+            self.db.query(Category)
+            .filter(Category.name.op("%>")(search_term))
+            .order_by(desc(func.word_similarity(search_term, Category.name)), Category.name)
+            .all()
+        )
+    
+    def iter_names(self, ids: Optional[List[int]] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (id, name) rows for in-process search indexes"""
+        query = self.db.query(Category.id, Category.name)
+        if ids is not None:
+            query = query.filter(Category.id.in_(ids))
+        for row in query:
+            yield row.id, row.name
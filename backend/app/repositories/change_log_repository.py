@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, exists, func, literal, or_, select
+from ..models.change_log import ChangeLog, lock_change_log
+from ..models.note import Note, note_categories
+from ..models.category import Category
+
+
+class ChangeLogRepository:
+    """Repository for the change log read by /sync"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_since(self, since: int, limit: int) -> List[ChangeLog]:
+        """The first limit entries after seq since, in order"""
+        return (
+            self.db.query(ChangeLog)
+            .filter(ChangeLog.seq > since)
+            .order_by(ChangeLog.seq)
+            .limit(limit)
+            .all()
+        )
+    
+    def get_latest(self, kind: Optional[str] = None) -> Tuple[int, Optional[datetime]]:
+        """
+        (seq, changed_at) of the latest entry, of kind if given; (0, None) when
+        there is none. seq grows with every write, deletes included, so it
+        versions a collection exactly where timestamps only have the
+        database's clock resolution.
+        """
+        query = self.db.query(ChangeLog.seq, ChangeLog.changed_at)
+        if kind is not None:
+            query = query.filter(ChangeLog.kind == kind)
+        row = query.order_by(desc(ChangeLog.seq)).first()
+        return (row.seq, row.changed_at) if row else (0, None)
+    
+    def get_entity_seq(self, kind: str, entity_id: int) -> int:
+        """seq of the latest change to one row, 0 when it has none"""
+        return self.db.query(func.coalesce(func.max(ChangeLog.seq), 0)).filter(
+            ChangeLog.kind == kind, ChangeLog.entity_id == entity_id
+        ).scalar()
+    
+    def get_note_seq(self, note_id: int) -> int:
+        """seq of the latest change to a note or to one of its categories, which it embeds"""
+        category_ids = select(note_categories.c.category_id).where(note_categories.c.note_id == note_id)
+        return self.db.query(func.coalesce(func.max(ChangeLog.seq), 0)).filter(or_(
+            and_(ChangeLog.kind == "note", ChangeLog.entity_id == note_id),
+            and_(ChangeLog.kind == "category", ChangeLog.entity_id.in_(category_ids))
+        )).scalar()
+    
+    def backfill(self) -> int:
+        """
+        Log an upsert for every note and category without an entry, such as
+        rows from before the change log existed or written by app.tools.seed.
+        Does not commit.
+        """
+        lock_change_log(self.db)
+        inserted = 0
+        for kind, model in (("category", Category), ("note", Note)):
+            untracked = (
+                select(literal(kind), model.id, literal(False))
+                .where(~exists().where(and_(ChangeLog.kind == kind, ChangeLog.entity_id == model.id)))
+                .order_by(model.id)
+            )
+            result = self.db.execute(
+                ChangeLog.__table__.insert().from_select(["kind", "entity_id", "deleted"], untracked)
+            )
+            inserted += result.rowcount
+        return inserted
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, desc
+from .base import BaseRepository
+from ..models.job import Job, JobStatus
+
+
+class JobRepository(BaseRepository[Job]):
+    """Repository for Job model; the queue side of app.jobs"""
+    
+    def __init__(self, db: Session):
+        super().__init__(db, Job)
+    
+    def list_jobs(self, status: Optional[JobStatus] = None, limit: int = 50) -> List[Job]:
+        """Most recent jobs first"""
+        query = self.db.query(Job)
+        if status is not None:
+            query = query.filter(Job.status == status)
+        return query.order_by(desc(Job.id)).limit(limit).all()
+    
+    def claim(self, worker_id: str, now: datetime, stale_before: datetime) -> Optional[Job]:
+        """
+        Take the next job that is due, or whose worker stopped heartbeating
+        before stale_before, and mark it running for worker_id. Commits.
+        PostgreSQL hands concurrent workers different rows with
+        SELECT ... FOR UPDATE SKIP LOCKED; other databases have no row locks
+        to skip, so the claim is a compare-and-set on attempts instead.
+        """
+        ready = or_(
+            and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+            and_(Job.status == JobStatus.RUNNING, Job.heartbeat_at < stale_before)
+        )
+        query = self.db.query(Job).filter(ready).order_by(Job.run_after, Job.id)
+        claimed = {
+            "status": JobStatus.RUNNING,
+            "locked_by": worker_id,
+            "heartbeat_at": now,
+            "attempts": Job.attempts + 1
+        }
+        
+        if self.db.get_bind().dialect.name == "postgresql":
+            job = query.with_for_update(skip_locked=True).first()
+            if job is None:
+                self.db.rollback()
+                return None
+            self.db.query(Job).filter(Job.id == job.id).update(claimed, synchronize_session=False)
+            self.db.commit()
+            self.db.refresh(job)
+            return job
+        
+        for candidate_id, attempts in query.with_entities(Job.id, Job.attempts).limit(10).all():
+            updated = (
+                self.db.query(Job)
+                .filter(Job.id == candidate_id, Job.attempts == attempts, ready)
+                .update(claimed, synchronize_session=False)
+            )
+            self.db.commit()
+            if updated:
+                return self.get_by_id(candidate_id)
+        return None
@@ -1,9 +1,27 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc
+import csv
+import enum
+import io
+from datetime import datetime, time, timedelta
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import REAL, and_, or_, not_, cast, desc, func, select, text
 from .base import BaseRepository
-from ..models.note import Note, note_categories
+from ..models.note import Note, note_categories, NoteType, TodoStatus, Priority
 from ..models.category import Category
+from ..models.change_log import record_changes
+from ..search.query_language import SearchQuery, TextTerm, KeywordTerm, DateTerm
+
+
+# Columns written by the export endpoint, in output order
+EXPORT_COLUMNS = (
+    Note.id, Note.title, Note.content, Note.note_type, Note.todo_status, Note.priority,
+    Note.due_date, Note.is_archived, Note.created_at, Note.updated_at
+)
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class NoteRepository(BaseRepository[Note]):
@@ -21,13 +39,33 @@ class NoteRepository(BaseRepository[Note]):
             .first()
         )
     
+    def get_version_with_categories(self, id: int) -> Optional[Tuple[datetime, int, Optional[datetime]]]:
+        """
+        Get (note modification time, categories count, latest category modification time)
+        for a note without loading it, so embedded categories are part of its version
+        """
+        row = (
+            self.db.query(
+                func.coalesce(Note.updated_at, Note.created_at),
+                func.count(Category.id),
+                func.max(func.coalesce(Category.updated_at, Category.created_at))
+            )
+            .outerjoin(note_categories, Note.id == note_categories.c.note_id)
+            .outerjoin(Category, Category.id == note_categories.c.category_id)
+            .filter(Note.id == id)
+            .group_by(Note.id)
+            .first()
+        )
+        return tuple(row) if row else None
+    
     def get_active_notes(
         self, 
         skip: int = 0, 
         limit: int = 100,
-        category_ids: Optional[List[int]] = None
+        category_ids: Optional[List[int]] = None,
+        after: Optional[Tuple[Optional[datetime], int]] = None
     ) -> List[Note]:
-        """Get active (non-archived) notes with optional category filtering"""
+        """Get active (non-archived) notes with optional category filtering; after is a keyset cursor"""
         query = (
             self.db.query(Note)
             .options(joinedload(Note.categories))
@@ -44,8 +82,7 @@ class NoteRepository(BaseRepository[Note]):
             )
         
         return (
-            query
-            .order_by(desc(Note.updated_at))
+            self._recent_first(query, after)
             .offset(skip)
             .limit(limit)
             .all()
@@ -55,9 +92,10 @@ class NoteRepository(BaseRepository[Note]):
         self, 
         skip: int = 0, 
         limit: int = 100,
-        category_ids: Optional[List[int]] = None
+        category_ids: Optional[List[int]] = None,
+        after: Optional[Tuple[Optional[datetime], int]] = None
     ) -> List[Note]:
-        """Get archived notes with optional category filtering"""
+        """Get archived notes with optional category filtering; after is a keyset cursor"""
         query = (
             self.db.query(Note)
             .options(joinedload(Note.categories))
@@ -74,13 +112,45 @@ class NoteRepository(BaseRepository[Note]):
             )
         
         return (
-            query
-            .order_by(desc(Note.updated_at))
+            self._recent_first(query, after)
             .offset(skip)
             .limit(limit)
             .all()
         )
     
+    def _recent_first(self, query, after: Optional[Tuple[Optional[datetime], int]] = None):
+        """
+        Order by last update with never-updated notes first and the ID as
+        tie-breaker, so the order is total and pages are stable. after is the
+        (updated_at, id) of the last note already seen; rows from there on are
+        reached through the filter instead of an OFFSET scan.
+        """
+        if after is not None:
+            updated_at, id = after
+            if updated_at is None:
+                query = query.filter(or_(
+                    and_(Note.updated_at.is_(None), Note.id < id),
+                    Note.updated_at.isnot(None)
+                ))
+            else:
+                column, bound = self._instant(Note.updated_at), self._instant(updated_at)
+                query = query.filter(or_(
+                    column < bound,
+                    and_(column == bound, Note.id < id)
+                ))
+        return query.order_by(Note.updated_at.desc().nulls_first(), desc(Note.id))
+    
+    def _instant(self, value):
+        """
+        A timestamp column or value as the database should compare it. SQLite
+        keeps timestamps as text: CURRENT_TIMESTAMP writes "YYYY-MM-DD HH:MM:SS"
+        while bound datetimes carry microseconds, so equal instants would not
+        compare equal; there they are compared as Julian day numbers instead.
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            return func.julianday(value)
+        return value
+    
     def count_active_notes(self, category_ids: Optional[List[int]] = None) -> int:
         """Count active notes with optional category filtering"""
         query = self.db.query(Note).filter(Note.is_archived == False)
@@ -109,21 +179,25 @@ class NoteRepository(BaseRepository[Note]):
         
         return query.count()
     
-    def search_notes(
-        self, 
-        search_term: str, 
+    def _search_query(
+        self,
+        query,
+        search_term: str,
         include_archived: bool = False,
-        category_ids: Optional[List[int]] = None
-    ) -> List[Note]:
-        """Search notes by title or content"""
-        query = (
-            self.db.query(Note)
-            .options(joinedload(Note.categories))
-            .filter(
-                or_(
-                    Note.title.ilike(f"%{search_term}%"),
-                    Note.content.ilike(f"%{search_term}%")
-                )
+        category_ids: Optional[List[int]] = None,
+        candidate_ids: Optional[Iterable[int]] = None
+    ):
+        """
+        Apply the search filters shared by search, count and streaming.
+        candidate_ids, a superset of the matches (e.g. from a trigram index),
+        spares the ILIKE a scan of the whole table.
+        """
+        if candidate_ids is not None:
+            query = query.filter(Note.id.in_(list(candidate_ids)))
+        query = query.filter(
+            or_(
+                Note.title.ilike(f"%{search_term}%"),
+                Note.content.ilike(f"%{search_term}%")
             )
         )
         
@@ -138,7 +212,426 @@ class NoteRepository(BaseRepository[Note]):
                 .distinct()
             )
         
-        return query.order_by(desc(Note.updated_at)).all()
+        return query
+    
+    def search_notes(
+        self, 
+        search_term: str, 
+        include_archived: bool = False,
+        category_ids: Optional[List[int]] = None,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[Optional[datetime], int]] = None,
+        candidate_ids: Optional[Iterable[int]] = None
+    ) -> List[Note]:
+        """Search notes by title or content, one page at a time; after is a keyset cursor"""
+        query = self._search_query(
+            self.db.query(Note).options(joinedload(Note.categories)),
+            search_term, include_archived, category_ids, candidate_ids
+        )
+        
+        return (
+            self._recent_first(query, after)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def count_search_notes(
+        self,
+        search_term: str,
+        include_archived: bool = False,
+        category_ids: Optional[List[int]] = None,
+        candidate_ids: Optional[Iterable[int]] = None
+    ) -> int:
+        """Count notes matching a search"""
+        query = self._search_query(self.db.query(Note), search_term, include_archived, category_ids, candidate_ids)
+        return query.count()
+    
+    def iter_search_notes(
+        self,
+        search_term: str,
+        include_archived: bool = False,
+        category_ids: Optional[List[int]] = None,
+        limit: int = 10000,
+        batch_size: int = 500,
+        candidate_ids: Optional[Iterable[int]] = None
+    ) -> Iterator[Note]:
+        """
+        Stream matching notes from a server-side cursor, batch_size rows at a time.
+        Categories are loaded per batch (selectinload), since joined collections
+        cannot be combined with yield_per.
+        """
+        query = self._search_query(
+            self.db.query(Note).options(selectinload(Note.categories)),
+            search_term, include_archived, category_ids, candidate_ids
+        )
+        
+        yield from (
+            self._recent_first(query)
+            .limit(limit)
+            .yield_per(batch_size)
+        )
+    
+    def _set_trigram_threshold(self, threshold: float) -> None:
+        """Set the pg_trgm word similarity threshold for the current transaction"""
+        self.db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(threshold)}
+        )
+    
+    def _fuzzy_query(
+        self,
+        query,
+        search_term: str,
+        include_archived: bool = False,
+        category_ids: Optional[List[int]] = None
+    ):
+        """
+        PostgreSQL fuzzy filter: the %> operator (word similarity above the
+        threshold) is served by the pg_trgm GIN indexes on title and content
+        """
+        query = query.filter(
+            or_(
+                Note.title.op("%>")(search_term),
+                Note.content.op("%>")(search_term)
+            )
+        )
+        
+        if not include_archived:
+            query = query.filter(Note.is_archived == False)
+        
+        if category_ids:
+            query = query.filter(
+                Note.id.in_(
+                    select(note_categories.c.note_id)
+                    .where(note_categories.c.category_id.in_(category_ids))
+                )
+            )
+        
+        return query
+    
+    def fuzzy_search_notes(
+        self,
+        search_term: str,
+        threshold: float,
+        include_archived: bool = False,
+        category_ids: Optional[List[int]] = None,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[Note, float]]:
+        """
+        Typo-tolerant search ordered by trigram similarity (PostgreSQL only).
+        Returns (note, score) pairs; after is the (score, id) of the last note
+        already seen.
+        """
+        self._set_trigram_threshold(threshold)
+        score = func.greatest(
+            func.word_similarity(search_term, Note.title),
+            func.word_similarity(search_term, Note.content)
+        )
+        query = self._fuzzy_query(
+            self.db.query(Note, score).options(selectinload(Note.categories)),
+            search_term, include_archived, category_ids
+        )
+        if after is not None:
+            # word_similarity() is a real; compare at that precision so ties survive the round trip
+            last_score, last_id = cast(after[0], REAL), after[1]
+            query = query.filter(or_(
+                score < last_score,
+                and_(score == last_score, Note.id < last_id)
+            ))
+        rows = (
+            query
+            .order_by(desc(score), desc(Note.id))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return [(note, float(note_score)) for note, note_score in rows]
+    
+    def count_fuzzy_search_notes(
+        self,
+        search_term: str,
+        threshold: float,
+        include_archived: bool = False,
+        category_ids: Optional[List[int]] = None
+    ) -> int:
+        """Count fuzzy search matches (PostgreSQL only)"""
+        self._set_trigram_threshold(threshold)
+        return self._fuzzy_query(self.db.query(Note), search_term, include_archived, category_ids).count()
+    
+    def filter_ids(
+        self,
+        ids: List[int],
+        include_archived: bool = False,
+        category_ids: Optional[List[int]] = None,
+        chunk_size: int = 500
+    ) -> Set[int]:
+        """Subset of ids passing the archive and category filters"""
+        visible = set()
+        for start in range(0, len(ids), chunk_size):
+            query = self.db.query(Note.id).filter(Note.id.in_(ids[start:start + chunk_size]))
+            if not include_archived:
+                query = query.filter(Note.is_archived == False)
+            if category_ids:
+                query = query.filter(
+                    Note.id.in_(
+                        select(note_categories.c.note_id)
+                        .where(note_categories.c.category_id.in_(category_ids))
+                    )
+                )
+            visible.update(row.id for row in query)
+        return visible
+    
+    def get_by_ids_with_categories(self, ids: List[int]) -> List[Note]:
+        """Get notes by ID with categories loaded, in the order of ids"""
+        if not ids:
+            return []
+        notes = (
+            self.db.query(Note)
+            .options(selectinload(Note.categories))
+            .filter(Note.id.in_(ids))
+            .all()
+        )
+        by_id = {note.id: note for note in notes}
+        return [by_id[id] for id in ids if id in by_id]
+    
+    def iter_search_texts(self, ids: Optional[List[int]] = None, batch_size: int = 1000) -> Iterator[Tuple[int, str]]:
+        """Yield (id, title + content) rows for in-process search indexes"""
+        query = self.db.query(Note.id, Note.title, Note.content)
+        if ids is not None:
+            query = query.filter(Note.id.in_(ids))
+        for row in query.yield_per(batch_size):
+            yield row.id, f"{row.title}\n{row.content}"
+    
+    def bulk_insert(self, rows: List[dict], category_ids: List[List[int]]) -> List[int]:
+        """
+        Insert notes and their category links without going through the ORM,
+        returning the new IDs in row order. Uses COPY on PostgreSQL (IDs are
+        reserved from the sequence up front) and a single executemany INSERT
+        elsewhere. Does not commit.
+        """
+        if not rows:
+            return []
+        if self.db.get_bind().dialect.name == "postgresql":
+            ids = self._copy_notes(rows)
+        else:
+            ids = list(self.db.execute(
+                Note.__table__.insert().returning(Note.id, sort_by_parameter_order=True),
+                rows
+            ).scalars())
+        
+        links = [
+            {"note_id": note_id, "category_id": category_id}
+            for note_id, note_category_ids in zip(ids, category_ids)
+            for category_id in note_category_ids
+        ]
+        if links:
+            self.db.execute(note_categories.insert(), links)
+        # Core inserts bypass the session's change tracking
+        record_changes(self.db, [("note", id, False) for id in ids])
+        return ids
+    
+    def _copy_notes(self, rows: List[dict]) -> List[int]:
+        ids = [id for (id,) in self.db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('notes', 'id')) FROM generate_series(1, :count)"),
+            {"count": len(rows)}
+        )]
+        columns = ["id"] + list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for id, row in zip(ids, rows):
+            # PostgreSQL stores these enums by member name
+            writer.writerow([id] + [value.name if isinstance(value, enum.Enum) else value for value in row.values()])
+        buffer.seek(0)
+        
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY notes ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+        return ids
+    
+    def iter_export_batches(
+        self,
+        archived: Optional[bool] = None,
+        note_type: Optional[str] = None,
+        category_ids: Optional[List[int]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[dict]]:
+        """
+        Stream notes in ID order as batches of plain dicts (Core rows, no ORM
+        identity map) from a server-side cursor. Each row gets a "categories"
+        list of {"id", "name"}, loaded with one query per batch.
+        """
+        statement = select(*EXPORT_COLUMNS).order_by(Note.id)
+        if archived is not None:
+            statement = statement.where(Note.is_archived == archived)
+        if note_type:
+            statement = statement.where(Note.note_type == NoteType(note_type))
+        if category_ids:
+            statement = statement.where(
+                Note.id.in_(select(note_categories.c.note_id).where(note_categories.c.category_id.in_(category_ids)))
+            )
+        
+        result = self.db.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.mappings().partitions():
+            rows = [dict(row) for row in partition]
+            by_id = {row["id"]: row for row in rows}
+            for row in rows:
+                row["categories"] = []
+            links = self.db.execute(
+                select(note_categories.c.note_id, Category.id, Category.name)
+                .join(Category, Category.id == note_categories.c.category_id)
+                .where(note_categories.c.note_id.in_(list(by_id)))
+                .order_by(Category.name)
+            )
+            for note_id, category_id, name in links:
+                by_id[note_id]["categories"].append({"id": category_id, "name": name})
+            yield rows
+    
+    def iter_documents(
+        self,
+        ids: Optional[List[int]] = None,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Tuple[int, str, str, bool]]:
+        """Yield (id, title, content, is_archived) rows for the related-notes index"""
+        query = self.db.query(Note.id, Note.title, Note.content, Note.is_archived)
+        if ids is not None:
+            query = query.filter(Note.id.in_(ids))
+        if min_id is not None:
+            query = query.filter(Note.id >= min_id)
+        if max_id is not None:
+            query = query.filter(Note.id <= max_id)
+        for row in query.yield_per(batch_size):
+            yield row.id, row.title, row.content, row.is_archived
+    
+    def get_related_changes(self, since: datetime) -> Tuple[Set[int], List[int]]:
+        """(active note IDs, IDs of notes modified at or after since) for catching up a related-notes snapshot"""
+        active = {id for (id,) in self.db.query(Note.id).filter(Note.is_archived == False).yield_per(5000)}
+        modified = [
+            id for (id,) in self.db.query(Note.id)
+            .filter(self._instant(func.coalesce(Note.updated_at, Note.created_at)) >= self._instant(since))
+        ]
+        return active, modified
+    
+    def get_id_range(self) -> Tuple[Optional[int], Optional[int]]:
+        """Smallest and largest note ID, or (None, None) when there are no notes"""
+        return self.db.query(func.min(Note.id), func.max(Note.id)).one()
+    
+    def iter_titles(self, ids: Optional[List[int]] = None, batch_size: int = 1000) -> Iterator[Tuple[int, str, bool]]:
+        """Yield (id, title, is_archived) rows for the title autocomplete index"""
+        query = self.db.query(Note.id, Note.title, Note.is_archived)
+        if ids is not None:
+            query = query.filter(Note.id.in_(ids))
+        for row in query.yield_per(batch_size):
+            yield row.id, row.title, row.is_archived
+    
+    def iter_category_links(self, note_ids: Optional[List[int]] = None, batch_size: int = 5000) -> Iterator[Tuple[int, int]]:
+        """Yield (note_id, category_id) association rows"""
+        query = self.db.query(note_categories.c.note_id, note_categories.c.category_id)
+        if note_ids is not None:
+            query = query.filter(note_categories.c.note_id.in_(note_ids))
+        for row in query.yield_per(batch_size):
+            yield row.note_id, row.category_id
+    
+    def _compile_search_query(self, search_query: SearchQuery) -> list:
+        """
+        Compile a parsed query into SQL criteria so every filter runs in the
+        database: enums and flags hit their indexes, categories become an IN over
+        the association table, text terms use ILIKE (trigram-indexed on PostgreSQL)
+        """
+        criteria = []
+        for term in search_query.terms:
+            if isinstance(term, TextTerm):
+                pattern = f"%{_escape_like(term.value)}%"
+                if term.field == "title":
+                    clause = Note.title.ilike(pattern, escape="\\")
+                elif term.field == "content":
+                    clause = Note.content.ilike(pattern, escape="\\")
+                else:
+                    clause = or_(
+                        Note.title.ilike(pattern, escape="\\"),
+                        Note.content.ilike(pattern, escape="\\")
+                    )
+            elif isinstance(term, DateTerm):
+                column = {"due": Note.due_date, "created": Note.created_at, "updated": Note.updated_at}[term.field]
+                start = datetime.combine(term.value, time.min)
+                end = start + timedelta(days=1)
+                clause = {
+                    "<": column < start,
+                    "<=": column < end,
+                    ">": column >= end,
+                    ">=": column >= start,
+                    "=": and_(column >= start, column < end),
+                }[term.op]
+            elif term.field == "status":
+                clause = Note.todo_status.in_([TodoStatus(value) for value in term.values])
+            elif term.field == "priority":
+                clause = Note.priority.in_([Priority(value) for value in term.values])
+            elif term.field == "type":
+                clause = Note.note_type.in_([NoteType(value) for value in term.values])
+            elif term.field == "is":
+                clause = Note.is_archived == (term.values[0] == "archived")
+            else:
+                # Names resolve through ix_categories_name_lower, links through ix_note_categories_category_id
+                clause = Note.id.in_(
+                    select(note_categories.c.note_id)
+                    .join(Category, Category.id == note_categories.c.category_id)
+                    .where(func.lower(Category.name).in_(term.values))
+                )
+            
+            criteria.append(not_(clause) if term.negated else clause)
+        
+        # Archived notes only show up when the query asks about them
+        if not any(isinstance(term, KeywordTerm) and term.field == "is" for term in search_query.terms):
+            criteria.append(Note.is_archived == False)
+        
+        return criteria
+    
+    def query_notes(self, search_query: SearchQuery, skip: int = 0, limit: int = 100) -> List[Note]:
+        """Run a parsed structured query as a single parameterized SELECT"""
+        query = (
+            self.db.query(Note)
+            .options(selectinload(Note.categories))
+            .filter(*self._compile_search_query(search_query))
+        )
+        return self._recent_first(query).offset(skip).limit(limit).all()
+    
+    def count_query_notes(self, search_query: SearchQuery) -> int:
+        """Count notes matching a parsed structured query"""
+        return self.db.query(Note).filter(*self._compile_search_query(search_query)).count()
+    
+    def _target_query(self, search_query: Optional[SearchQuery] = None, ids: Optional[List[int]] = None):
+        query = self.db.query(Note.id)
+        if search_query is not None:
+            query = query.filter(*self._compile_search_query(search_query))
+        if ids is not None:
+            query = query.filter(Note.id.in_(ids))
+        return query
+    
+    def get_target_ids(
+        self,
+        search_query: Optional[SearchQuery] = None,
+        ids: Optional[List[int]] = None,
+        after: Optional[int] = None,
+        limit: int = 500
+    ) -> List[int]:
+        """
+        Next IDs, ascending, of the notes matching a structured query and/or an
+        ID list, after ID after; bulk jobs walk their targets by this keyset
+        """
+        query = self._target_query(search_query, ids)
+        if after is not None:
+            query = query.filter(Note.id > after)
+        return [id for (id,) in query.order_by(Note.id).limit(limit)]
+    
+    def count_targets(self, search_query: Optional[SearchQuery] = None, ids: Optional[List[int]] = None) -> int:
+        return self._target_query(search_query, ids).count()
     
     def archive_note(self, id: int) -> Optional[Note]:
         """Archive a note"""
@@ -164,11 +657,10 @@ class NoteRepository(BaseRepository[Note]):
         limit: int = 100,
         status: Optional[str] = None,
         priority: Optional[str] = None,
-        category_ids: Optional[List[int]] = None
+        category_ids: Optional[List[int]] = None,
+        after: Optional[Tuple[Optional[datetime], int]] = None
     ) -> List[Note]:
-        """Get todos with optional filtering"""
-        from ..models.note import NoteType, TodoStatus, Priority
-        
+        """Get todos with optional filtering; after is a keyset cursor"""
         query = (
             self.db.query(Note)
             .options(joinedload(Note.categories))
@@ -194,8 +686,7 @@ class NoteRepository(BaseRepository[Note]):
             )
         
         return (
-            query
-            .order_by(desc(Note.updated_at))
+            self._recent_first(query, after)
             .offset(skip)
             .limit(limit)
             .all()
@@ -1,7 +1,16 @@
-from .note import NoteCreate, NoteUpdate, NoteResponse, NoteListResponse
+from .note import NoteCreate, NoteUpdate, NoteResponse, NoteListResponse, RelatedNote, DuplicateNote
 from .category import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithNotesCount
+from .suggestion import Suggestion
+from .bulk import NoteImport, ImportIssue, ImportSummary
+from .batch import BatchItem, BatchRequest, BatchItemResponse, BatchResponse
+from .event import ChangeEvent
+from .sync import SyncChange, SyncResponse
+from .job import JobParams, JobCreate, JobResponse
 
 __all__ = [
-    "NoteCreate", "NoteUpdate", "NoteResponse", "NoteListResponse",
-    "CategoryCreate", "CategoryUpdate", "CategoryResponse", "CategoryWithNotesCount"
+    "NoteCreate", "NoteUpdate", "NoteResponse", "NoteListResponse", "RelatedNote", "DuplicateNote",
+    "CategoryCreate", "CategoryUpdate", "CategoryResponse", "CategoryWithNotesCount",
+    "Suggestion", "NoteImport", "ImportIssue", "ImportSummary",
+    "BatchItem", "BatchRequest", "BatchItemResponse", "BatchResponse", "ChangeEvent",
+    "SyncChange", "SyncResponse", "JobParams", "JobCreate", "JobResponse"
 ]
\ No newline at end of file
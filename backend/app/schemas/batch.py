@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, Union
+
+QueryValue = Union[str, int, float, bool, List[Union[str, int, float, bool]]]
+
+
+class BatchItem(BaseModel):
+    """One API call, addressed relative to /api/v1"""
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = Field(default="GET", description="HTTP method")
+    path: str = Field(..., pattern=r"^/", description="Path below /api/v1, e.g. /notes/active")
+    query: Dict[str, QueryValue] = Field(default_factory=dict, description="Query parameters; lists repeat the key")
+    body: Optional[Any] = Field(None, description="JSON body for POST, PUT and PATCH")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Extra request headers, e.g. If-None-Match")
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1, description="Calls to make, answered in the same order")
+    concurrent: bool = Field(default=False, description="Run the calls in parallel, each with its own session")
+
+
+class BatchItemResponse(BaseModel):
+    status: int = Field(..., description="HTTP status code of the call")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Response headers of the call")
+    body: Optional[Any] = Field(None, description="Decoded JSON body, or text for other content types")
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchItemResponse]
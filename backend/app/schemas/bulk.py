@@ -0,0 +1,50 @@
+import json
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+from typing import Any, List, Optional
+from .note import NoteBase, TodoStatus
+
+
+class NoteImport(NoteBase):
+    """One imported note; accepts the rows written by /export"""
+    todo_status: TodoStatus = Field(default=TodoStatus.PENDING, description="Todo status")
+    is_archived: bool = Field(default=False, description="Import as archived")
+    categories: List[str] = Field(default_factory=list, description="Category names, created when missing")
+    created_at: Optional[datetime] = Field(None, description="Original creation time")
+    
+    @field_validator("categories", mode="before")
+    @classmethod
+    def parse_categories(cls, value: Any) -> Any:
+        # CSV cells hold a JSON array; NDJSON exports hold {"id", "name"} objects
+        if value is None or value == "":
+            return []
+        if isinstance(value, str):
+            value = json.loads(value) if value.lstrip().startswith("[") else [value]
+        return [item["name"] if isinstance(item, dict) else item for item in value]
+    
+    @field_validator("categories")
+    @classmethod
+    def strip_categories(cls, value: List[str]) -> List[str]:
+        names = list(dict.fromkeys(name.strip() for name in value if name.strip()))
+        if any(len(name) > 100 for name in names):
+            raise ValueError("Category names are limited to 100 characters")
+        return names
+
+
+class ImportIssue(BaseModel):
+    line: int
+    message: str
+    duplicate_of: Optional[int] = None
+    # Set instead of duplicate_of when the match is an earlier row of the same import
+    duplicate_of_line: Optional[int] = None
+
+
+class ImportSummary(BaseModel):
+    received: int = 0
+    imported: int = 0
+    failed: int = 0
+    batches: int = 0
+    categories_created: int = 0
+    errors: List[ImportIssue] = []
+    warnings: List[ImportIssue] = []
+    truncated: bool = Field(default=False, description="More issues occurred than are listed")
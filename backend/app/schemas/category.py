@@ -5,7 +5,7 @@ from typing import Optional
 
 class CategoryBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Category name")
-    color: str = Field(default="#3B82F6", regex=r"^#[0-9A-Fa-f]{6}$", description="Hex color code")
+    color: str = Field(default="#3B82F6", pattern=r"^#[0-9A-Fa-f]{6}$", description="Hex color code")
 
 
 class CategoryCreate(CategoryBase):
@@ -14,7 +14,7 @@ class CategoryCreate(CategoryBase):
 
 class CategoryUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
-    color: Optional[str] = Field(None, regex=r"^#[0-9A-Fa-f]{6}$")
+    color: Optional[str] = Field(None, pattern=r"^#[0-9A-Fa-f]{6}$")
 
 
 class CategoryResponse(CategoryBase):
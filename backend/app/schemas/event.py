@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal, Optional
+
+
+class ChangeEvent(BaseModel):
+    """A committed write, as streamed by /events"""
+    kind: Literal["note", "category"]
+    action: Literal["created", "updated", "deleted", "reset"] = Field(
+        ..., description="reset means many rows changed at once (e.g. an import): refetch this kind"
+    )
+    id: Optional[int] = Field(None, description="ID of the changed row; None for reset")
+    version: Optional[datetime] = Field(None, description="updated_at (or created_at) after the write")
+    fields: List[str] = Field(default_factory=list, description="Fields an update set; empty for other actions")
@@ -0,0 +1,59 @@
+from pydantic import BaseModel, Field, computed_field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Literal, Optional
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+JobKind = Literal["archive", "delete", "retag", "rebuild_related"]
+
+
+class JobParams(BaseModel):
+    """What a job works on; bulk note jobs need query and/or note_ids"""
+    query: Optional[str] = Field(None, description="Structured query selecting notes, as for /notes/query")
+    note_ids: Optional[List[int]] = Field(None, description="Notes to process; with query, only those that also match")
+    archived: bool = Field(default=True, description="archive: archive (true) or unarchive (false)")
+    add_category_ids: List[int] = Field(default_factory=list, description="retag: categories to add")
+    remove_category_ids: List[int] = Field(default_factory=list, description="retag: categories to remove")
+
+
+class JobCreate(BaseModel):
+    kind: JobKind = Field(..., description="archive, delete or retag notes in chunks, or rebuild_related (the related-notes snapshot)")
+    params: JobParams = Field(default_factory=JobParams)
+    max_attempts: Optional[int] = Field(None, ge=1, le=10, description="Runs before giving up (default JOBS_MAX_ATTEMPTS)")
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: JobKind
+    params: Dict[str, Any]
+    status: JobStatus
+    total: Optional[int] = Field(None, description="Items to process, once the job has started")
+    done: int = Field(..., description="Items processed so far")
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = Field(None, description="Last failure, kept while retrying")
+    run_after: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    @computed_field
+    @property
+    def progress(self) -> Optional[float]:
+        """Fraction done, 0 to 1"""
+        if self.status == JobStatus.SUCCEEDED:
+            return 1.0
+        if not self.total:
+            return None
+        return round(min(self.done / self.total, 1.0), 4)
+    
+    class Config:
+        from_attributes = True
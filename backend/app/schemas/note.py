@@ -56,9 +56,19 @@ class NoteResponse(NoteBase):
         from_attributes = True
 
 
+class RelatedNote(NoteResponse):
+    score: float
+
+
+class DuplicateNote(NoteResponse):
+    similarity: float
+
+
 class NoteListResponse(BaseModel):
     notes: List[NoteResponse]
     total: int
     page: int
     page_size: int
-    total_pages: int
\ No newline at end of file
+    total_pages: int
+    # Pass as ?cursor= to fetch the following page by keyset; None on the last page
+    next_cursor: Optional[str] = None
\ No newline at end of file
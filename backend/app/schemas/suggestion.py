@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    id: int
+    label: str
+    usage: int = 0
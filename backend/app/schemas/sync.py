@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from .note import NoteResponse
+from .category import CategoryResponse
+
+
+class SyncChange(BaseModel):
+    """The current state of a row changed after since: an upsert, or a tombstone when deleted"""
+    seq: int = Field(..., description="Change-log position of the row's latest change")
+    kind: Literal["note", "category"]
+    id: int
+    deleted: bool = Field(default=False, description="Tombstone: the row no longer exists")
+    note: Optional[NoteResponse] = Field(None, description="The note, for note upserts")
+    category: Optional[CategoryResponse] = Field(None, description="The category, for category upserts")
+
+
+class SyncResponse(BaseModel):
+    changes: List[SyncChange] = Field(..., description="Changed rows in change-log order")
+    next_since: int = Field(..., description="Pass as since to continue; stays put when nothing changed")
+    has_more: bool = Field(..., description="More changes follow; call again right away")
@@ -0,0 +1,108 @@
+import threading
+from typing import Optional
+from ..cache import get_bus
+from .trigram import trigrams, substring_trigrams, TrigramIndex, SyncedTrigramIndex
+from .suggest import PrefixIndex, SuggestIndexes
+from .tfidf import tokenize, term_counts, TfidfIndex, SyncedTfidfIndex
+from .minhash import shingles, MinHasher, LSHIndex, SyncedDuplicateIndex
+
+_note_index: Optional[SyncedTrigramIndex] = None
+_category_index: Optional[SyncedTrigramIndex] = None
+_suggest_indexes: Optional[SuggestIndexes] = None
+_related_index: Optional[SyncedTfidfIndex] = None
+_duplicate_index: Optional[SyncedDuplicateIndex] = None
+_lock = threading.Lock()
+
+
+# Repositories import the query language from this package, so load them lazily
+def _load_note_texts(db, ids):
+    from ..repositories.note_repository import NoteRepository
+    return NoteRepository(db).iter_search_texts(ids)
+
+
+def _load_note_documents(db, ids):
+    from ..repositories.note_repository import NoteRepository
+    return NoteRepository(db).iter_documents(ids)
+
+
+def _note_changes(db, since):
+    from ..repositories.note_repository import NoteRepository
+    return NoteRepository(db).get_related_changes(since)
+
+
+def _load_category_names(db, ids):
+    from ..repositories.category_repository import CategoryRepository
+    return CategoryRepository(db).iter_names(ids)
+
+
+def get_note_trigram_index() -> SyncedTrigramIndex:
+    """In-process trigram index over note titles and content (non-PostgreSQL fallback)"""
+    global _note_index
+    with _lock:
+        if _note_index is None:
+            _note_index = SyncedTrigramIndex("note", _load_note_texts)
+            get_bus().subscribe(_note_index.handle_invalidation)
+        return _note_index
+
+
+def get_category_trigram_index() -> SyncedTrigramIndex:
+    """In-process trigram index over category names (non-PostgreSQL fallback)"""
+    global _category_index
+    with _lock:
+        if _category_index is None:
+            _category_index = SyncedTrigramIndex("category", _load_category_names)
+            get_bus().subscribe(_category_index.handle_invalidation)
+        return _category_index
+
+
+def get_related_index() -> SyncedTfidfIndex:
+    """TF-IDF similarity index over active notes for the related-notes endpoint"""
+    global _related_index
+    with _lock:
+        if _related_index is None:
+            from ..config import settings
+            _related_index = SyncedTfidfIndex(
+                _load_note_documents,
+                _note_changes,
+                snapshot_path=settings.related_index_path,
+                delta_limit=settings.related_index_delta_limit
+            )
+            get_bus().subscribe(_related_index.handle_invalidation)
+        return _related_index
+
+
+def get_duplicate_index() -> SyncedDuplicateIndex:
+    """MinHash/LSH index over all notes for near-duplicate detection"""
+    global _duplicate_index
+    with _lock:
+        if _duplicate_index is None:
+            from ..config import settings
+            from ..database import SessionLocal
+            _duplicate_index = SyncedDuplicateIndex(
+                _load_note_documents,
+                SessionLocal,
+                num_perm=settings.minhash_permutations,
+                bands=settings.minhash_bands
+            )
+            get_bus().subscribe(_duplicate_index.handle_invalidation)
+        return _duplicate_index
+
+
+def get_suggest_indexes() -> SuggestIndexes:
+    """Prefix autocomplete indexes for category names and note titles"""
+    global _suggest_indexes
+    with _lock:
+        if _suggest_indexes is None:
+            from ..database import SessionLocal
+            _suggest_indexes = SuggestIndexes(SessionLocal)
+            get_bus().subscribe(_suggest_indexes.handle_invalidation)
+        return _suggest_indexes
+
+
+__all__ = [
+    "trigrams", "substring_trigrams", "TrigramIndex", "SyncedTrigramIndex", "PrefixIndex", "SuggestIndexes",
+    "tokenize", "term_counts", "TfidfIndex", "SyncedTfidfIndex",
+    "shingles", "MinHasher", "LSHIndex", "SyncedDuplicateIndex",
+    "get_note_trigram_index", "get_category_trigram_index", "get_suggest_indexes", "get_related_index",
+    "get_duplicate_index"
+]
@@ -0,0 +1,56 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRebuild:
+    """
+    Runs a rebuild function on a background thread. request() schedules a run;
+    requests arriving while one runs coalesce into a single further run, since
+    that run may have read the data before the change. start() only makes
+    sure a run is underway, for callers that just need the index built once.
+    """
+
+    def __init__(self, rebuild: Callable[[], None], name: str):
+        self.rebuild = rebuild
+        self.name = name
+        self._thread: Optional[threading.Thread] = None
+        self._requested = False
+        self._lock = threading.Lock()
+
+    def request(self) -> None:
+        with self._lock:
+            self._requested = True
+            self._start()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._requested = True
+                self._start()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the pending runs have finished"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._requested:
+                    self._thread = None
+                    return
+                self._requested = False
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception("%s failed", self.name)
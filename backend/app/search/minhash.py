@@ -0,0 +1,232 @@
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from .background import BackgroundRebuild
+
+_WORD = re.compile(r"\w+")
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a, b < 2^31 keeps it inside uint64
+_PRIME = np.uint64(4294967311)
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Overlapping word n-grams of text; short texts yield a single shingle"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Computes MinHash signatures whose agreement rate estimates Jaccard similarity"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        generator = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = generator.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, title: str, content: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(f"{title}\n{content}")),
+            dtype=np.uint64
+        )
+        if len(hashes) == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        # One vectorized pass: (num_perm x shingles) hash matrix, minimum per permutation
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(first == second))
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures. Each signature is cut
+    into bands of rows; notes sharing any whole band land in the same bucket,
+    so finding candidates costs one dictionary lookup per band instead of a
+    comparison against every note.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, Set[int]]] = [defaultdict(set) for _ in range(bands)]
+        self._signatures: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, id: int, signature: np.ndarray) -> None:
+        self.remove(id)
+        self._signatures[id] = signature
+        for band, key in self._band_keys(signature):
+            self._buckets[band][key].add(id)
+
+    def remove(self, id: int) -> None:
+        signature = self._signatures.pop(id, None)
+        if signature is None:
+            return
+        for band, key in self._band_keys(signature):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def clear(self) -> None:
+        self._signatures.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+
+    def signature_of(self, id: int) -> Optional[np.ndarray]:
+        return self._signatures.get(id)
+
+    def query(self, signature: np.ndarray, threshold: float, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(id, similarity) of indexed notes at or above threshold, most similar first"""
+        candidates: Set[int] = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(exclude)
+
+        matches = []
+        for id in candidates:
+            score = similarity(signature, self._signatures[id])
+            if score >= threshold:
+                matches.append((id, score))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+
+class SyncedDuplicateIndex:
+    """
+    LSH index over every note's MinHash signature, kept current from
+    "note:<id>" invalidation keys like SyncedTrigramIndex.
+    Hashing every note is slow, so the full load runs on a background thread:
+    started at startup, and again on a wildcard key while the previous index
+    keeps serving. Only a lookup arriving before the first load has finished
+    waits for it. Single notes invalidated meanwhile stay dirty and are re-read
+    on the next lookup, after the new index is swapped in.
+    Writes in this process hand over the signature they already computed
+    through remember(), so the row is not re-read; other processes reload it.
+    loader(db, ids) yields (id, title, content, is_archived) rows, for every
+    note when ids is None.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Session, Optional[List[int]]], Iterable[Tuple[int, str, str, bool]]],
+        session_factory: Callable[[], Session],
+        num_perm: int = 128,
+        bands: int = 32
+    ):
+        self.loader = loader
+        self.session_factory = session_factory
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self._index = LSHIndex(num_perm, bands)
+        self._loaded = threading.Event()
+        self._loading = False
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        self._load = BackgroundRebuild(self._load_all, "duplicate-index-load")
+
+    def signature(self, title: str, content: str) -> np.ndarray:
+        return self.hasher.signature(title, content)
+
+    def new_index(self) -> LSHIndex:
+        """An empty LSH index with the same parameters, e.g. for one import's own rows"""
+        return LSHIndex(self.hasher.num_perm, self.bands)
+
+    def load_in_background(self) -> None:
+        """Start the first full load unless one is already underway"""
+        self._load.start()
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> None:
+        self._load.wait(timeout)
+
+    def handle_invalidation(self, key: str) -> None:
+        namespace, _, ident = key.partition(":")
+        if namespace != "note":
+            return
+        if ident == "*":
+            self._load.request()
+            return
+        with self._lock:
+            self._dirty.add(int(ident))
+
+    def remember(self, id: int, signature: np.ndarray) -> None:
+        """Store the signature computed by a write, which supersedes its pending reload"""
+        with self._lock:
+            if self._loaded.is_set():
+                self._index.add(id, signature)
+                # A load in progress may have read the row before this write
+                if not self._loading:
+                    self._dirty.discard(id)
+
+    def duplicates_of(self, db: Session, id: int, threshold: float) -> Optional[List[Tuple[int, float]]]:
+        """Near-duplicates of an indexed note, or None when the note does not exist"""
+        self._wait_for_first_load()
+        with self._lock:
+            self._sync(db)
+            signature = self._index.signature_of(id)
+            if signature is None:
+                return None
+            return self._index.query(signature, threshold, exclude=id)
+
+    def find(self, db: Session, signature: np.ndarray, threshold: float) -> List[Tuple[int, float]]:
+        """Indexed notes whose estimated similarity to signature reaches threshold"""
+        self._wait_for_first_load()
+        with self._lock:
+            self._sync(db)
+            return self._index.query(signature, threshold)
+
+    def _wait_for_first_load(self) -> None:
+        if self._loaded.is_set():
+            return
+        self._load.start()
+        self._load.wait()
+        if not self._loaded.is_set():
+            raise RuntimeError("The duplicate index could not be loaded")
+
+    def _load_all(self) -> None:
+        with self._lock:
+            self._loading = True
+        try:
+            index = self.new_index()
+            db = self.session_factory()
+            try:
+                for id, title, content, _ in self.loader(db, None):
+                    index.add(id, self.hasher.signature(title, content))
+            finally:
+                db.close()
+            with self._lock:
+                self._index = index
+            self._loaded.set()
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def _sync(self, db: Session) -> None:
+        if self._dirty:
+            ids = sorted(self._dirty)
+            self._dirty.clear()
+            found = set()
+            for id, title, content, _ in self.loader(db, ids):
+                self._index.add(id, self.hasher.signature(title, content))
+                found.add(id)
+            for id in ids:
+                if id not in found:
+                    self._index.remove(id)
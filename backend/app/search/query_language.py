@@ -0,0 +1,143 @@
+"""
+Small query language for note search, e.g.
+
+    title:"release" status:open priority:high due<2026-11-01 cat:work -cat:personal
+
+Terms are ANDed together; a leading "-" negates a term. Bare words and
+quoted phrases match title or content. Archived notes are excluded unless
+the query says is:archived (or -is:active).
+"""
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Tuple, Union
+from ..utils.exceptions import ValidationError
+
+TEXT_FIELDS = {"title", "content"}
+DATE_FIELDS = {"due", "created", "updated"}
+
+# Values accepted per keyword field, mapped onto the stored enum values
+STATUS_VALUES = {
+    "pending": ("pending",),
+    "in_progress": ("in_progress",),
+    "progress": ("in_progress",),
+    "completed": ("completed",),
+    "done": ("completed",),
+    "open": ("pending", "in_progress"),
+}
+PRIORITY_VALUES = {"low", "medium", "high"}
+TYPE_VALUES = {"note", "todo"}
+IS_VALUES = {"archived", "active", "todo", "note"}
+CATEGORY_FIELDS = {"cat", "category"}
+
+_TOKEN = re.compile(
+    r'(?P<neg>-)?'
+    r'(?:(?P<field>[a-z_]+)(?P<op><=|>=|<|>|:|=)(?:"(?P<qvalue>[^"]*)"|(?P<value>\S+))'
+    r'|"(?P<phrase>[^"]*)"'
+    r'|(?P<word>\S+))',
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class TextTerm:
+    """Substring match on title, content, or either when field is None"""
+    value: str
+    field: Optional[str] = None
+    negated: bool = False
+
+
+@dataclass(frozen=True)
+class KeywordTerm:
+    """Exact match on an enumerated field: status, priority, type, is, cat"""
+    field: str
+    values: Tuple[str, ...]
+    negated: bool = False
+
+
+@dataclass(frozen=True)
+class DateTerm:
+    """Comparison against due, created or updated"""
+    field: str
+    op: str
+    value: date
+    negated: bool = False
+
+
+Term = Union[TextTerm, KeywordTerm, DateTerm]
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    terms: Tuple[Term, ...]
+
+
+def _keyword(field: str, value: str, negated: bool) -> KeywordTerm:
+    value = value.lower()
+    if field == "status":
+        if value not in STATUS_VALUES:
+            raise ValidationError(f"Unknown status '{value}'. Use one of: {sorted(STATUS_VALUES)}")
+        return KeywordTerm("status", STATUS_VALUES[value], negated)
+    if field == "priority":
+        if value not in PRIORITY_VALUES:
+            raise ValidationError(f"Unknown priority '{value}'. Use one of: {sorted(PRIORITY_VALUES)}")
+        return KeywordTerm("priority", (value,), negated)
+    if field == "type":
+        if value not in TYPE_VALUES:
+            raise ValidationError(f"Unknown type '{value}'. Use one of: {sorted(TYPE_VALUES)}")
+        return KeywordTerm("type", (value,), negated)
+    if field == "is":
+        if value not in IS_VALUES:
+            raise ValidationError(f"Unknown is: value '{value}'. Use one of: {sorted(IS_VALUES)}")
+        if value in TYPE_VALUES:
+            return KeywordTerm("type", (value,), negated)
+        return KeywordTerm("is", (value,), negated)
+    # Category names keep their case; matching is case-insensitive
+    return KeywordTerm("cat", (value,), negated)
+
+
+def parse_query(text: str) -> SearchQuery:
+    """Parse a query string into a SearchQuery, raising ValidationError on bad input"""
+    if text.count('"') % 2:
+        raise ValidationError('Unterminated quote in query; close it with "')
+
+    terms = []
+    for match in _TOKEN.finditer(text):
+        negated = bool(match.group("neg"))
+        field = match.group("field")
+
+        if field is None:
+            value = match.group("phrase") if match.group("phrase") is not None else match.group("word")
+            if value:
+                terms.append(TextTerm(value, None, negated))
+            continue
+
+        field = field.lower()
+        op = match.group("op")
+        value = match.group("qvalue") if match.group("qvalue") is not None else match.group("value")
+
+        if field in DATE_FIELDS:
+            try:
+                parsed = date.fromisoformat(value)
+            except ValueError:
+                raise ValidationError(f"Invalid date '{value}' for {field}; use YYYY-MM-DD")
+            terms.append(DateTerm(field, "=" if op == ":" else op, parsed, negated))
+            continue
+
+        if op != ":":
+            raise ValidationError(f"Operator '{op}' is only supported on {sorted(DATE_FIELDS)}")
+
+        if field in TEXT_FIELDS:
+            if value:
+                terms.append(TextTerm(value, field, negated))
+        elif field in CATEGORY_FIELDS:
+            terms.append(_keyword("cat", value, negated))
+        elif field in {"status", "priority", "type", "is"}:
+            terms.append(_keyword(field, value, negated))
+        else:
+            # Not a known field: treat "foo:bar" as plain text
+            terms.append(TextTerm(match.group(0).lstrip("-"), None, negated))
+
+    if not terms:
+        raise ValidationError("Query is empty")
+    return SearchQuery(tuple(terms))
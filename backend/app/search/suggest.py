@@ -0,0 +1,289 @@
+import heapq
+import logging
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from .background import BackgroundRebuild
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every character a label can contain, closing a prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+class PrefixIndex:
+    """
+    Prefix autocomplete over short labels (category names, note titles).
+    Labels live in a sorted array of (lower-cased label, id), so a prefix maps
+    to a contiguous slice found with two binary searches; that slice is ranked
+    by usage count. Results for a prefix are memoized until the next change,
+    which keeps broad one-letter prefixes cheap on repeated keystrokes.
+    """
+
+    def __init__(self, memo_size: int = 1024):
+        self._keys: List[Tuple[str, int]] = []
+        self._labels: Dict[int, str] = {}
+        self._usage: Dict[int, int] = {}
+        self._memo: Dict[Tuple[str, int], List[Tuple[int, str, int]]] = {}
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def upsert(self, id: int, label: str) -> None:
+        with self._lock:
+            self._remove(id)
+            self._labels[id] = label
+            insort(self._keys, (label.lower(), id))
+            self._usage.setdefault(id, 0)
+            self._memo.clear()
+
+    def load(self, labels: Iterable[Tuple[int, str]], usage: Optional[Dict[int, int]] = None) -> None:
+        """
+        Replace every label at once with a single sort, instead of one insort
+        per label. Usage comes from usage when given, otherwise it is kept for
+        the ids still present.
+        """
+        labels = dict(labels)
+        keys = sorted((label.lower(), id) for id, label in labels.items())
+        with self._lock:
+            source = self._usage if usage is None else usage
+            self._keys = keys
+            self._labels = labels
+            self._usage = {id: source.get(id, 0) for id in labels}
+            self._memo.clear()
+
+    def remove(self, id: int) -> None:
+        with self._lock:
+            self._remove(id)
+            self._usage.pop(id, None)
+            self._memo.clear()
+
+    def add_usage(self, id: int, delta: int = 1) -> None:
+        with self._lock:
+            if id in self._labels:
+                self._usage[id] = max(0, self._usage.get(id, 0) + delta)
+                self._memo.clear()
+
+    def set_usage(self, id: int, usage: int) -> None:
+        with self._lock:
+            self._usage[id] = usage
+            self._memo.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+            self._labels.clear()
+            self._usage.clear()
+            self._memo.clear()
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[int, str, int]]:
+        """Top (id, label, usage) entries starting with prefix, most used first"""
+        prefix = prefix.lower()
+        with self._lock:
+            memo_key = (prefix, limit)
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+
+            start = bisect_left(self._keys, (prefix,))
+            end = bisect_left(self._keys, (prefix + _PREFIX_END,))
+            top = heapq.nsmallest(
+                limit,
+                (id for _, id in self._keys[start:end]),
+                key=lambda id: (-self._usage.get(id, 0), self._labels[id].lower(), id)
+            )
+            result = [(id, self._labels[id], self._usage.get(id, 0)) for id in top]
+
+            if len(self._memo) >= self._memo_size:
+                self._memo.clear()
+            self._memo[memo_key] = result
+            return result
+
+    def _remove(self, id: int) -> None:
+        label = self._labels.pop(id, None)
+        if label is None:
+            return
+        position = bisect_left(self._keys, (label.lower(), id))
+        if position < len(self._keys) and self._keys[position] == (label.lower(), id):
+            del self._keys[position]
+
+
+class SuggestIndexes:
+    """
+    Category-name and note-title prefix indexes kept in step with the database.
+    Built once at startup and patched from invalidation keys, so suggestions
+    never query the database. Categories rank by how many notes use them
+    (tracked incrementally from each note's links), note titles by how often
+    the note was opened in this process. Archived notes are not suggested.
+    Invalidated IDs are queued and applied in batches on a background thread,
+    so writers never wait on the extra queries; a wildcard key rebuilds there
+    too, and refreshes landing meanwhile are applied again once the rebuilt
+    indexes are swapped in.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self.notes = PrefixIndex()
+        self.categories = PrefixIndex()
+        self._links: Dict[int, FrozenSet[int]] = {}
+        self._category_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        # IDs refreshed while a build is reading, or None when no build is running
+        self._touched_notes: Optional[Set[int]] = None
+        self._touched_categories: Optional[Set[int]] = None
+        self._build_lock = threading.Lock()
+        # Work queued for the background thread
+        self._rebuild_requested = False
+        self._pending_notes: Set[int] = set()
+        self._pending_categories: Set[int] = set()
+        self._background = BackgroundRebuild(self._apply_pending, "suggest-rebuild")
+
+    def build(self) -> None:
+        # One build at a time, so each swaps in its own snapshot and replays its own touched IDs
+        with self._build_lock:
+            self._build()
+
+    def _build(self) -> None:
+        # Repositories import this package (query language), so load them lazily
+        from ..repositories.note_repository import NoteRepository
+        from ..repositories.category_repository import CategoryRepository
+
+        with self._lock:
+            self._touched_notes = set()
+            self._touched_categories = set()
+
+        db = self.session_factory()
+        try:
+            repository = NoteRepository(db)
+            titles = [(id, title) for id, title, is_archived in repository.iter_titles() if not is_archived]
+
+            links: Dict[int, set] = {}
+            category_counts: Counter = Counter()
+            for note_id, category_id in repository.iter_category_links():
+                links.setdefault(note_id, set()).add(category_id)
+                category_counts[category_id] += 1
+
+            names = list(CategoryRepository(db).iter_names())
+        finally:
+            db.close()
+
+        with self._lock:
+            self.notes.load(titles)
+            self.categories.load(names, {id: category_counts[id] for id, _ in names})
+            self._links = {note_id: frozenset(ids) for note_id, ids in links.items()}
+            self._category_counts = category_counts
+            touched_notes, touched_categories = self._touched_notes, self._touched_categories
+            self._touched_notes = self._touched_categories = None
+
+        # Changes committed after the rows above were read
+        self._refresh(touched_notes, touched_categories)
+
+    def request_rebuild(self) -> None:
+        """Rebuild in a background thread, off the thread that published the wildcard"""
+        with self._lock:
+            self._rebuild_requested = True
+        self._background.request()
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> None:
+        """Block until queued refreshes and rebuilds have been applied"""
+        self._background.wait(timeout)
+
+    def record_view(self, note_id: int) -> None:
+        self.notes.add_usage(note_id)
+
+    def handle_invalidation(self, key: str) -> None:
+        namespace, _, ident = key.partition(":")
+        if namespace not in ("note", "category"):
+            return
+        if ident == "*":
+            self.request_rebuild()
+            return
+        try:
+            id = int(ident)
+        except ValueError:
+            logger.warning("Ignoring invalidation key %s", key)
+            return
+        with self._lock:
+            (self._pending_notes if namespace == "note" else self._pending_categories).add(id)
+        self._background.request()
+
+    def _apply_pending(self) -> None:
+        """Run on the background thread: a requested rebuild, then the IDs queued so far"""
+        with self._lock:
+            rebuild, self._rebuild_requested = self._rebuild_requested, False
+            note_ids, self._pending_notes = self._pending_notes, set()
+            category_ids, self._pending_categories = self._pending_categories, set()
+        if rebuild:
+            self.build()
+        self._refresh(note_ids, category_ids)
+
+    def _refresh(self, note_ids: Set[int], category_ids: Set[int]) -> None:
+        # Notes first: a deleted category's refresh then drops what is left of its links
+        if note_ids:
+            self._refresh_notes(note_ids)
+        if category_ids:
+            self._refresh_categories(category_ids)
+
+    def _refresh_notes(self, note_ids: Set[int]) -> None:
+        from ..repositories.note_repository import NoteRepository
+
+        db = self.session_factory()
+        try:
+            repository = NoteRepository(db)
+            titles = {id: (title, is_archived) for id, title, is_archived in repository.iter_titles(list(note_ids))}
+            links: Dict[int, set] = {}
+            for note_id, category_id in repository.iter_category_links(list(note_ids)):
+                links.setdefault(note_id, set()).add(category_id)
+        finally:
+            db.close()
+
+        with self._lock:
+            if self._touched_notes is not None:
+                self._touched_notes.update(note_ids)
+            for note_id in note_ids:
+                row = titles.get(note_id)
+                if row and not row[1]:
+                    self.notes.upsert(note_id, row[0])
+                else:
+                    self.notes.remove(note_id)
+
+                current = frozenset(links.get(note_id, ()))
+                previous = self._links.get(note_id, frozenset())
+                for category_id in previous - current:
+                    self._category_counts[category_id] -= 1
+                    self.categories.set_usage(category_id, self._category_counts[category_id])
+                for category_id in current - previous:
+                    self._category_counts[category_id] += 1
+                    self.categories.set_usage(category_id, self._category_counts[category_id])
+                if current:
+                    self._links[note_id] = current
+                else:
+                    self._links.pop(note_id, None)
+
+    def _refresh_categories(self, category_ids: Set[int]) -> None:
+        from ..repositories.category_repository import CategoryRepository
+
+        db = self.session_factory()
+        try:
+            names = dict(CategoryRepository(db).iter_names(list(category_ids)))
+        finally:
+            db.close()
+
+        with self._lock:
+            if self._touched_categories is not None:
+                self._touched_categories.update(category_ids)
+            for category_id in category_ids:
+                if category_id in names:
+                    self.categories.upsert(category_id, names[category_id])
+                    self.categories.set_usage(category_id, self._category_counts[category_id])
+                    continue
+
+                # Deleting a category drops its links along with it
+                self.categories.remove(category_id)
+                self._category_counts.pop(category_id, None)
+                for note_id, links in list(self._links.items()):
+                    if category_id in links:
+                        self._links[note_id] = links - {category_id}
@@ -0,0 +1,385 @@
+import logging
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[^\W\d_]{2,}")
+
+# Title words count this many times as often as content words
+TITLE_WEIGHT = 2
+
+STOP_WORDS = frozenset("""
+a an and are as at be been but by can do for from had has have he her his how i if in into is it its
+me my no not of on or our she so than that the their them then there these they this to too up us
+was we were what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words of two or more letters, without stop words"""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def term_counts(title: str, content: str) -> Dict[str, int]:
+    """Term frequencies of a note, with title words weighted up"""
+    counts = Counter(tokenize(content))
+    for word in tokenize(title):
+        counts[word] += TITLE_WEIGHT
+    return dict(counts)
+
+
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+
+class TfidfIndex:
+    """
+    Sparse TF-IDF vectors (sublinear tf, smoothed idf, L2-normalized) over note
+    text, for cosine nearest-neighbour queries.
+
+    Compacted documents live in a CSR matrix of raw term counts plus the weighted
+    matrix derived from it. Updates go to a small delta segment weighted with
+    the current idf and the stale rows are masked out, so a single change costs
+    a few vector operations instead of a rebuild. Once the delta outgrows
+    delta_limit the segments are merged and every row is re-weighted.
+    """
+
+    def __init__(self, delta_limit: int = 1000):
+        self.delta_limit = delta_limit
+        self._lock = threading.RLock()
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._row_of) + len(self._delta)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._row_of or doc_id in self._delta
+
+    def clear(self) -> None:
+        with self._lock:
+            self.vocabulary: Dict[str, int] = {}
+            self._df = np.zeros(0, dtype=np.int64)
+            # Compacted segment: raw counts, weighted rows, row -> id, liveness
+            self._counts = sparse.csr_matrix((0, 0), dtype=np.float32)
+            self._weights = sparse.csr_matrix((0, 0), dtype=np.float32)
+            self._row_ids = np.zeros(0, dtype=np.int64)
+            self._row_of: Dict[int, int] = {}
+            self._alive = np.zeros(0, dtype=bool)
+            # Delta segment: id -> (term ids, counts)
+            self._delta: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+            self._delta_matrix: Optional[sparse.csr_matrix] = None
+            self._delta_ids = np.zeros(0, dtype=np.int64)
+
+    def load(self, documents: Iterable[Tuple[int, Dict[str, int]]]) -> None:
+        """Replace the index with (id, term counts) documents in one pass"""
+        with self._lock:
+            self.clear()
+            ids = array("q")
+            indptr = array("q", [0])
+            indices = array("q")
+            data = array("f")
+            for doc_id, counts in documents:
+                for term, count in counts.items():
+                    indices.append(self._term_id(term))
+                    data.append(count)
+                ids.append(doc_id)
+                indptr.append(len(indices))
+
+            vocabulary_size = len(self.vocabulary)
+            self._counts = sparse.csr_matrix(
+                (np.frombuffer(data, dtype=np.float32), np.frombuffer(indices, dtype=np.int64), np.frombuffer(indptr, dtype=np.int64)),
+                shape=(len(ids), vocabulary_size)
+            )
+            self._df = np.bincount(self._counts.indices, minlength=vocabulary_size).astype(np.int64)
+            self._row_ids = np.frombuffer(ids, dtype=np.int64).copy()
+            self._row_of = {int(doc_id): row for row, doc_id in enumerate(self._row_ids)}
+            self._alive = np.ones(len(ids), dtype=bool)
+            self._weights = self._weigh(self._counts, self._idf())
+
+    def upsert(self, doc_id: int, counts: Dict[str, int]) -> None:
+        with self._lock:
+            self._remove(doc_id)
+            terms = np.fromiter((self._term_id(term) for term in counts), dtype=np.int64, count=len(counts))
+            self._df[terms] += 1
+            self._delta[doc_id] = (terms, np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+            self._delta_matrix = None
+            if len(self._delta) > self.delta_limit:
+                self.compact()
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def compact(self) -> None:
+        """Merge the delta into the compacted segment and re-weight with fresh idf"""
+        with self._lock:
+            vocabulary_size = len(self.vocabulary)
+            live_rows = np.flatnonzero(self._alive)
+            main = self._counts[live_rows]
+            main.resize((len(live_rows), vocabulary_size))
+            delta = self._delta_counts(vocabulary_size)
+
+            self._counts = sparse.csr_matrix(sparse.vstack([main, delta], format="csr"), dtype=np.float32)
+            self._row_ids = np.concatenate([self._row_ids[live_rows], self._delta_ids])
+            self._row_of = {int(doc_id): row for row, doc_id in enumerate(self._row_ids)}
+            self._alive = np.ones(len(self._row_ids), dtype=bool)
+            self._delta.clear()
+            self._delta_matrix = None
+            self._delta_ids = np.zeros(0, dtype=np.int64)
+            self._weights = self._weigh(self._counts, self._idf())
+
+    def vector(self, doc_id: int) -> Optional[sparse.csr_matrix]:
+        """Weighted vector of an indexed document, or None"""
+        with self._lock:
+            if doc_id in self._delta:
+                terms, counts = self._delta[doc_id]
+                return self._vectorize(terms, counts)
+            row = self._row_of.get(doc_id)
+            if row is None:
+                return None
+            counts = self._counts[row]
+            return self._vectorize(counts.indices, counts.data)
+
+    def vectorize(self, counts: Dict[str, int]) -> sparse.csr_matrix:
+        """Weighted vector of unindexed text; unknown terms are ignored"""
+        with self._lock:
+            known = [(self.vocabulary[term], count) for term, count in counts.items() if term in self.vocabulary]
+            terms = np.array([term for term, _ in known], dtype=np.int64)
+            values = np.array([count for _, count in known], dtype=np.float32)
+            return self._vectorize(terms, values)
+
+    def nearest(
+        self,
+        queries: sparse.csr_matrix,
+        k: int = 10,
+        exclude: Optional[Sequence[int]] = None,
+        batch_size: int = 64
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Top-k (id, cosine similarity) neighbours for each row of queries.
+        Queries are scored against the whole index in batches of batch_size
+        rows (one sparse matrix product per segment); exclude holds one id
+        per query to leave out, usually the query document itself.
+        """
+        with self._lock:
+            vocabulary_size = len(self.vocabulary)
+            queries = sparse.csr_matrix(queries)
+            queries.resize((queries.shape[0], vocabulary_size))
+            weights = self._weights
+            weights.resize((weights.shape[0], vocabulary_size))
+            delta = self._delta_weights(vocabulary_size)
+            ids = np.concatenate([self._row_ids, self._delta_ids])
+            alive = np.concatenate([self._alive, np.ones(len(self._delta_ids), dtype=bool)])
+
+            results: List[List[Tuple[int, float]]] = []
+            for start in range(0, queries.shape[0], batch_size):
+                batch = queries[start:start + batch_size].T.tocsc()
+                scores = np.vstack([(weights @ batch).toarray(), (delta @ batch).toarray()])
+                scores[~alive] = 0.0
+                for column in range(scores.shape[1]):
+                    query_index = start + column
+                    skip = exclude[query_index] if exclude is not None else None
+                    results.append(self._top(scores[:, column], ids, k, skip))
+            return results
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Arrays describing the compacted index, for saving to disk"""
+        with self._lock:
+            self.compact()
+            terms = [""] * len(self.vocabulary)
+            for term, term_id in self.vocabulary.items():
+                terms[term_id] = term
+            return {
+                "ids": self._row_ids,
+                "terms": np.array(terms, dtype=str),
+                "data": self._counts.data,
+                "indices": self._counts.indices,
+                "indptr": self._counts.indptr
+            }
+
+    def restore(self, state: Dict[str, np.ndarray]) -> None:
+        """Load arrays produced by state()"""
+        with self._lock:
+            self.clear()
+            self.vocabulary = {str(term): term_id for term_id, term in enumerate(state["terms"])}
+            vocabulary_size = len(self.vocabulary)
+            self._row_ids = np.asarray(state["ids"], dtype=np.int64)
+            self._counts = sparse.csr_matrix(
+                (state["data"].astype(np.float32), state["indices"], state["indptr"]),
+                shape=(len(self._row_ids), vocabulary_size)
+            )
+            self._df = np.bincount(self._counts.indices, minlength=vocabulary_size).astype(np.int64)
+            self._row_of = {int(doc_id): row for row, doc_id in enumerate(self._row_ids)}
+            self._alive = np.ones(len(self._row_ids), dtype=bool)
+            self._weights = self._weigh(self._counts, self._idf())
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = len(self.vocabulary)
+            self.vocabulary[term] = term_id
+            if term_id >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(max(1024, len(self._df)), dtype=np.int64)])
+        return term_id
+
+    def _remove(self, doc_id: int) -> None:
+        if doc_id in self._delta:
+            terms, _ = self._delta.pop(doc_id)
+            self._df[terms] -= 1
+            self._delta_matrix = None
+            return
+        row = self._row_of.pop(doc_id, None)
+        if row is not None and self._alive[row]:
+            self._df[self._counts[row].indices] -= 1
+            self._alive[row] = False
+
+    def _idf(self) -> np.ndarray:
+        documents = len(self)
+        df = self._df[:len(self.vocabulary)]
+        return (np.log((1.0 + documents) / (1.0 + df)) + 1.0).astype(np.float32)
+
+    def _weigh(self, counts: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+        weighted = counts.copy()
+        weighted.data = (1.0 + np.log(weighted.data)) * idf[weighted.indices]
+        return _normalize_rows(weighted)
+
+    def _vectorize(self, terms: np.ndarray, counts: np.ndarray) -> sparse.csr_matrix:
+        vocabulary_size = len(self.vocabulary)
+        row = sparse.csr_matrix(
+            (counts, terms, np.array([0, len(terms)])),
+            shape=(1, vocabulary_size),
+            dtype=np.float32
+        )
+        return self._weigh(row, self._idf())
+
+    def _delta_counts(self, vocabulary_size: int) -> sparse.csr_matrix:
+        ids = list(self._delta)
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        for position, doc_id in enumerate(ids):
+            indptr[position + 1] = indptr[position] + len(self._delta[doc_id][0])
+        indices = np.concatenate([self._delta[doc_id][0] for doc_id in ids]) if ids else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([self._delta[doc_id][1] for doc_id in ids]) if ids else np.zeros(0, dtype=np.float32)
+        self._delta_ids = np.array(ids, dtype=np.int64)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(ids), vocabulary_size), dtype=np.float32)
+
+    def _delta_weights(self, vocabulary_size: int) -> sparse.csr_matrix:
+        if self._delta_matrix is None:
+            self._delta_matrix = self._weigh(self._delta_counts(vocabulary_size), self._idf())
+        self._delta_matrix.resize((self._delta_matrix.shape[0], vocabulary_size))
+        return self._delta_matrix
+
+    @staticmethod
+    def _top(scores: np.ndarray, ids: np.ndarray, k: int, exclude: Optional[int]) -> List[Tuple[int, float]]:
+        if exclude is not None:
+            scores[ids == exclude] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+        return [(int(ids[position]), float(scores[position])) for position in ranked]
+
+
+class SyncedTfidfIndex:
+    """
+    TfidfIndex over active notes, loaded on first use and kept current from
+    "note:<id>" invalidation keys like SyncedTrigramIndex. When snapshot_path
+    points at a file written by the offline rebuild, loading restores it and
+    re-reads only the notes changed since, instead of tokenizing everything.
+    loader(db, ids) yields (id, title, content, is_archived) rows, for every
+    note when ids is None; changes(db, since) returns (active ids, ids modified
+    at or after since).
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Session, Optional[List[int]]], Iterable[Tuple[int, str, str, bool]]],
+        changes: Callable[[Session, datetime], Tuple[Set[int], List[int]]],
+        snapshot_path: Optional[str] = None,
+        delta_limit: int = 1000
+    ):
+        self.loader = loader
+        self.changes = changes
+        self.snapshot_path = snapshot_path
+        self._index = TfidfIndex(delta_limit=delta_limit)
+        self._loaded = False
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def handle_invalidation(self, key: str) -> None:
+        namespace, _, ident = key.partition(":")
+        if namespace not in ("note", "related"):
+            return
+        with self._lock:
+            if ident == "*":
+                self._loaded = False
+                self._dirty.clear()
+            elif self._loaded:
+                self._dirty.add(int(ident))
+
+    def related(self, db: Session, note_id: int, title: str, content: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Top-k (id, similarity) active notes most similar to the given note"""
+        with self._lock:
+            self._sync(db)
+            query = self._index.vector(note_id)
+            if query is None:
+                # Archived notes are not indexed but can still have neighbours
+                query = self._index.vectorize(term_counts(title, content))
+            return self._index.nearest(query, k, exclude=[note_id])[0]
+
+    def _sync(self, db: Session) -> None:
+        if not self._loaded:
+            if not (self.snapshot_path and os.path.exists(self.snapshot_path) and self._restore(db)):
+                self._index.load(
+                    (doc_id, term_counts(title, content))
+                    for doc_id, title, content, is_archived in self.loader(db, None)
+                    if not is_archived
+                )
+            self._loaded = True
+            self._dirty.clear()
+            return
+
+        if self._dirty:
+            ids = sorted(self._dirty)
+            self._dirty.clear()
+            self._refresh(db, ids)
+
+    def _restore(self, db: Session) -> bool:
+        try:
+            with np.load(self.snapshot_path) as snapshot:
+                state = {name: snapshot[name] for name in snapshot.files}
+        except (OSError, ValueError):
+            logger.exception("Could not read related-notes snapshot %s", self.snapshot_path)
+            return False
+
+        self._index.restore(state)
+        version = str(state["version"]) if "version" in state else ""
+        since = datetime.fromisoformat(version) if version else datetime.min
+        active, modified = self.changes(db, since)
+        indexed = set(int(doc_id) for doc_id in state["ids"])
+        stale = (indexed ^ active) | set(modified)
+        if stale:
+            self._refresh(db, sorted(stale))
+        return True
+
+    def _refresh(self, db: Session, ids: List[int]) -> None:
+        found = set()
+        for doc_id, title, content, is_archived in self.loader(db, ids):
+            found.add(doc_id)
+            if is_archived:
+                self._index.remove(doc_id)
+            else:
+                self._index.upsert(doc_id, term_counts(title, content))
+        for doc_id in ids:
+            if doc_id not in found:
+                self._index.remove(doc_id)
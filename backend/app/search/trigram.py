@@ -0,0 +1,170 @@
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# LIKE wildcards; a pattern's literal text lies between them
+_LIKE_WILDCARD = re.compile(r"[%_]")
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Trigrams in the style of pg_trgm: lower-cased words padded with two
+    leading blanks and one trailing blank
+    """
+    result = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i:i + 3])
+    return result
+
+
+def substring_trigrams(term: str) -> Set[str]:
+    """
+    Trigrams every text containing term (as LIKE '%term%' matches it) must
+    have: the unpadded trigrams inside each word of the term's literal parts.
+    Empty when the term is too short to narrow anything down.
+    """
+    result = set()
+    for part in _LIKE_WILDCARD.split(term.lower()):
+        for word in _WORD.findall(part):
+            for i in range(len(word) - 2):
+                result.add(word[i:i + 3])
+    return result
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram to document ids.
+    A search only visits the posting lists of the term's own trigrams, so its
+    cost follows how selective the term is rather than the corpus size.
+    The score is the share of the term's trigrams found in the document
+    (like pg_trgm's word_similarity), which tolerates typos and matches
+    fragments of longer words.
+    """
+    
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._documents: Dict[int, Set[str]] = {}
+    
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._documents
+    
+    def add(self, doc_id: int, text: str) -> None:
+        self.remove(doc_id)
+        grams = trigrams(text)
+        self._documents[doc_id] = grams
+        for gram in grams:
+            self._postings[gram].add(doc_id)
+    
+    def remove(self, doc_id: int) -> None:
+        grams = self._documents.pop(doc_id, None)
+        if not grams:
+            return
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+    
+    def clear(self) -> None:
+        self._postings.clear()
+        self._documents.clear()
+    
+    def search(self, term: str, threshold: float = 0.3) -> List[Tuple[int, float]]:
+        """(doc id, score) pairs scoring at least threshold, best first"""
+        grams = trigrams(term)
+        if not grams:
+            return []
+        
+        hits: Counter = Counter()
+        for gram in grams:
+            hits.update(self._postings.get(gram, ()))
+        
+        results = []
+        for doc_id, count in hits.items():
+            score = count / len(grams)
+            if score >= threshold:
+                results.append((doc_id, round(score, 4)))
+        results.sort(key=lambda item: (-item[1], -item[0]))
+        return results
+    
+    def candidates(self, term: str) -> Optional[Set[int]]:
+        """
+        Documents that may contain term as a substring: those holding all of
+        its substring_trigrams, rarest posting first. None when the term has
+        no trigrams, i.e. any document may match.
+        """
+        grams = substring_trigrams(term)
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+
+class SyncedTrigramIndex:
+    """
+    Trigram index over database rows, loaded on first use and kept current
+    from invalidation keys: "<namespace>:<id>" marks a row for reload,
+    "<namespace>:*" schedules a full rebuild. Pending work is applied lazily
+    on the next search with one query.
+    loader(db, ids) yields (id, text) for the given ids, or for every row when ids is None.
+    """
+    
+    def __init__(self, namespace: str, loader: Callable[[Session, Optional[List[int]]], Iterable[Tuple[int, str]]]):
+        self.namespace = namespace
+        self.loader = loader
+        self._index = TrigramIndex()
+        self._loaded = False
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+    
+    def handle_invalidation(self, key: str) -> None:
+        namespace, _, ident = key.partition(":")
+        if namespace != self.namespace:
+            return
+        with self._lock:
+            if ident == "*":
+                self._loaded = False
+                self._dirty.clear()
+            elif self._loaded:
+                self._dirty.add(int(ident))
+    
+    def search(self, db: Session, term: str, threshold: float) -> List[Tuple[int, float]]:
+        with self._lock:
+            self._sync(db)
+            return self._index.search(term, threshold)
+    
+    def candidates(self, db: Session, term: str) -> Optional[Set[int]]:
+        with self._lock:
+            self._sync(db)
+            return self._index.candidates(term)
+    
+    def _sync(self, db: Session) -> None:
+        if not self._loaded:
+            self._index.clear()
+            for doc_id, text in self.loader(db, None):
+                self._index.add(doc_id, text)
+            self._loaded = True
+            self._dirty.clear()
+            return
+        
+        if self._dirty:
+            ids = sorted(self._dirty)
+            self._dirty.clear()
+            found = set()
+            for doc_id, text in self.loader(db, ids):
+                self._index.add(doc_id, text)
+                found.add(doc_id)
+            for doc_id in ids:
+                if doc_id not in found:
+                    self._index.remove(doc_id)
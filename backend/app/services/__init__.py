@@ -1,4 +1,6 @@
 from .note_service import NoteService
 from .category_service import CategoryService
+from .export_service import ExportService
+from .import_service import ImportService
 
-__all__ = ["NoteService", "CategoryService"]
\ No newline at end of file
+__all__ = ["NoteService", "CategoryService", "ExportService", "ImportService"]
\ No newline at end of file
@@ -1,15 +1,27 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 from ..repositories.category_repository import CategoryRepository
-from ..schemas.category import CategoryCreate, CategoryUpdate
+from ..repositories.change_log_repository import ChangeLogRepository
+from ..schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
+from ..schemas.suggestion import Suggestion
+from ..schemas.event import ChangeEvent
 from ..models.category import Category
 from ..utils.exceptions import NotFoundError, DuplicateError
+from ..utils.http_cache import make_etag
+from ..config import settings
+from ..search import get_category_trigram_index, get_suggest_indexes
+from ..cache import get_cache, get_bus, category_key, ALL_CATEGORIES_KEY
+from ..events import get_broker
 
 
 class CategoryService:
     def __init__(self, db: Session):
         self.db = db
         self.repository = CategoryRepository(db)
+        self.cache = get_cache("categories")
+        self.bus = get_bus()
+        self.events = get_broker()
     
     def create_category(self, category_data: CategoryCreate) -> Category:
         existing_category = self.repository.get_by_name(category_data.name)
@@ -17,16 +29,50 @@ class CategoryService:
             raise DuplicateError("Category", "name", category_data.name)
         
         category_dict = category_data.model_dump()
-        return self.repository.create(category_dict)
+        category = self.repository.create(category_dict)
+        self.bus.publish(category_key(category.id))
+        self._announce("created", category.id, category)
+        return category
     
-    def get_category(self, category_id: int) -> Category:
+    def get_category(self, category_id: int) -> CategoryResponse:
+        cached = self.cache.get(category_id)
+        if cached is not None:
+            return cached
+        
+        version = self.cache.version(category_id)
         category = self.repository.get_by_id(category_id)
         if not category:
             raise NotFoundError("Category", category_id)
-        return category
+        
+        result = CategoryResponse.model_validate(category)
+        self.cache.set(category_id, result, version)
+        return result
     
-    def get_all_categories(self) -> List[Category]:
-        return self.repository.get_all(order_by="name")
+    def get_category_etag(self, category_id: int) -> Tuple[str, Optional[datetime]]:
+        last_modified = self.repository.get_version(category_id)
+        if not last_modified:
+            raise NotFoundError("Category", category_id)
+        seq = ChangeLogRepository(self.db).get_entity_seq("category", category_id)
+        return make_etag("category", category_id, seq), last_modified
+    
+    def get_categories_etag(self, *scope, include_notes: bool = False) -> Tuple[str, Optional[datetime]]:
+        """
+        Collection validator for category listings, from the change log.
+        Listings with notes counts also depend on note changes.
+        """
+        seq, last_modified = ChangeLogRepository(self.db).get_latest(None if include_notes else "category")
+        return make_etag("categories", include_notes, seq, *scope), last_modified
+    
+    def get_all_categories(self) -> List[CategoryResponse]:
+        cached = self.cache.get(ALL_CATEGORIES_KEY)
+        if cached is not None:
+            return cached
+        
+        version = self.cache.version(ALL_CATEGORIES_KEY)
+        categories = self.repository.get_all(order_by="name")
+        result = [CategoryResponse.model_validate(category) for category in categories]
+        self.cache.set(ALL_CATEGORIES_KEY, result, version)
+        return result
     
     def get_categories_with_count(self) -> List[dict]:
         categories_with_count = self.repository.get_with_notes_count()
@@ -54,6 +100,8 @@ class CategoryService:
         if not updated_category:
             raise NotFoundError("Category", category_id)
         
+        self._invalidate(category_id)
+        self._announce("updated", category_id, updated_category, update_dict)
         return updated_category
     
     def delete_category(self, category_id: int) -> bool:
@@ -61,7 +109,52 @@ class CategoryService:
         if not category:
             raise NotFoundError("Category", category_id)
         
-        return self.repository.delete(category_id)
+        deleted = self.repository.delete(category_id)
+        self._invalidate(category_id)
+        self._announce("deleted", category_id)
+        return deleted
     
-    def search_categories(self, search_term: str) -> List[Category]:
-        return self.repository.search_by_name(search_term)
\ No newline at end of file
+    def suggest_categories(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        """Categories whose name starts with prefix, most used first; served from memory"""
+        return [
+            Suggestion(id=id, label=label, usage=usage)
+            for id, label, usage in get_suggest_indexes().categories.suggest(prefix, limit)
+        ]
+    
+    def search_categories(
+        self,
+        search_term: str,
+        mode: str = "substring",
+        threshold: Optional[float] = None
+    ) -> List[CategoryResponse]:
+        if mode == "fuzzy":
+            categories = self._fuzzy_search_categories(search_term, threshold or settings.fuzzy_search_threshold)
+        else:
+            categories = self.repository.search_by_name(search_term, self._substring_candidates(search_term))
+        return [CategoryResponse.model_validate(category) for category in categories]
+    
+    def _invalidate(self, category_id: int) -> None:
+        self.bus.publish(category_key(category_id))
+    
+    def _announce(self, action: str, category_id: int, category: Optional[Category] = None, fields: Iterable[str] = ()) -> None:
+        """Tell /events subscribers about a committed change"""
+        version = (category.updated_at or category.created_at) if category is not None else None
+        self.events.publish(ChangeEvent(kind="category", action=action, id=category_id, version=version, fields=list(fields)))
+    
+    def _substring_candidates(self, search_term: str) -> Optional[Set[int]]:
+        """Categories that may contain search_term, from the in-process trigram index; None means check every row"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return None
+        candidates = get_category_trigram_index().candidates(self.db, search_term)
+        if candidates is not None and len(candidates) > settings.substring_candidate_limit:
+            return None
+        return candidates
+    
+    def _fuzzy_search_categories(self, search_term: str, threshold: float) -> List[Category]:
+        if self.db.get_bind().dialect.name == "postgresql":
+            return self.repository.fuzzy_search_by_name(search_term, threshold)
+        
+        ranked = get_category_trigram_index().search(self.db, search_term, threshold)
+        ranked_ids = [category_id for category_id, _ in ranked]
+        categories = {category.id: category for category in self.repository.get_categories_by_ids(ranked_ids)}
+        return [categories[category_id] for category_id in ranked_ids if category_id in categories]
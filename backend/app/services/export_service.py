@@ -0,0 +1,153 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterator, List, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..repositories.note_repository import NoteRepository
+
+# CSV column order; categories are written as a JSON array of names, since names may contain any separator
+EXPORT_FIELDS = [
+    "id", "title", "content", "note_type", "todo_status", "priority",
+    "due_date", "is_archived", "created_at", "updated_at", "categories"
+]
+
+# Typed columnar layout for Arrow/Parquet; enums are dictionary-encoded and timestamps are UTC
+ARROW_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("title", pa.string()),
+    ("content", pa.string()),
+    ("note_type", pa.dictionary(pa.int8(), pa.string())),
+    ("todo_status", pa.dictionary(pa.int8(), pa.string())),
+    ("priority", pa.dictionary(pa.int8(), pa.string())),
+    ("due_date", pa.timestamp("us", tz="UTC")),
+    ("is_archived", pa.bool_()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("updated_at", pa.timestamp("us", tz="UTC")),
+    ("category_ids", pa.list_(pa.int32())),
+])
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    """Streams every matching note as NDJSON, CSV, Arrow or Parquet with flat memory use"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.note_repository = NoteRepository(db)
+    
+    def export_ndjson(
+        self,
+        archived: Optional[bool] = None,
+        note_type: Optional[str] = None,
+        category_ids: Optional[List[int]] = None
+    ) -> Iterator[str]:
+        """One JSON object per note and line, categories as [{"id", "name"}]"""
+        for batch in self._batches(archived, note_type, category_ids):
+            yield "".join(
+                json.dumps({key: _plain(value) for key, value in row.items()}, ensure_ascii=False) + "\n"
+                for row in batch
+            )
+    
+    def export_csv(
+        self,
+        archived: Optional[bool] = None,
+        note_type: Optional[str] = None,
+        category_ids: Optional[List[int]] = None
+    ) -> Iterator[str]:
+        """A header row then one row per note, categories as a JSON array of names"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        yield self._drain(buffer)
+        
+        for batch in self._batches(archived, note_type, category_ids):
+            for row in batch:
+                row["categories"] = json.dumps([category["name"] for category in row["categories"]], ensure_ascii=False)
+                writer.writerow([_plain(row[field]) for field in EXPORT_FIELDS])
+            yield self._drain(buffer)
+    
+    def export_arrow(
+        self,
+        archived: Optional[bool] = None,
+        note_type: Optional[str] = None,
+        category_ids: Optional[List[int]] = None
+    ) -> Iterator[bytes]:
+        """An Arrow IPC stream with one record batch per database batch"""
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(sink, ARROW_SCHEMA) as writer:
+            for batch in self._batches(archived, note_type, category_ids):
+                writer.write_batch(self._record_batch(batch))
+                yield sink.drain()
+        yield sink.drain()
+    
+    def export_parquet(
+        self,
+        archived: Optional[bool] = None,
+        note_type: Optional[str] = None,
+        category_ids: Optional[List[int]] = None
+    ) -> Iterator[bytes]:
+        """A zstd-compressed Parquet file with one row group per database batch"""
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, ARROW_SCHEMA, compression="zstd") as writer:
+            for batch in self._batches(archived, note_type, category_ids):
+                writer.write_batch(self._record_batch(batch))
+                yield sink.drain()
+        yield sink.drain()
+    
+    @staticmethod
+    def _record_batch(rows: List[dict]) -> pa.RecordBatch:
+        columns = {field.name: [] for field in ARROW_SCHEMA}
+        for row in rows:
+            row["category_ids"] = [category["id"] for category in row["categories"]]
+            for name, values in columns.items():
+                value = row[name]
+                values.append(value.value if isinstance(value, enum.Enum) else value)
+        # Naive timestamps (SQLite) are stored in UTC, which is how Arrow reads them
+        return pa.RecordBatch.from_pydict(columns, schema=ARROW_SCHEMA)
+    
+    def _batches(self, archived, note_type, category_ids) -> Iterator[List[dict]]:
+        return self.note_repository.iter_export_batches(
+            archived=archived,
+            note_type=note_type,
+            category_ids=category_ids,
+            batch_size=settings.export_batch_size
+        )
+    
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to a streaming response"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -0,0 +1,265 @@
+import codecs
+import csv
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError as SchemaValidationError
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..repositories.note_repository import NoteRepository
+from ..repositories.category_repository import CategoryRepository
+from ..schemas.bulk import NoteImport, ImportIssue, ImportSummary
+from ..schemas.event import ChangeEvent
+from ..models.note import NoteType, TodoStatus, Priority
+from ..search import get_duplicate_index
+from ..utils.exceptions import ValidationError
+from ..cache import get_bus, note_key, category_key
+from ..cache.bus import WILDCARD
+from ..events import get_broker
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, str]]:
+    """Decode a UTF-8 byte stream into (line number, line) pairs as chunks arrive"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    pending_bytes = 0
+    number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            number += 1
+            yield number, line
+        # A newline is one byte in UTF-8, so the raw chunk tells the size of the unfinished line
+        newline = chunk.rfind(b"\n")
+        pending_bytes = len(chunk) - newline - 1 if newline >= 0 else pending_bytes + len(chunk)
+        if pending_bytes > max_line_bytes:
+            raise ValidationError(f"Line {number + 1} is longer than {max_line_bytes} bytes")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield number + 1, pending
+
+
+async def iter_ndjson_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(line, record, error) per non-blank NDJSON line"""
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[Tuple[int, str]],
+    max_record_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    (line, record, error) per CSV row; the first row is the header and quoted
+    fields may span lines. A row still open after max_record_bytes (e.g. a
+    stray quote) fails on its own and parsing resumes on the next line.
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    pending_bytes = 0
+    open_quote = False
+    start = 0
+    async for number, line in lines:
+        if not pending:
+            start = number
+        pending.append(line)
+        pending_bytes += len(line.encode("utf-8")) + 1
+        # A row is complete once its quotes balance; only the new line can change that
+        open_quote ^= line.count('"') % 2 == 1
+        if open_quote:
+            if pending_bytes > max_record_bytes:
+                yield start, None, f"Record is longer than {max_record_bytes} bytes (unterminated quoted field?)"
+                pending, pending_bytes, open_quote = [], 0, False
+            continue
+        row = next(csv.reader(["\n".join(pending) + "\n"]))
+        pending, pending_bytes = [], 0
+        if not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            header = [cell.strip() for cell in row]
+            continue
+        if len(row) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(row)}"
+            continue
+        # Empty cells mean "not set", like missing NDJSON keys
+        yield start, {key: value for key, value in zip(header, row) if value != ""}, None
+    if pending:
+        yield start, None, "Unterminated quoted field"
+
+
+class ImportService:
+    """
+    Bulk import of notes in batches. Each batch resolves category names
+    (creating missing ones), inserts its notes with one bulk statement and
+    commits, so a bad batch only loses itself, categories included. Caches and
+    in-process indexes are invalidated once, when the import finishes.
+    """
+
+    def __init__(self, db: Session, dedupe: Optional[str] = None):
+        self.db = db
+        self.dedupe = dedupe
+        self.note_repository = NoteRepository(db)
+        self.category_repository = CategoryRepository(db)
+        self.bus = get_bus()
+        self.events = get_broker()
+        self.summary = ImportSummary()
+        self._category_ids: Dict[str, int] = {}
+        self._created_categories: List[int] = []
+        # Created by the current batch; they only exist once it commits
+        self._batch_categories: Dict[str, int] = {}
+        # IDs of the imported notes, until there are too many to invalidate one by one
+        self._imported_ids: Optional[List[int]] = []
+
+    def reject(self, line: int, message: str) -> None:
+        """Count a record that could not be parsed"""
+        self.summary.received += 1
+        self._add_issue(line, message)
+
+    def _add_issue(
+        self,
+        line: int,
+        message: str,
+        duplicate_of: Optional[int] = None,
+        duplicate_of_line: Optional[int] = None,
+        warning: bool = False
+    ) -> None:
+        if not warning:
+            self.summary.failed += 1
+        issues = self.summary.warnings if warning else self.summary.errors
+        if len(issues) < settings.import_max_issues:
+            issues.append(ImportIssue(
+                line=line, message=message, duplicate_of=duplicate_of, duplicate_of_line=duplicate_of_line
+            ))
+        else:
+            self.summary.truncated = True
+
+    def import_batch(self, records: List[Tuple[int, dict]]) -> None:
+        """Validate, insert and commit one batch of (line, raw record) pairs"""
+        self.summary.batches += 1
+        self.summary.received += len(records)
+
+        notes: List[Tuple[int, NoteImport]] = []
+        for line, record in records:
+            try:
+                notes.append((line, NoteImport.model_validate(record)))
+            except SchemaValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                self._add_issue(line, f"{field}: {error['msg']}" if field else error["msg"])
+
+        signatures = self._check_duplicates(notes) if self.dedupe else None
+        if signatures is not None:
+            notes = [(line, note) for line, note in notes if line in signatures]
+        if not notes:
+            return
+
+        self._batch_categories = {}
+        try:
+            category_ids = [[self._category_id(name) for name in note.categories] for _, note in notes]
+            ids = self.note_repository.bulk_insert([self._row(note) for _, note in notes], category_ids)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            # The categories this batch created were rolled back with it
+            for name in self._batch_categories:
+                del self._category_ids[name]
+            for line, _ in notes:
+                self._add_issue(line, f"Batch failed: {e.__class__.__name__}")
+            return
+
+        self._created_categories.extend(self._batch_categories.values())
+        self.summary.imported += len(ids)
+        if self._imported_ids is not None:
+            self._imported_ids.extend(ids)
+            if len(self._imported_ids) > settings.import_max_note_keys:
+                self._imported_ids = None
+        if signatures is not None:
+            # Later batches find these rows through the shared index
+            index = get_duplicate_index()
+            for id, (line, _) in zip(ids, notes):
+                index.remember(id, signatures[line])
+
+    def finish(self) -> ImportSummary:
+        """Invalidate what the import changed and return the report"""
+        self.summary.categories_created = len(self._created_categories)
+        keys = [category_key(id) for id in self._created_categories]
+        events = [ChangeEvent(kind="category", action="created", id=id) for id in self._created_categories]
+        if self._imported_ids is not None:
+            # Few enough to patch caches and indexes note by note
+            keys.extend(note_key(id) for id in self._imported_ids)
+            events.extend(ChangeEvent(kind="note", action="created", id=id) for id in self._imported_ids)
+        else:
+            # Per-note keys and events would flood workers and subscribers; rebuild and refetch instead
+            keys.append(note_key(WILDCARD))
+            events.append(ChangeEvent(kind="note", action="reset"))
+        if keys:
+            self.bus.publish(*keys)
+        if events:
+            self.events.publish(*events)
+        return self.summary
+
+    def _check_duplicates(self, notes: List[Tuple[int, NoteImport]]) -> Dict[int, Any]:
+        """
+        Signatures of the notes that may be inserted, by line; duplicates of
+        existing notes or of earlier rows of this import are reported. Rows of
+        committed batches are already in the shared index, so only this
+        batch's rows are kept locally and memory does not grow with the upload.
+        """
+        index = get_duplicate_index()
+        batch = index.new_index()
+        signatures = {}
+        for line, note in notes:
+            signature = index.signature(note.title, note.content)
+            issue = None
+            existing = index.find(self.db, signature, settings.duplicate_threshold)
+            if existing:
+                issue = {"message": "Near-duplicate of an existing note", "duplicate_of": existing[0][0]}
+            else:
+                earlier = batch.query(signature, settings.duplicate_threshold)
+                if earlier:
+                    issue = {
+                        "message": f"Near-duplicate of line {earlier[0][0]} of this import",
+                        "duplicate_of_line": earlier[0][0]
+                    }
+            if issue is not None:
+                if self.dedupe == "reject":
+                    self._add_issue(line, **issue)
+                    continue
+                self._add_issue(line, warning=True, **issue)
+            signatures[line] = signature
+            batch.add(line, signature)
+        return signatures
+
+    def _category_id(self, name: str) -> int:
+        category_id = self._category_ids.get(name)
+        if category_id is None:
+            category = self.category_repository.get_by_name(name)
+            if category is None:
+                category = self.category_repository.add({"name": name})
+                self._batch_categories[name] = category.id
+            category_id = self._category_ids[name] = category.id
+        return category_id
+
+    @staticmethod
+    def _row(note: NoteImport) -> dict:
+        return {
+            "title": note.title,
+            "content": note.content,
+            "note_type": NoteType(note.note_type.value),
+            "todo_status": TodoStatus(note.todo_status.value),
+            "priority": Priority(note.priority.value),
+            "due_date": note.due_date,
+            "is_archived": note.is_archived,
+            "created_at": note.created_at or datetime.now(timezone.utc)
+        }
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..repositories.job_repository import JobRepository
+from ..schemas.job import JobCreate
+from ..models.job import Job, JobStatus
+from ..utils.exceptions import NotFoundError, ValidationError
+from ..jobs.handlers import HANDLERS
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobService:
+    """Submission and status of background jobs; app.jobs workers run them"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = JobRepository(db)
+
+    def create_job(self, job_data: JobCreate) -> Job:
+        HANDLERS[job_data.kind].validate(self.db, job_data.params)
+        return self.repository.create({
+            "kind": job_data.kind,
+            "params": job_data.params.model_dump(),
+            "status": JobStatus.QUEUED,
+            "max_attempts": job_data.max_attempts or settings.jobs_max_attempts,
+            "run_after": datetime.now(timezone.utc)
+        })
+
+    def get_job(self, job_id: int) -> Job:
+        job = self.repository.get_by_id(job_id)
+        if not job:
+            raise NotFoundError("Job", job_id)
+        return job
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        return self.repository.list_jobs(JobStatus(status) if status else None, limit)
+
+    def cancel_job(self, job_id: int) -> Job:
+        """Stop a job; a running one stops after its current chunk, keeping what it already did"""
+        job = self.get_job(job_id)
+        if job.status in FINISHED_STATUSES:
+            raise ValidationError(f"Job {job_id} has already {job.status.value}")
+        job.status = JobStatus.CANCELLED
+        job.finished_at = datetime.now(timezone.utc)
+        job.locked_by = None
+        self.db.commit()
+        self.db.refresh(job)
+        return job
@@ -1,10 +1,22 @@
-from typing import List, Optional, Tuple
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..config import settings
 from ..repositories.note_repository import NoteRepository
 from ..repositories.category_repository import CategoryRepository
-from ..schemas.note import NoteCreate, NoteUpdate, NoteListResponse
+from ..repositories.change_log_repository import ChangeLogRepository
+from ..schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteListResponse, RelatedNote, DuplicateNote
+from ..schemas.suggestion import Suggestion
+from ..schemas.event import ChangeEvent
 from ..models.note import Note
-from ..utils.exceptions import NotFoundError, ValidationError
+from ..utils.exceptions import NotFoundError, ValidationError, NearDuplicateError
+from ..utils.http_cache import make_etag, latest_timestamp
+from ..utils.cursor import encode_cursor, decode_cursor, encode_score_cursor, decode_score_cursor
+from ..search import get_note_trigram_index, get_suggest_indexes, get_related_index, get_duplicate_index
+from ..search.query_language import parse_query
+from ..cache import get_cache, get_bus, note_key, generations, page_key, NOTES_TABLE, CATEGORIES_TABLE
+from ..events import get_broker
 import math
 
 
@@ -13,8 +25,14 @@ class NoteService:
         self.db = db
         self.note_repository = NoteRepository(db)
         self.category_repository = CategoryRepository(db)
+        self.change_log_repository = ChangeLogRepository(db)
+        self.cache = get_cache("notes")
+        self.page_cache = get_cache("pages")
+        self.bus = get_bus()
+        self.events = get_broker()
     
-    def create_note(self, note_data: NoteCreate) -> Note:
+    def create_note(self, note_data: NoteCreate, signature: Optional[Any] = None) -> Note:
+        """Create a note; signature is its duplicate signature when check_duplicates already computed it"""
         # Validate categories exist
         if note_data.category_ids:
             categories = self.category_repository.get_categories_by_ids(note_data.category_ids)
@@ -32,63 +50,114 @@ class NoteService:
             self.db.commit()
             self.db.refresh(note)
         
-        return self.note_repository.get_by_id_with_categories(note.id)
+        self.bus.publish(note_key(note.id))
+        self._remember_signature(note, signature)
+        note = self.note_repository.get_by_id_with_categories(note.id)
+        self._announce("created", note.id, note)
+        return note
     
-    def get_note(self, note_id: int) -> Note:
+    def get_note(self, note_id: int) -> NoteResponse:
+        get_suggest_indexes().record_view(note_id)
+        cached = self.cache.get(note_id)
+        if cached is not None:
+            return cached
+        
+        version = self.cache.version(note_id)
         note = self.note_repository.get_by_id_with_categories(note_id)
         if not note:
             raise NotFoundError("Note", note_id)
-        return note
+        
+        result = NoteResponse.model_validate(note)
+        self.cache.set(note_id, result, version)
+        return result
+    
+    def get_note_etag(self, note_id: int) -> Tuple[str, Optional[datetime]]:
+        """Validators for one note; the ETag follows the change log, as timestamps may not tell same-second writes apart"""
+        version = self.note_repository.get_version_with_categories(note_id)
+        if not version:
+            raise NotFoundError("Note", note_id)
+        
+        note_modified, _, categories_modified = version
+        etag = make_etag("note", note_id, self.change_log_repository.get_note_seq(note_id))
+        return etag, latest_timestamp(note_modified, categories_modified)
+    
+    def get_notes_etag(self, *scope) -> Tuple[str, Optional[datetime]]:
+        """Collection validator for note listings; scope distinguishes filters and pages"""
+        # Listings embed categories, so any change counts
+        seq, changed_at = self.change_log_repository.get_latest()
+        return make_etag("notes", seq, *scope), changed_at
     
     def get_active_notes(
         self, 
         page: int = 1, 
         page_size: int = 10,
-        category_ids: Optional[List[int]] = None
+        category_ids: Optional[List[int]] = None,
+        cursor: Optional[str] = None
     ) -> NoteListResponse:
-        skip = (page - 1) * page_size
+        key = self._page_key("active", page=page, page_size=page_size, category_ids=category_ids, cursor=cursor)
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            return cached
         
-        notes = self.note_repository.get_active_notes(
+        after = decode_cursor(cursor) if cursor else None
+        skip = 0 if after else (page - 1) * page_size
+        
+        notes, next_cursor = self._with_next_cursor(self.note_repository.get_active_notes(
             skip=skip, 
-            limit=page_size,
-            category_ids=category_ids
-        )
+            limit=page_size + 1,
+            category_ids=category_ids,
+            after=after
+        ), page_size)
         
         total = self.note_repository.count_active_notes(category_ids)
         total_pages = math.ceil(total / page_size) if total > 0 else 0
         
-        return NoteListResponse(
+        result = NoteListResponse(
             notes=notes,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
+        self.page_cache.set(key, result)
+        return result
     
     def get_archived_notes(
         self, 
         page: int = 1, 
         page_size: int = 10,
-        category_ids: Optional[List[int]] = None
+        category_ids: Optional[List[int]] = None,
+        cursor: Optional[str] = None
     ) -> NoteListResponse:
-        skip = (page - 1) * page_size
+        key = self._page_key("archived", page=page, page_size=page_size, category_ids=category_ids, cursor=cursor)
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            return cached
         
-        notes = self.note_repository.get_archived_notes(
+        after = decode_cursor(cursor) if cursor else None
+        skip = 0 if after else (page - 1) * page_size
+        
+        notes, next_cursor = self._with_next_cursor(self.note_repository.get_archived_notes(
             skip=skip, 
-            limit=page_size,
-            category_ids=category_ids
-        )
+            limit=page_size + 1,
+            category_ids=category_ids,
+            after=after
+        ), page_size)
         
         total = self.note_repository.count_archived_notes(category_ids)
         total_pages = math.ceil(total / page_size) if total > 0 else 0
         
-        return NoteListResponse(
+        result = NoteListResponse(
             notes=notes,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
+        self.page_cache.set(key, result)
+        return result
     
     def update_note(self, note_id: int, note_data: NoteUpdate) -> Note:
         note = self.note_repository.get_by_id(note_id)
@@ -115,29 +184,46 @@ class NoteService:
                 note.categories = categories
             else:
                 note.categories = []
+            # Membership changes do not touch the notes row; bump it so validators change
+            note.updated_at = func.now()
             self.db.commit()
             self.db.refresh(note)
         
-        return self.note_repository.get_by_id_with_categories(note_id)
+        self.bus.publish(note_key(note_id))
+        note = self.note_repository.get_by_id_with_categories(note_id)
+        if "title" in update_dict or "content" in update_dict:
+            self._remember_signature(note)
+        fields = list(update_dict) + (["category_ids"] if note_data.category_ids is not None else [])
+        self._announce("updated", note_id, note, fields)
+        return note
     
     def delete_note(self, note_id: int) -> bool:
         note = self.note_repository.get_by_id(note_id)
         if not note:
             raise NotFoundError("Note", note_id)
         
-        return self.note_repository.delete(note_id)
+        deleted = self.note_repository.delete(note_id)
+        self.bus.publish(note_key(note_id))
+        self._announce("deleted", note_id)
+        return deleted
     
     def archive_note(self, note_id: int) -> Note:
         note = self.note_repository.archive_note(note_id)
         if not note:
             raise NotFoundError("Note", note_id)
-        return self.note_repository.get_by_id_with_categories(note_id)
+        self.bus.publish(note_key(note_id))
+        note = self.note_repository.get_by_id_with_categories(note_id)
+        self._announce("updated", note_id, note, ["is_archived"])
+        return note
     
     def unarchive_note(self, note_id: int) -> Note:
         note = self.note_repository.unarchive_note(note_id)
         if not note:
             raise NotFoundError("Note", note_id)
-        return self.note_repository.get_by_id_with_categories(note_id)
+        self.bus.publish(note_key(note_id))
+        note = self.note_repository.get_by_id_with_categories(note_id)
+        self._announce("updated", note_id, note, ["is_archived"])
+        return note
     
     def get_todos(
         self, 
@@ -145,28 +231,42 @@ class NoteService:
         page_size: int = 10,
         status: Optional[str] = None,
         priority: Optional[str] = None,
-        category_ids: Optional[List[int]] = None
+        category_ids: Optional[List[int]] = None,
+        cursor: Optional[str] = None
     ) -> NoteListResponse:
-        skip = (page - 1) * page_size
+        key = self._page_key(
+            "todos", page=page, page_size=page_size, status=status, priority=priority,
+            category_ids=category_ids, cursor=cursor
+        )
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        after = decode_cursor(cursor) if cursor else None
+        skip = 0 if after else (page - 1) * page_size
         
-        notes = self.note_repository.get_todos(
+        notes, next_cursor = self._with_next_cursor(self.note_repository.get_todos(
             skip=skip, 
-            limit=page_size,
+            limit=page_size + 1,
             status=status,
             priority=priority,
-            category_ids=category_ids
-        )
+            category_ids=category_ids,
+            after=after
+        ), page_size)
         
         total = self.note_repository.count_todos(status, priority, category_ids)
         total_pages = math.ceil(total / page_size) if total > 0 else 0
         
-        return NoteListResponse(
+        result = NoteListResponse(
             notes=notes,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
+        self.page_cache.set(key, result)
+        return result
     
     def update_todo_status(self, note_id: int, status: str) -> Note:
         note = self.note_repository.get_by_id(note_id)
@@ -182,16 +282,245 @@ class NoteService:
             raise ValidationError(f"Invalid status. Must be one of: {valid_statuses}")
         
         self.note_repository.update(note_id, {"todo_status": status})
-        return self.note_repository.get_by_id_with_categories(note_id)
+        self.bus.publish(note_key(note_id))
+        note = self.note_repository.get_by_id_with_categories(note_id)
+        self._announce("updated", note_id, note, ["todo_status"])
+        return note
     
     def search_notes(
         self, 
         search_term: str, 
         include_archived: bool = False,
+        category_ids: Optional[List[int]] = None,
+        page: int = 1,
+        page_size: int = 10,
+        mode: str = "substring",
+        threshold: Optional[float] = None,
+        cursor: Optional[str] = None
+    ) -> NoteListResponse:
+        if threshold is None:
+            threshold = settings.fuzzy_search_threshold
+        
+        # Both ILIKE and trigram matching ignore case, so terms differing only in case share a page
+        key = self._page_key(
+            "search", search_term=search_term.lower(), include_archived=include_archived,
+            category_ids=category_ids, page=page, page_size=page_size,
+            mode=mode, threshold=threshold if mode == "fuzzy" else None, cursor=cursor
+        )
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if mode == "fuzzy":
+            after = decode_score_cursor(cursor) if cursor else None
+            skip = 0 if after else (page - 1) * page_size
+            notes, total, next_cursor = self._fuzzy_search_notes(
+                search_term, threshold, include_archived, category_ids, skip, page_size, after
+            )
+        else:
+            after = decode_cursor(cursor) if cursor else None
+            skip = 0 if after else (page - 1) * page_size
+            candidate_ids = self._substring_candidates(search_term)
+            notes, next_cursor = self._with_next_cursor(self.note_repository.search_notes(
+                search_term=search_term,
+                include_archived=include_archived,
+                category_ids=category_ids,
+                skip=skip,
+                limit=page_size + 1,
+                after=after,
+                candidate_ids=candidate_ids
+            ), page_size)
+            total = self.note_repository.count_search_notes(search_term, include_archived, category_ids, candidate_ids)
+        
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
+        
+        result = NoteListResponse(
+            notes=notes,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        )
+        self.page_cache.set(key, result)
+        return result
+    
+    def _substring_candidates(self, search_term: str) -> Optional[Set[int]]:
+        """
+        Notes that may contain search_term, from the in-process trigram index,
+        so ILIKE checks those instead of scanning (pg_trgm indexes serve it on
+        PostgreSQL). None means search every row.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            return None
+        candidates = get_note_trigram_index().candidates(self.db, search_term)
+        if candidates is not None and len(candidates) > settings.substring_candidate_limit:
+            return None
+        return candidates
+    
+    def _fuzzy_search_notes(
+        self,
+        search_term: str,
+        threshold: float,
+        include_archived: bool,
+        category_ids: Optional[List[int]],
+        skip: int,
+        page_size: int,
+        after: Optional[Tuple[float, int]] = None
+    ) -> Tuple[List[Note], int, Optional[str]]:
+        """One page of fuzzy matches, best first, with the total and the cursor of the next page"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            ranked_notes = self.note_repository.fuzzy_search_notes(
+                search_term, threshold, include_archived, category_ids, skip, page_size + 1, after
+            )
+            total = self.note_repository.count_fuzzy_search_notes(
+                search_term, threshold, include_archived, category_ids
+            )
+            next_cursor = self._next_score_cursor([(note.id, score) for note, score in ranked_notes], page_size)
+            return [note for note, _ in ranked_notes[:page_size]], total, next_cursor
+        
+        # Elsewhere rank with the in-process trigram index, then apply the row filters in SQL
+        ranked = get_note_trigram_index().search(self.db, search_term, threshold)
+        visible = self.note_repository.filter_ids([note_id for note_id, _ in ranked], include_archived, category_ids)
+        matching = [(note_id, score) for note_id, score in ranked if note_id in visible]
+        remaining = matching
+        if after is not None:
+            # Same order as the ranking: score descending, then ID descending
+            last_score, last_id = after
+            remaining = [
+                (note_id, score) for note_id, score in matching
+                if score < last_score or (score == last_score and note_id < last_id)
+            ]
+        page_ids = remaining[skip:skip + page_size + 1]
+        notes = self.note_repository.get_by_ids_with_categories([note_id for note_id, _ in page_ids[:page_size]])
+        return notes, len(matching), self._next_score_cursor(page_ids, page_size)
+    
+    def suggest_notes(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        """Active note titles starting with prefix, most viewed first; served from memory"""
+        return [
+            Suggestion(id=id, label=label, usage=usage)
+            for id, label, usage in get_suggest_indexes().notes.suggest(prefix, limit)
+        ]
+    
+    def get_related_notes(self, note_id: int, k: int = 10) -> List[RelatedNote]:
+        """The k active notes most similar to note_id by TF-IDF cosine similarity"""
+        key = self._page_key("related", note_id=note_id, k=k)
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        note = self.note_repository.get_by_id(note_id)
+        if not note:
+            raise NotFoundError("Note", note_id)
+        
+        ranked = get_related_index().related(self.db, note.id, note.title, note.content, k)
+        scores = dict(ranked)
+        notes = self.note_repository.get_by_ids_with_categories([id for id, _ in ranked])
+        result = [
+            RelatedNote(**NoteResponse.model_validate(related).model_dump(), score=round(scores[related.id], 4))
+            for related in notes
+        ]
+        self.page_cache.set(key, result)
+        return result
+    
+    def check_duplicates(self, title: str, content: str, reject: bool = False) -> Tuple[List[int], Any]:
+        """
+        IDs of existing notes that are near-duplicates of the given text, and
+        the text's signature for create_note to reuse; raises
+        NearDuplicateError when reject is set
+        """
+        index = get_duplicate_index()
+        signature = index.signature(title, content)
+        ids = [id for id, _ in index.find(self.db, signature, settings.duplicate_threshold)]
+        if ids and reject:
+            raise NearDuplicateError("Note", ids[0])
+        return ids, signature
+    
+    def get_duplicate_notes(self, note_id: int, threshold: Optional[float] = None) -> List[DuplicateNote]:
+        """Notes whose text is a near-duplicate of note_id, most similar first"""
+        threshold = settings.duplicate_threshold if threshold is None else threshold
+        matches = get_duplicate_index().duplicates_of(self.db, note_id, threshold)
+        if matches is None:
+            raise NotFoundError("Note", note_id)
+        
+        similarities = dict(matches)
+        notes = self.note_repository.get_by_ids_with_categories([id for id, _ in matches])
+        return [
+            DuplicateNote(**NoteResponse.model_validate(note).model_dump(), similarity=round(similarities[note.id], 4))
+            for note in notes
+        ]
+    
+    def query_notes(self, query: str, page: int = 1, page_size: int = 10) -> NoteListResponse:
+        """Run a structured query such as 'status:open priority:high cat:work due<2026-11-01'"""
+        search_query = parse_query(query)
+        
+        # The parsed query is the normalized form, so spacing and term case do not split the cache
+        key = self._page_key("query", query=search_query, page=page, page_size=page_size)
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        skip = (page - 1) * page_size
+        notes = self.note_repository.query_notes(search_query, skip=skip, limit=page_size)
+        total = self.note_repository.count_query_notes(search_query)
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
+        
+        result = NoteListResponse(
+            notes=notes,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages
+        )
+        self.page_cache.set(key, result)
+        return result
+    
+    def stream_search_notes(
+        self,
+        search_term: str,
+        include_archived: bool = False,
         category_ids: Optional[List[int]] = None
-    ) -> List[Note]:
-        return self.note_repository.search_notes(
+    ) -> Iterator[str]:
+        """Yield matching notes as NDJSON lines, capped at search_stream_max_results"""
+        notes = self.note_repository.iter_search_notes(
             search_term=search_term,
             include_archived=include_archived,
-            category_ids=category_ids
-        )
\ No newline at end of file
+            category_ids=category_ids,
+            limit=settings.search_stream_max_results,
+            batch_size=settings.search_stream_batch_size,
+            candidate_ids=self._substring_candidates(search_term)
+        )
+        for note in notes:
+            yield NoteResponse.model_validate(note).model_dump_json() + "\n"
+    
+    def _remember_signature(self, note: Note, signature: Optional[Any] = None) -> None:
+        index = get_duplicate_index()
+        if signature is None:
+            signature = index.signature(note.title, note.content)
+        index.remember(note.id, signature)
+    
+    def _announce(self, action: str, note_id: int, note: Optional[Note] = None, fields: Iterable[str] = ()) -> None:
+        """Tell /events subscribers about a committed change"""
+        version = (note.updated_at or note.created_at) if note is not None else None
+        self.events.publish(ChangeEvent(kind="note", action=action, id=note_id, version=version, fields=list(fields)))
+    
+    def _page_key(self, kind: str, **params):
+        # Read generations before querying: a concurrent write then leaves
+        # this result under a key that is already stale, never a live one
+        return page_key(kind, generations.get(NOTES_TABLE, CATEGORIES_TABLE), **params)
+    
+    @staticmethod
+    def _next_score_cursor(ranked: List[Tuple[int, float]], page_size: int) -> Optional[str]:
+        """Cursor of the page after a score-ranked lookahead of (id, score) pairs"""
+        if len(ranked) <= page_size:
+            return None
+        id, score = ranked[page_size - 1]
+        return encode_score_cursor(score, id)
+    
+    @staticmethod
+    def _with_next_cursor(notes: List[Note], page_size: int) -> Tuple[List[Note], Optional[str]]:
+        """Trim the one-row lookahead and turn its presence into the cursor of the next page"""
+        if len(notes) <= page_size:
+            return notes, None
+        last = notes[page_size - 1]
+        return notes[:page_size], encode_cursor(last.updated_at, last.id)
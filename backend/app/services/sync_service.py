@@ -0,0 +1,56 @@
+from typing import Dict, Tuple
+from sqlalchemy.orm import Session
+from ..repositories.change_log_repository import ChangeLogRepository
+from ..repositories.note_repository import NoteRepository
+from ..repositories.category_repository import CategoryRepository
+from ..schemas.sync import SyncChange, SyncResponse
+from ..schemas.note import NoteResponse
+from ..schemas.category import CategoryResponse
+
+
+class SyncService:
+    """
+    Incremental sync for clients keeping a local copy. A call reads the next
+    entries of the change log after since and returns the current state of
+    each row they mention, once, at the position of its latest change; rows
+    that no longer exist come back as tombstones. The cost follows the number
+    of changes, not the size of the tables.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.change_log_repository = ChangeLogRepository(db)
+        self.note_repository = NoteRepository(db)
+        self.category_repository = CategoryRepository(db)
+
+    def get_changes(self, since: int = 0, limit: int = 500) -> SyncResponse:
+        entries = self.change_log_repository.get_since(since, limit + 1)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        latest: Dict[Tuple[str, int], int] = {}
+        for entry in entries:
+            latest[(entry.kind, entry.entity_id)] = entry.seq
+
+        note_ids = [id for kind, id in latest if kind == "note"]
+        category_ids = [id for kind, id in latest if kind == "category"]
+        notes = {note.id: note for note in self.note_repository.get_by_ids_with_categories(note_ids)}
+        categories = {category.id: category for category in self.category_repository.get_categories_by_ids(category_ids)}
+
+        changes = []
+        for (kind, id), seq in sorted(latest.items(), key=lambda item: item[1]):
+            if kind == "note":
+                note = notes.get(id)
+                change = SyncChange(seq=seq, kind=kind, id=id, deleted=note is None,
+                                    note=NoteResponse.model_validate(note) if note else None)
+            else:
+                category = categories.get(id)
+                change = SyncChange(seq=seq, kind=kind, id=id, deleted=category is None,
+                                    category=CategoryResponse.model_validate(category) if category else None)
+            changes.append(change)
+
+        return SyncResponse(
+            changes=changes,
+            next_since=entries[-1].seq if entries else since,
+            has_more=has_more
+        )
@@ -0,0 +1,293 @@
+"""
+Benchmark repository and service operations at several data sizes.
+
+    python -m app.tools.benchmark --reset --sizes 10000,100000,1000000 \\
+        --database sqlite:///./bench.db --database postgresql://localhost/notes_bench \\
+        --output bench.json --baseline main.json
+
+For every database and size the tables are emptied (which --reset confirms;
+point it at a scratch database), seeded with app.tools.seed, and each
+operation is run --repeat times on a warm session. Every result records wall
+time (median/min/max) and the number of SQL statements issued, since an extra
+query per row is usually the regression worth catching. Caches are disabled so
+the database path is what gets measured.
+
+With --baseline, results are compared per operation and the command exits
+non-zero when one got slower than the tolerance allows or issues more queries.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import event, delete, func, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import engine, SessionLocal, create_tables
+from ..models.note import Note, note_categories
+from ..models.category import Category
+from ..models.change_log import ChangeLog
+from ..repositories.note_repository import NoteRepository
+from ..repositories.category_repository import CategoryRepository
+from ..services.note_service import NoteService
+from ..services.category_service import CategoryService
+from ..schemas.note import NoteCreate, NoteUpdate
+from ..schemas.category import CategoryCreate
+from ..search.query_language import parse_query
+from ..cache import NullCache, register_cache
+from . import seed as seeding
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+# Upper bound on notes linked to the category deleted by the fan-out benchmark
+FAN_OUT_LIMIT = 20000
+
+
+@dataclass
+class Context:
+    size: int
+    note_id: int
+    category_id: int
+    search_term: str
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[Session, Context, Any], Any]
+    # Untimed per-iteration preparation; its return value is passed to run
+    setup: Optional[Callable[[Session, Context], Any]] = None
+
+
+def _created_note(db: Session, context: Context) -> int:
+    return NoteService(db).create_note(NoteCreate(title="Benchmark note", content="Benchmark content")).id
+
+
+def _fanned_out_category(db: Session, context: Context) -> int:
+    category = CategoryRepository(db).create({"name": f"Benchmark {time.perf_counter_ns()}"})
+    note_ids = db.execute(select(Note.id).limit(min(context.size // 10, FAN_OUT_LIMIT))).scalars().all()
+    db.execute(note_categories.insert(), [{"note_id": id, "category_id": category.id} for id in note_ids])
+    db.commit()
+    return category.id
+
+
+def _page(number: int) -> int:
+    return (number - 1) * PAGE_SIZE
+
+
+BENCHMARKS = [
+    # Repositories
+    Benchmark("notes.get_active_notes[page=1]", lambda db, c, _: NoteRepository(db).get_active_notes(0, PAGE_SIZE)),
+    Benchmark("notes.get_active_notes[page=50]", lambda db, c, _: NoteRepository(db).get_active_notes(_page(50), PAGE_SIZE)),
+    Benchmark("notes.get_active_notes[page=500]", lambda db, c, _: NoteRepository(db).get_active_notes(_page(500), PAGE_SIZE)),
+    Benchmark("notes.get_active_notes[category]", lambda db, c, _: NoteRepository(db).get_active_notes(0, PAGE_SIZE, [c.category_id])),
+    Benchmark("notes.count_active_notes", lambda db, c, _: NoteRepository(db).count_active_notes()),
+    Benchmark("notes.count_active_notes[category]", lambda db, c, _: NoteRepository(db).count_active_notes([c.category_id])),
+    Benchmark("notes.get_archived_notes[page=1]", lambda db, c, _: NoteRepository(db).get_archived_notes(0, PAGE_SIZE)),
+    Benchmark("notes.count_archived_notes", lambda db, c, _: NoteRepository(db).count_archived_notes()),
+    Benchmark("notes.get_todos[status=pending]", lambda db, c, _: NoteRepository(db).get_todos(0, PAGE_SIZE, status="pending")),
+    Benchmark("notes.count_todos[status=pending,priority=high]", lambda db, c, _: NoteRepository(db).count_todos("pending", "high")),
+    Benchmark("notes.get_by_id_with_categories", lambda db, c, _: NoteRepository(db).get_by_id_with_categories(c.note_id)),
+    Benchmark("notes.search_notes", lambda db, c, _: NoteRepository(db).search_notes(c.search_term, limit=PAGE_SIZE)),
+    Benchmark("notes.count_search_notes", lambda db, c, _: NoteRepository(db).count_search_notes(c.search_term)),
+    Benchmark(
+        "notes.query_notes[status:open priority:high]",
+        lambda db, c, _: NoteRepository(db).query_notes(parse_query("status:open priority:high"), limit=PAGE_SIZE)
+    ),
+    Benchmark("categories.get_all", lambda db, c, _: CategoryRepository(db).get_all(order_by="name")),
+    Benchmark("categories.get_with_notes_count", lambda db, c, _: CategoryRepository(db).get_with_notes_count()),
+    Benchmark("categories.get_by_name", lambda db, c, _: CategoryRepository(db).get_by_name("Work")),
+    # Services (response building included)
+    Benchmark("NoteService.get_active_notes[page=1]", lambda db, c, _: NoteService(db).get_active_notes(1, PAGE_SIZE)),
+    Benchmark("NoteService.get_active_notes[category]", lambda db, c, _: NoteService(db).get_active_notes(1, PAGE_SIZE, [c.category_id])),
+    Benchmark("NoteService.get_todos[page=1]", lambda db, c, _: NoteService(db).get_todos(1, PAGE_SIZE)),
+    Benchmark("NoteService.search_notes", lambda db, c, _: NoteService(db).search_notes(c.search_term, page_size=PAGE_SIZE)),
+    Benchmark("CategoryService.get_categories_with_count", lambda db, c, _: CategoryService(db).get_categories_with_count()),
+    Benchmark(
+        "NoteService.create_note",
+        lambda db, c, _: NoteService(db).create_note(NoteCreate(title="Benchmark note", content="Benchmark content", category_ids=[c.category_id]))
+    ),
+    Benchmark("NoteService.update_note", lambda db, c, id: NoteService(db).update_note(id, NoteUpdate(title="Updated")), setup=_created_note),
+    Benchmark("NoteService.delete_note", lambda db, c, id: NoteService(db).delete_note(id), setup=_created_note),
+    Benchmark("CategoryService.create_category", lambda db, c, _: CategoryService(db).create_category(CategoryCreate(name=f"Bench {time.perf_counter_ns()}"))),
+    Benchmark("CategoryService.delete_category[fan-out]", lambda db, c, id: CategoryService(db).delete_category(id), setup=_fanned_out_category),
+]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+
+def reset_database() -> None:
+    create_tables()
+    with engine.begin() as connection:
+        connection.execute(delete(note_categories))
+        connection.execute(delete(Note.__table__))
+        connection.execute(delete(Category.__table__))
+        connection.execute(delete(ChangeLog.__table__))
+
+
+def build_context(size: int) -> Context:
+    db = SessionLocal()
+    try:
+        note_id = db.execute(select(func.min(Note.id))).scalar()
+        # The most linked category, i.e. the heaviest filter
+        category_id = db.execute(
+            select(note_categories.c.category_id)
+            .group_by(note_categories.c.category_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).scalar()
+        title = db.execute(select(Note.title).where(Note.id == note_id)).scalar()
+        return Context(size=size, note_id=note_id, category_id=category_id, search_term=title.split()[-1])
+    finally:
+        db.close()
+
+
+def run_benchmarks(size: int, repeat: int, counter: QueryCounter, only: Optional[str]) -> Dict[str, Dict[str, float]]:
+    context = build_context(size)
+    results = {}
+    for benchmark in BENCHMARKS:
+        if only and only not in benchmark.name:
+            continue
+        db = SessionLocal()
+        try:
+            timings = []
+            queries = []
+            # One warm-up iteration, then the measured ones
+            for iteration in range(repeat + 1):
+                argument = benchmark.setup(db, context) if benchmark.setup else None
+                db.expire_all()
+                counter.count = 0
+                started = time.perf_counter()
+                benchmark.run(db, context, argument)
+                elapsed = time.perf_counter() - started
+                if iteration:
+                    timings.append(elapsed * 1000)
+                    queries.append(counter.count)
+        finally:
+            db.close()
+        results[benchmark.name] = {
+            "median_ms": round(statistics.median(timings), 3),
+            "min_ms": round(min(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "queries": max(queries)
+        }
+        logger.info("%-55s %10.2f ms %4d queries", benchmark.name, results[benchmark.name]["median_ms"], results[benchmark.name]["queries"])
+    return results
+
+
+def run_local(sizes: List[int], repeat: int, workers: int, only: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """Benchmark the database in DATABASE_URL; keys are '<dialect>/<size>/<operation>'"""
+    for name in ("notes", "categories", "pages"):
+        register_cache(name, NullCache())
+    counter = QueryCounter()
+    results = {}
+    for size in sizes:
+        logger.info("Seeding %d notes into %s", size, engine.url.render_as_string(hide_password=True))
+        reset_database()
+        seeding.seed(size, 20, 42, workers, 10000)
+        for name, result in run_benchmarks(size, repeat, counter, only).items():
+            results[f"{engine.dialect.name}/{size}/{name}"] = result
+    return results
+
+
+def run_database(url: str, args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """Benchmark another database in a child process configured for it"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as output:
+        path = output.name
+    try:
+        command = [
+            sys.executable, "-m", "app.tools.benchmark", "--reset",
+            "--sizes", ",".join(str(size) for size in args.sizes),
+            "--repeat", str(args.repeat), "--workers", str(args.workers), "--output", path
+        ]
+        if args.only:
+            command += ["--only", args.only]
+        subprocess.run(command, check=True, env={**os.environ, "DATABASE_URL": url, "DEBUG": "false"})
+        with open(path) as f:
+            return json.load(f)["results"]
+    finally:
+        os.remove(path)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float, min_delta_ms: float) -> List[str]:
+    """Descriptions of operations that regressed against the baseline"""
+    regressions = []
+    for key, result in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        slower = result["median_ms"] - base["median_ms"]
+        if slower > min_delta_ms and result["median_ms"] > base["median_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: {base['median_ms']:.2f} -> {result['median_ms']:.2f} ms")
+        if result["queries"] > base["queries"]:
+            regressions.append(f"{key}: {base['queries']} -> {result['queries']} queries")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", action="append", help="Database URL to benchmark; repeatable (default: DATABASE_URL)")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[10000], help="Comma-separated note counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured iterations per operation")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Seeding worker processes")
+    parser.add_argument("--only", help="Run operations whose name contains this text")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this (timer noise)")
+    parser.add_argument("--reset", action="store_true", help="Confirm that the benchmark databases may be emptied")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("benchmarks delete every note and category; pass --reset to confirm")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    results = {}
+    for url in args.database or [settings.database_url]:
+        if url == settings.database_url:
+            results.update(run_local(args.sizes, args.repeat, args.workers, args.only))
+        else:
+            results.update(run_database(url, args))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    logger.info("Wrote %d results to %s", len(results), args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            logger.error("Regression: %s", regression)
+        if regressions:
+            sys.exit(1)
+        logger.info("No regressions against %s", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Run background jobs submitted through /api/v1/jobs.
+
+    python -m app.tools.job_worker --processes 4
+
+Each process runs an app.jobs Worker: it polls the jobs table, claims one
+due job at a time and runs it chunk by chunk. Run as many as the database
+can take; PostgreSQL hands them different jobs with SKIP LOCKED. SIGTERM
+finishes the current chunk and puts the job back in the queue.
+"""
+import argparse
+import logging
+import multiprocessing
+import signal
+from ..database import engine, create_tables
+from ..jobs import Worker
+
+
+def _run_process() -> None:
+    # Forked workers must not share the parent's pooled connections
+    engine.dispose(close=False)
+    worker = Worker()
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    worker.run_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(processName)s %(message)s")
+    create_tables()
+    if args.processes <= 1:
+        _run_process()
+        return
+
+    engine.dispose()
+    processes = [multiprocessing.Process(target=_run_process, name=f"job-worker-{i}") for i in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def shutdown(*_) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Replay the Streamlit frontend's traffic against the API and report latency per route.
+
+    python -m app.tools.loadtest --rps 200 --duration 60 --server-workers 4
+    python -m app.tools.loadtest --url http://localhost:8000 --mix active=60,todos=20,search=20
+
+Without --url the API is started with uvicorn against DATABASE_URL (seed it
+first with app.tools.seed). Traffic is made of page views modelled on
+frontend/main.py: every rerun loads the categories and the three Quick Stats
+counts, then the selected view's list; actions (create, archive, status
+change) are followed by the rerun Streamlit triggers. Page views arrive as a
+Poisson process sized so the request rate averages --rps, and the calls within
+one view run in sequence like the frontend's. Mutating views write to the
+database, so use a scratch one.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+DEFAULT_MIX = "active=45,todos=20,archived=8,search=10,create=5,archive=4,status=8"
+
+
+class Traffic:
+    """Page-view scenarios, with the IDs and terms they draw from"""
+
+    def __init__(self, client: httpx.AsyncClient, stats: "Stats", rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.category_ids: List[int] = []
+        self.note_ids: List[int] = []
+        self.todo_ids: List[int] = []
+        self.terms: List[str] = ["note"]
+
+    async def discover(self) -> None:
+        categories = (await self.client.get(f"{API_PREFIX}/categories/")).json()
+        self.category_ids = [category["id"] for category in categories]
+        notes = (await self.client.get(f"{API_PREFIX}/notes/active", params={"page_size": 100})).json()["notes"]
+        self.note_ids = [note["id"] for note in notes]
+        self.terms = [word for note in notes for word in note["title"].split()[:1]] or self.terms
+        todos = (await self.client.get(f"{API_PREFIX}/notes/todos", params={"page_size": 100})).json()["notes"]
+        self.todo_ids = [todo["id"] for todo in todos]
+
+    async def call(self, route: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, f"{API_PREFIX}{path}", **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(route, time.perf_counter() - started, ok=False)
+            return None
+        self.stats.record(route, time.perf_counter() - started, ok=response.status_code < 400)
+        return response
+
+    async def rerun(self) -> None:
+        # Sidebar: category filter options and the Quick Stats metrics
+        await self.call("GET /categories/", "GET", "/categories/")
+        await self.call("GET /notes/active (stats)", "GET", "/notes/active", params={"page_size": 1})
+        await self.call("GET /notes/todos (stats)", "GET", "/notes/todos", params={"page_size": 1})
+        await self.call("GET /notes/archived (stats)", "GET", "/notes/archived", params={"page_size": 1})
+
+    def _category_filter(self) -> dict:
+        if self.category_ids and self.rng.random() < 0.2:
+            return {"category_ids": [self.rng.choice(self.category_ids)]}
+        return {}
+
+    async def active(self) -> None:
+        await self.rerun()
+        await self.call("GET /notes/active", "GET", "/notes/active", params={"page_size": 50, **self._category_filter()})
+
+    async def todos(self) -> None:
+        await self.rerun()
+        params = {"page_size": 50}
+        if self.rng.random() < 0.3:
+            params["status"] = self.rng.choice(["pending", "in_progress", "completed"])
+        await self.call("GET /notes/todos", "GET", "/notes/todos", params=params)
+
+    async def archived(self) -> None:
+        await self.rerun()
+        await self.call("GET /notes/archived", "GET", "/notes/archived", params={"page_size": 50, **self._category_filter()})
+
+    async def search(self) -> None:
+        await self.rerun()
+        term = self.rng.choice(self.terms)
+        await self.call("GET /notes/search/{term}", "GET", f"/notes/search/{term}", params={"page_size": 50})
+
+    async def create(self) -> None:
+        await self.rerun()
+        body = {"title": f"Load test {self.rng.getrandbits(32):08x}", "content": "Created by the load test"}
+        if self.category_ids and self.rng.random() < 0.5:
+            body["category_ids"] = [self.rng.choice(self.category_ids)]
+        response = await self.call("POST /notes/", "POST", "/notes/", json=body)
+        if response is not None and response.status_code == 201:
+            self.note_ids.append(response.json()["id"])
+        await self.active()
+
+    async def archive(self) -> None:
+        await self.active()
+        if self.note_ids:
+            note_id = self.rng.choice(self.note_ids)
+            action = self.rng.choice(["archive", "unarchive"])
+            await self.call(f"PATCH /notes/{{id}}/{action}", "PATCH", f"/notes/{note_id}/{action}")
+            await self.active()
+
+    async def status(self) -> None:
+        await self.todos()
+        if self.todo_ids:
+            note_id = self.rng.choice(self.todo_ids)
+            status = self.rng.choice(["pending", "in_progress", "completed"])
+            await self.call("PATCH /notes/{id}/status", "PATCH", f"/notes/{note_id}/status", params={"status": status})
+            await self.todos()
+
+
+# Requests each page view makes, for turning --rps into a page-view rate
+CALLS_PER_VIEW = {"active": 5, "todos": 5, "archived": 5, "search": 5, "create": 10, "archive": 11, "status": 11}
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        self.latencies[route].append(seconds * 1000)
+        if not ok:
+            self.errors[route] += 1
+
+    def report(self, duration: float) -> Dict[str, Dict[str, float]]:
+        rows = {}
+        everything = [latency for latencies in self.latencies.values() for latency in latencies]
+        for route, latencies in sorted(self.latencies.items()) + [("TOTAL", everything)]:
+            if not latencies:
+                continue
+            errors = sum(self.errors.values()) if route == "TOTAL" else self.errors[route]
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            rows[route] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / duration, 2),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "error_rate": round(errors / len(latencies), 4)
+            }
+        return rows
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in CALLS_PER_VIEW:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}'; choose from {sorted(CALLS_PER_VIEW)}")
+        mix[name] = float(weight)
+    return mix
+
+
+async def run(url: str, rps: float, duration: float, mix: Dict[str, float], concurrency: int, seed: int) -> Tuple[Stats, float]:
+    stats = Stats()
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        traffic = Traffic(client, stats, rng)
+        await traffic.discover()
+
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        calls_per_view = sum(weights[i] * CALLS_PER_VIEW[name] for i, name in enumerate(names)) / sum(weights)
+        view_rate = rps / calls_per_view
+
+        # Open-loop arrivals: views start on schedule whether or not earlier ones finished,
+        # up to the concurrency cap (beyond it, queueing shows up as latency)
+        slots = asyncio.Semaphore(concurrency)
+        tasks = set()
+
+        async def view(name: str) -> None:
+            async with slots:
+                await getattr(traffic, name)()
+
+        started = time.perf_counter()
+        next_arrival = started
+        while next_arrival - started < duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(view(rng.choices(names, weights)[0]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_arrival += rng.expovariate(view_rate)
+        await asyncio.gather(*tasks)
+        return stats, time.perf_counter() - started
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int) -> Tuple[subprocess.Popen, str]:
+    """Start the API with uvicorn on a free local port and wait until it answers"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env={**os.environ, "DEBUG": "false"}
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API server did not become healthy within 60s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Running API to target (default: start one)")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers when starting the API")
+    parser.add_argument("--rps", type=float, default=50, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to generate load")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Page-view weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=100, help="Maximum page views in flight")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the traffic")
+    parser.add_argument("--output", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args.server_workers)
+    try:
+        logger.info("Replaying %s at %.0f req/s for %.0fs against %s", args.mix, args.rps, args.duration, url)
+        stats, elapsed = asyncio.run(run(url, args.rps, args.duration, args.mix, args.concurrency, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = stats.report(elapsed)
+    print(f"{'route':<34} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, row in report.items():
+        print(
+            f"{route:<34} {row['requests']:>9} {row['rps']:>8.1f} {row['p50_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate']:>7.2%}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rps": args.rps, "duration": elapsed, "mix": args.mix, "routes": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
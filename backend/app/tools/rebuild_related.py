@@ -0,0 +1,108 @@
+"""
+Rebuild the related-notes TF-IDF index offline and write it to a snapshot file.
+
+    python -m app.tools.rebuild_related --output related.npz --workers 8
+
+Notes are split into ID ranges that worker processes read and tokenize in
+parallel; the parent merges their term counts into one sparse matrix. Point
+RELATED_INDEX_PATH at the output and the API restores it on first use,
+re-reading only notes changed since the rebuild started.
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from ..config import settings
+from ..database import engine, SessionLocal
+from ..repositories.note_repository import NoteRepository
+from ..search.tfidf import TfidfIndex, term_counts
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker() -> None:
+    # Forked workers must not share the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def _count_range(id_range: Tuple[int, int]) -> List[Tuple[int, Dict[str, int]]]:
+    """Term counts of the active notes with IDs in [low, high]"""
+    low, high = id_range
+    db = SessionLocal()
+    try:
+        return [
+            (id, term_counts(title, content))
+            for id, title, content, is_archived in NoteRepository(db).iter_documents(min_id=low, max_id=high)
+            if not is_archived
+        ]
+    finally:
+        db.close()
+
+
+def _id_ranges(low: int, high: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + chunk_size - 1, high)) for start in range(low, high + 1, chunk_size)]
+
+
+def rebuild(output: str, workers: int, chunk_size: int, progress: Optional[Callable[[], None]] = None) -> int:
+    """
+    Build the index with a process pool and save it to output; returns the
+    number of notes indexed. progress is called after each ID range is read.
+    """
+    db = SessionLocal()
+    try:
+        repository = NoteRepository(db)
+        # Anything modified at or after this point is re-read when the snapshot is loaded
+        _, version = repository.get_collection_version()
+        low, high = repository.get_id_range()
+    finally:
+        db.close()
+
+    ranges = _id_ranges(low, high, chunk_size) if low is not None else []
+    logger.info("Indexing note IDs %s..%s in %d chunks with %d workers", low, high, len(ranges), workers)
+
+    def documents() -> Iterator[Tuple[int, Dict[str, int]]]:
+        if workers <= 1:
+            for id_range in ranges:
+                yield from _count_range(id_range)
+                if progress:
+                    progress()
+            return
+        engine.dispose()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for chunk in pool.map(_count_range, ranges):
+                yield from chunk
+                if progress:
+                    progress()
+
+    index = TfidfIndex()
+    index.load(documents())
+    state = index.state()
+    state["version"] = np.array(version.isoformat() if version else "")
+
+    # Write next to the target and rename, so a running API never reads half a file
+    temporary = f"{output}.tmp.npz"
+    np.savez_compressed(temporary, **state)
+    os.replace(temporary, output)
+    return len(index)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=settings.related_index_path, help="Snapshot path (default: RELATED_INDEX_PATH)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Note IDs per work unit")
+    args = parser.parse_args()
+    if not args.output:
+        parser.error("--output is required when RELATED_INDEX_PATH is not set")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    started = time.perf_counter()
+    indexed = rebuild(args.output, args.workers, args.chunk_size)
+    logger.info("Indexed %d notes into %s in %.1fs", indexed, args.output, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
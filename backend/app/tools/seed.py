@@ -0,0 +1,276 @@
+"""
+Generate a large synthetic dataset for scale and performance testing.
+
+    python -m app.tools.seed --notes 1000000 --categories 40 --seed 42 --workers 8
+
+Output is deterministic for a given seed and chunk size: every chunk of notes
+draws from its own generator keyed by (seed, chunk number), so the worker count
+does not change the data. Notes get explicit IDs above the current maximum,
+which lets workers write in parallel without round trips for generated keys.
+On PostgreSQL each worker streams its chunks with COPY over its own
+connection; SQLite allows a single writer, so workers only generate and the
+parent inserts each chunk with one executemany.
+
+Distributions: titles of 2-12 words and log-normal content lengths (median
+about 40 words, long tail) over a Zipf-weighted vocabulary; 40% todos, whose
+status skews towards completed; priority skews medium; 15% archived; 0-5
+categories per note with Zipf popularity; timestamps spread over two years.
+"""
+import argparse
+import csv
+import io
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, text
+from ..database import engine, SessionLocal, create_tables, backfill_change_log
+from ..models.note import Note, note_categories, NoteType, TodoStatus, Priority
+from ..models.category import Category
+from ..cache import get_bus, note_key, category_key
+from ..cache.bus import WILDCARD
+
+logger = logging.getLogger(__name__)
+
+VOCABULARY_SIZE = 5000
+SYLLABLES = [
+    "ba", "be", "bi", "bo", "ca", "co", "da", "de", "di", "do", "fa", "fe", "ga", "go", "ka", "ke",
+    "la", "le", "li", "lo", "ma", "me", "mi", "mo", "na", "ne", "ni", "no", "pa", "pe", "pi", "po",
+    "ra", "re", "ri", "ro", "sa", "se", "si", "so", "ta", "te", "ti", "to", "va", "ve", "za", "zo"
+]
+CATEGORY_NAMES = [
+    "Work", "Personal", "Ideas", "Shopping", "Health", "Finance", "Travel", "Reading", "Projects",
+    "Family", "Learning", "Recipes", "Fitness", "Home", "Meetings", "Research", "Music", "Garden",
+    "Writing", "Career"
+]
+
+NOTE_TYPES = [NoteType.NOTE, NoteType.TODO]
+NOTE_TYPE_WEIGHTS = [0.6, 0.4]
+STATUSES = [TodoStatus.PENDING, TodoStatus.IN_PROGRESS, TodoStatus.COMPLETED]
+TODO_STATUS_WEIGHTS = [0.35, 0.15, 0.5]
+PRIORITIES = [Priority.LOW, Priority.MEDIUM, Priority.HIGH]
+PRIORITY_WEIGHTS = [0.3, 0.5, 0.2]
+ARCHIVED_RATIO = 0.15
+CATEGORY_FAN_OUT_WEIGHTS = [0.3, 0.45, 0.15, 0.06, 0.03, 0.01]
+SPAN = timedelta(days=730)
+
+NOTE_COLUMNS = [
+    "id", "title", "content", "note_type", "todo_status", "priority",
+    "due_date", "is_archived", "created_at", "updated_at"
+]
+
+
+def _zipf_weights(size: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+@lru_cache(maxsize=4)
+def build_vocabulary(seed: int) -> List[str]:
+    """Pronounceable pseudo-words, identical in every process for a given seed"""
+    rng = np.random.default_rng([seed, 0xC0FFEE])
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        length = rng.integers(1, 5)
+        words.add("".join(SYLLABLES[i] for i in rng.integers(0, len(SYLLABLES), size=length)))
+    return sorted(words)
+
+
+def _words(rng: np.random.Generator, vocabulary: List[str], lengths: np.ndarray) -> List[str]:
+    indices = rng.choice(len(vocabulary), size=int(lengths.sum()), p=_zipf_weights(len(vocabulary), 1.1))
+    texts = []
+    for chunk in np.split(indices, np.cumsum(lengths)[:-1]):
+        texts.append(" ".join(map(vocabulary.__getitem__, chunk.tolist())))
+    return texts
+
+
+def generate_chunk(
+    seed: int,
+    chunk: int,
+    first_id: int,
+    count: int,
+    category_ids: List[int],
+    now: datetime
+) -> Tuple[List[tuple], List[Tuple[int, int]]]:
+    """Rows (in NOTE_COLUMNS order) and (note_id, category_id) links for one chunk"""
+    rng = np.random.default_rng([seed, chunk])
+    vocabulary = build_vocabulary(seed)
+
+    title_lengths = np.clip(2 + rng.poisson(3, count), 2, 12)
+    content_lengths = np.clip(rng.lognormal(np.log(40), 0.9, count).astype(np.int64), 3, 2000)
+    titles = _words(rng, vocabulary, title_lengths)
+    contents = _words(rng, vocabulary, content_lengths)
+
+    note_types = rng.choice(2, size=count, p=NOTE_TYPE_WEIGHTS)
+    statuses = rng.choice(3, size=count, p=TODO_STATUS_WEIGHTS)
+    priorities = rng.choice(3, size=count, p=PRIORITY_WEIGHTS)
+    archived = rng.random(count) < ARCHIVED_RATIO
+    created_offsets = rng.random(count) * SPAN.total_seconds()
+    updated = rng.random(count) < 0.6
+    updated_offsets = rng.random(count) * created_offsets
+    due = (note_types == 1) & (rng.random(count) < 0.7)
+    due_offsets = rng.integers(-7, 31, size=count)
+    fan_out = rng.choice(len(CATEGORY_FAN_OUT_WEIGHTS), size=count, p=CATEGORY_FAN_OUT_WEIGHTS)
+    if category_ids:
+        # Weighted sampling without replacement for every note at once (Gumbel top-k):
+        # each row ranks the categories by log weight plus Gumbel noise
+        keys = np.log(_zipf_weights(len(category_ids), 1.0)) + rng.gumbel(size=(count, len(category_ids)))
+        ranked = np.argsort(-keys, axis=1)[:, :len(CATEGORY_FAN_OUT_WEIGHTS)]
+
+    rows = []
+    links = []
+    for i in range(count):
+        note_id = first_id + i
+        created_at = now - timedelta(seconds=float(created_offsets[i]))
+        is_todo = note_types[i] == 1
+        rows.append((
+            note_id,
+            titles[i].capitalize()[:200],
+            contents[i].capitalize() + ".",
+            NOTE_TYPES[note_types[i]],
+            STATUSES[statuses[i]] if is_todo else TodoStatus.PENDING,
+            PRIORITIES[priorities[i]],
+            created_at + timedelta(days=int(due_offsets[i])) if due[i] else None,
+            bool(archived[i]),
+            created_at,
+            now - timedelta(seconds=float(updated_offsets[i])) if updated[i] else None
+        ))
+        if category_ids and fan_out[i]:
+            links.extend((note_id, category_ids[j]) for j in ranked[i, :fan_out[i]])
+    return rows, links
+
+
+def _copy(cursor, table: str, columns: List[str], rows) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # PostgreSQL stores the note enums by member name
+        writer.writerow([value.name if isinstance(value, (NoteType, TodoStatus, Priority)) else value for value in row])
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def write_chunk(rows: List[tuple], links: List[Tuple[int, int]]) -> None:
+    """Insert one chunk in its own transaction: COPY on PostgreSQL, executemany elsewhere"""
+    if engine.dialect.name == "postgresql":
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            _copy(cursor, "notes", NOTE_COLUMNS, rows)
+            _copy(cursor, "note_categories", ["note_id", "category_id"], links)
+            connection.commit()
+        finally:
+            connection.close()
+        return
+
+    with engine.begin() as connection:
+        connection.execute(Note.__table__.insert(), [dict(zip(NOTE_COLUMNS, row)) for row in rows])
+        if links:
+            connection.execute(
+                note_categories.insert(),
+                [{"note_id": note_id, "category_id": category_id} for note_id, category_id in links]
+            )
+
+
+def _init_worker() -> None:
+    # Forked workers must not share the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def _seed_chunk(task: tuple) -> Optional[Tuple[List[tuple], List[Tuple[int, int]]]]:
+    write, seed, chunk, first_id, count, category_ids, now = task
+    rows, links = generate_chunk(seed, chunk, first_id, count, category_ids, now)
+    if write:
+        write_chunk(rows, links)
+        return None
+    return rows, links
+
+
+def ensure_categories(count: int) -> List[int]:
+    """IDs of count seed categories, creating the missing ones"""
+    names = [
+        CATEGORY_NAMES[i] if i < len(CATEGORY_NAMES) else f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {i // len(CATEGORY_NAMES) + 1}"
+        for i in range(count)
+    ]
+    db = SessionLocal()
+    try:
+        existing = dict(db.query(Category.name, Category.id).filter(Category.name.in_(names)).all())
+        for name in names:
+            if name not in existing:
+                category = Category(name=name)
+                db.add(category)
+                db.flush()
+                existing[name] = category.id
+        db.commit()
+        return [existing[name] for name in names]
+    finally:
+        db.close()
+
+
+def seed(notes: int, categories: int, random_seed: int, workers: int, chunk_size: int) -> None:
+    create_tables()
+    category_ids = ensure_categories(categories)
+    with engine.connect() as connection:
+        first_id = (connection.execute(func.max(Note.id).select()).scalar() or 0) + 1
+
+    # Workers write in parallel only where the database allows concurrent writers
+    parallel_writes = engine.dialect.name == "postgresql"
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    tasks = [
+        (parallel_writes, random_seed, chunk, first_id + start, min(chunk_size, notes - start), category_ids, now)
+        for chunk, start in enumerate(range(0, notes, chunk_size))
+    ]
+    logger.info("Seeding %d notes from id %d in %d chunks with %d workers", notes, first_id, len(tasks), workers)
+
+    done = 0
+    engine.dispose()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # Keep a bounded number of chunks in flight so generated rows cannot pile up in memory
+        pending = deque()
+        for task in tasks + [None] * (2 * workers):
+            if task is not None:
+                pending.append((task, pool.submit(_seed_chunk, task)))
+            if len(pending) > 2 * workers or (task is None and pending):
+                finished, future = pending.popleft()
+                result = future.result()
+                if result is not None:
+                    write_chunk(*result)
+                done += finished[4]
+                logger.info("%d/%d notes", done, notes)
+
+    if engine.dialect.name == "postgresql":
+        # Explicit IDs bypass the sequence; move it past them
+        with engine.begin() as connection:
+            connection.execute(text("SELECT setval(pg_get_serial_sequence('notes', 'id'), (SELECT max(id) FROM notes))"))
+
+    # Rows were written around the ORM; give /sync clients their change-log entries
+    backfill_change_log()
+
+    # Let running API processes drop caches and rebuild their indexes
+    bus = get_bus()
+    bus.publish(note_key(WILDCARD), category_key(WILDCARD))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=100000, help="Notes to generate")
+    parser.add_argument("--categories", type=int, default=20, help="Categories to spread notes over")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Notes per chunk (part of what the seed reproduces)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    logger.info("Database: %s", engine.url.render_as_string(hide_password=True))
+    started = time.perf_counter()
+    seed(args.notes, args.categories, args.seed, args.workers, args.chunk_size)
+    logger.info("Done in %.1fs", time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
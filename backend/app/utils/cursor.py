@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from .exceptions import ValidationError
+
+# Tags the cursor of score-ranked results, so it cannot be mistaken for a recency cursor
+SCORE_CURSOR_TAG = "score"
+
+
+def _encode(values: list) -> str:
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def encode_cursor(updated_at: Optional[datetime], id: int) -> str:
+    """Opaque keyset cursor for the note after which the next page starts"""
+    return _encode([updated_at.isoformat() if updated_at else None, id])
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """(updated_at, id) encoded by encode_cursor; anything else is a client error"""
+    try:
+        updated_at, id = _decode(cursor)
+        return (datetime.fromisoformat(updated_at) if updated_at else None), int(id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
+
+
+def encode_score_cursor(score: float, id: int) -> str:
+    """Keyset cursor for results ranked by score, then ID"""
+    return _encode([SCORE_CURSOR_TAG, score, id])
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, int]:
+    """(score, id) encoded by encode_score_cursor; anything else is a client error"""
+    try:
+        tag, score, id = _decode(cursor)
+        if tag != SCORE_CURSOR_TAG:
+            raise ValueError(tag)
+        return float(score), int(id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
@@ -30,6 +30,14 @@ class DuplicateError(NotesAppException):
         super().__init__(message, 409)
 
 
+class NearDuplicateError(NotesAppException):
+    """Exception raised when new text is a near-duplicate of an existing resource"""
+    def __init__(self, resource: str, duplicate_id: Any):
+        self.duplicate_id = duplicate_id
+        message = f"{resource} has near-identical text to {resource.lower()} {duplicate_id}"
+        super().__init__(message, 409)
+
+
 def to_http_exception(exception: NotesAppException) -> HTTPException:
     """Convert custom exception to FastAPI HTTPException"""
     return HTTPException(
@@ -0,0 +1,83 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the given version parts"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def latest_timestamp(*values: Optional[datetime]) -> Optional[datetime]:
+    """Most recent of the given timestamps, ignoring missing ones"""
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps; they are stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def format_http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP date (RFC 7231)"""
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison as required for If-None-Match"""
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def request_scope(request: Request) -> tuple:
+    """Path plus normalized query string, so each page and filter gets its own validator"""
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate the conditional headers of a GET request.
+    If-None-Match takes precedence over If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    """Attach validators so clients can revalidate with a conditional GET"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_http_date(last_modified)
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Empty 304 response carrying the current validators"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, last_modified)
+    return response
@@ -0,0 +1,91 @@
+import logging
+import select
+import threading
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def pg_notify(engine: Engine, channel: str, payload: str) -> None:
+    """Send a NOTIFY on channel; PostgreSQL caps payloads at 8000 bytes"""
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+class PgNotifyListener:
+    """
+    Background thread holding a dedicated connection that LISTENs on a channel
+    and hands every payload to a callback.
+    on_connect runs after each (re)connect, since notifications sent while
+    disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str,
+        callback: Callable[[str], None],
+        on_connect: Optional[Callable[[], None]] = None,
+        poll_interval: float = 5.0,
+        retry_interval: float = 2.0
+    ):
+        self.engine = engine
+        self.channel = channel
+        self.callback = callback
+        self.on_connect = on_connect
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"pg-listen-{self.channel}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _connect(self):
+        # Open a connection outside the pool so the listener never holds a pooled slot
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        connection = self.engine.dialect.connect(*cargs, **cparams)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return connection
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                if self.on_connect:
+                    self.on_connect()
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([connection], [], [], self.poll_interval)
+                    if not ready:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        try:
+                            self.callback(notify.payload)
+                        except Exception:
+                            logger.exception("Error handling notification on %s", self.channel)
+            except Exception:
+                logger.exception("Listener on %s lost its connection, retrying", self.channel)
+                self._stop.wait(self.retry_interval)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+# Settings and the engine are created at import time; point them at a scratch SQLite database first
+_database = os.path.join(tempfile.mkdtemp(prefix="notes-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database}"
+os.environ["DEBUG"] = "false"
+os.environ["JOBS_EMBEDDED_WORKERS"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+from app import cache, events, search
+from app.database import Base, SessionLocal, engine, create_tables
+from app.main import app
+
+
+def reset_state() -> None:
+    """Drop the process-wide caches, bus, indexes and broker so each test starts cold"""
+    # Let background rebuilds finish before their tables are dropped
+    if search._suggest_indexes is not None:
+        search._suggest_indexes.wait_until_idle(5)
+    if search._duplicate_index is not None:
+        search._duplicate_index.wait_until_loaded(5)
+    cache._caches.clear()
+    cache._bus = None
+    for name in ("_note_index", "_category_index", "_suggest_indexes", "_related_index", "_duplicate_index"):
+        setattr(search, name, None)
+    events._broker = None
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """Empty tables and cold in-process state for every test"""
+    Base.metadata.drop_all(bind=engine)
+    create_tables()
+    reset_state()
+    yield
+    reset_state()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def api(client):
+    """Helpers for the common calls, relative to /api/v1"""
+    class Api:
+        def __init__(self, client):
+            self.client = client
+        
+        def get(self, path, **kwargs):
+            return self.client.get(f"/api/v1{path}", **kwargs)
+        
+        def post(self, path, **kwargs):
+            return self.client.post(f"/api/v1{path}", **kwargs)
+        
+        def put(self, path, **kwargs):
+            return self.client.put(f"/api/v1{path}", **kwargs)
+        
+        def patch(self, path, **kwargs):
+            return self.client.patch(f"/api/v1{path}", **kwargs)
+        
+        def delete(self, path, **kwargs):
+            return self.client.delete(f"/api/v1{path}", **kwargs)
+        
+        def note(self, title="Note", content="Content", **fields):
+            response = self.post("/notes/", json={"title": title, "content": content, **fields})
+            assert response.status_code == 201, response.text
+            return response.json()
+        
+        def category(self, name="Work", **fields):
+            response = self.post("/categories/", json={"name": name, **fields})
+            assert response.status_code == 201, response.text
+            return response.json()
+    
+    return Api(client)
@@ -0,0 +1,44 @@
+from app.config import settings
+
+
+def _batch(api, *requests, **options):
+    response = api.post("/batch", json={"requests": list(requests), **options})
+    assert response.status_code == 200, response.text
+    return response.json()["responses"]
+
+
+def test_calls_run_in_order_with_their_own_status(api):
+    category = api.category("Work")
+    responses = _batch(
+        api,
+        {"method": "POST", "path": "/notes/", "body": {"title": "First", "content": "a", "category_ids": [category["id"]]}},
+        {"path": "/notes/active", "query": {"page_size": 5, "category_ids": [category["id"]]}},
+        {"path": "/notes/999"},
+        {"method": "POST", "path": "/notes/", "body": {"content": "no title"}}
+    )
+    assert [response["status"] for response in responses] == [201, 200, 404, 422]
+    # Later calls see the writes of earlier ones
+    assert [note["title"] for note in responses[1]["body"]["notes"]] == ["First"]
+    assert responses[1]["headers"]["etag"]
+
+
+def test_conditional_requests_inside_a_batch(api):
+    note = api.note()
+    etag = api.get(f"/notes/{note['id']}").headers["etag"]
+    responses = _batch(api, {"path": f"/notes/{note['id']}", "headers": {"If-None-Match": etag}})
+    assert responses[0]["status"] == 304 and responses[0]["body"] is None
+
+
+def test_concurrent_calls(api):
+    ids = [api.note(f"Note {n}")["id"] for n in range(4)]
+    responses = _batch(api, *({"path": f"/notes/{id}"} for id in ids), concurrent=True)
+    assert [response["body"]["id"] for response in responses] == ids
+
+
+def test_batch_limits(api, monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_requests", 2)
+    response = api.post("/batch", json={"requests": [{"path": "/notes/active"}] * 3})
+    assert response.status_code == 400
+    assert api.post("/batch", json={"requests": [{"path": "/batch"}]}).status_code == 400
+    assert api.post("/batch", json={"requests": [{"path": "/events"}]}).status_code == 400
+    assert api.post("/batch", json={"requests": []}).status_code == 422
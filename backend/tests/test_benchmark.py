@@ -0,0 +1,35 @@
+from sqlalchemy import event
+from app.cache import NullCache, register_cache
+from app.database import engine
+from app.tools.benchmark import BENCHMARKS, QueryCounter, compare, run_benchmarks
+from app.tools.seed import seed
+
+
+def _result(median_ms, queries=1):
+    return {"median_ms": median_ms, "min_ms": median_ms, "max_ms": median_ms, "queries": queries}
+
+
+def test_compare_flags_slower_operations_and_extra_queries():
+    baseline = {"a": _result(10.0), "b": _result(10.0), "c": _result(0.1), "d": _result(5.0, queries=2)}
+    results = {"a": _result(10.5), "b": _result(20.0), "c": _result(0.5), "d": _result(5.0, queries=3), "new": _result(1.0)}
+    # a is within the tolerance and c below the minimum delta; new has no baseline
+    assert compare(results, baseline, tolerance=0.2, min_delta_ms=1.0) == [
+        "b: 10.00 -> 20.00 ms",
+        "d: 2 -> 3 queries"
+    ]
+
+
+def test_every_benchmark_runs():
+    # As run_local does: measure the database, not the caches
+    for name in ("notes", "categories", "pages"):
+        register_cache(name, NullCache())
+    seed(200, 5, 42, workers=1, chunk_size=100)
+    counter = QueryCounter()
+    try:
+        results = run_benchmarks(200, 1, counter, None)
+        only = run_benchmarks(200, 1, counter, "categories.")
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._count)
+    assert set(results) == {benchmark.name for benchmark in BENCHMARKS}
+    assert all(result["queries"] >= 1 and result["min_ms"] <= result["median_ms"] <= result["max_ms"] for result in results.values())
+    assert set(only) == {benchmark.name for benchmark in BENCHMARKS if "categories." in benchmark.name}
@@ -0,0 +1,114 @@
+from app.cache import LRUCache, NullCache, get_cache, get_bus, note_key, category_key
+from app.repositories.note_repository import NoteRepository
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(ttl_seconds=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_set_with_stale_version_is_skipped():
+    cache = LRUCache()
+    version = cache.version("a")
+    cache.delete("a")
+    cache.set("a", "stale", version)
+    assert cache.get("a") is None
+    assert cache.stats()["stale_sets"] == 1
+    
+    cache.set("a", "fresh", cache.version("a"))
+    assert cache.get("a") == "fresh"
+
+
+def test_clear_and_delete_where_invalidate_pending_fills():
+    cache = LRUCache()
+    version = cache.version("a")
+    cache.clear()
+    cache.set("a", "stale", version)
+    assert cache.get("a") is None
+    
+    version = cache.version("a")
+    cache.delete_where(lambda key, value: False)
+    cache.set("a", "stale", version)
+    assert cache.get("a") is None
+
+
+def test_delete_where_drops_only_matches():
+    cache = LRUCache()
+    cache.set(1, "keep")
+    cache.set(2, "drop")
+    cache.delete_where(lambda key, value: value == "drop")
+    assert cache.get(1) == "keep"
+    assert cache.get(2) is None
+
+
+def test_null_cache_stores_nothing():
+    cache = NullCache()
+    cache.set("a", 1, cache.version("a"))
+    assert cache.get("a") is None
+
+
+def test_note_read_is_cached_until_written(api):
+    note = api.note()
+    api.get(f"/notes/{note['id']}")
+    assert get_cache("notes").get(note["id"]) is not None
+    
+    api.put(f"/notes/{note['id']}", json={"title": "Changed"})
+    assert get_cache("notes").get(note["id"]) is None
+    assert api.get(f"/notes/{note['id']}").json()["title"] == "Changed"
+
+
+def test_invalidation_during_read_is_not_cached_over(api, monkeypatch):
+    note = api.note()
+    repository_read = NoteRepository.get_by_id_with_categories
+    
+    def read_then_invalidate(self, id):
+        result = repository_read(self, id)
+        # A write commits and publishes after the read but before the cache fill
+        get_bus().publish(note_key(id))
+        return result
+    
+    monkeypatch.setattr(NoteRepository, "get_by_id_with_categories", read_then_invalidate)
+    api.get(f"/notes/{note['id']}")
+    assert get_cache("notes").get(note["id"]) is None
+
+
+def test_category_invalidation_evicts_only_notes_carrying_it(api):
+    work = api.category(name="Work")
+    home = api.category(name="Home")
+    tagged = api.note(title="Tagged", category_ids=[work["id"]])
+    other = api.note(title="Other", category_ids=[home["id"]])
+    api.get(f"/notes/{tagged['id']}")
+    api.get(f"/notes/{other['id']}")
+    
+    api.put(f"/categories/{work['id']}", json={"color": "#000000"})
+    notes = get_cache("notes")
+    assert notes.get(tagged["id"]) is None
+    assert notes.get(other["id"]) is not None
+    assert api.get(f"/notes/{tagged['id']}").json()["categories"][0]["color"] == "#000000"
+
+
+def test_category_list_cache_follows_writes(api):
+    api.category(name="Work")
+    assert [category["name"] for category in api.get("/categories/").json()] == ["Work"]
+    api.category(name="Home")
+    assert [category["name"] for category in api.get("/categories/").json()] == ["Home", "Work"]
+
+
+def test_category_wildcard_clears_notes(api):
+    note = api.note()
+    api.get(f"/notes/{note['id']}")
+    get_bus().publish(category_key("*"))
+    assert get_cache("notes").get(note["id"]) is None
@@ -0,0 +1,149 @@
+import json
+import threading
+from app.cache import get_bus, note_key
+from app.search import LSHIndex, MinHasher, get_duplicate_index, shingles
+from app.search.minhash import similarity
+
+TEXT = "the quarterly planning meeting covers hiring budget roadmap and the launch schedule for next year"
+
+
+def _ndjson(*notes):
+    return "\n".join(json.dumps(note) for note in notes)
+
+
+def test_shingles_and_similarity():
+    assert shingles("One two") == {"one two"}
+    assert shingles("a b c d") == {"a b c", "b c d"}
+    hasher = MinHasher(128)
+    same = similarity(hasher.signature("Plan", TEXT), hasher.signature("Plan", TEXT))
+    near = similarity(hasher.signature("Plan", TEXT), hasher.signature("Plan", TEXT + " extra"))
+    far = similarity(hasher.signature("Plan", TEXT), hasher.signature("Bread", "flour water salt and a starter"))
+    assert same == 1.0 and near > 0.7 and far < 0.2
+
+
+def test_lsh_query_finds_only_similar_signatures():
+    hasher = MinHasher(128)
+    index = LSHIndex(128, 32)
+    index.add(1, hasher.signature("Plan", TEXT))
+    index.add(2, hasher.signature("Bread", "flour water salt and a starter"))
+    matches = index.query(hasher.signature("Plan", TEXT), 0.8)
+    assert [id for id, _ in matches] == [1]
+    index.remove(1)
+    assert index.query(hasher.signature("Plan", TEXT), 0.8) == []
+
+
+def test_duplicates_endpoint_and_dedupe_on_create(api):
+    original = api.note("Plan", TEXT)
+    copy = api.note("Plan", TEXT + " extra")
+    api.note("Bread", "flour water salt and a starter")
+    
+    duplicates = api.get(f"/notes/{original['id']}/duplicates").json()
+    assert [note["id"] for note in duplicates] == [copy["id"]]
+    assert api.get("/notes/999/duplicates").status_code == 404
+    
+    response = api.post("/notes/", params={"dedupe": "warn"}, json={"title": "Plan", "content": TEXT})
+    assert response.status_code == 201
+    assert set(response.headers["X-Possible-Duplicates"].split(",")) == {str(original["id"]), str(copy["id"])}
+    response = api.post("/notes/", params={"dedupe": "reject"}, json={"title": "Plan", "content": TEXT})
+    assert response.status_code == 409
+    assert response.json()["detail"] in {f"Note has near-identical text to note {id}" for id in (original["id"], copy["id"])}
+
+
+def test_dedupe_on_create_computes_the_signature_once(api, monkeypatch):
+    index = get_duplicate_index()
+    calls = []
+    original = index.signature
+
+    def counting(title, content):
+        calls.append(title)
+        return original(title, content)
+
+    monkeypatch.setattr(index, "signature", counting)
+    created = api.post("/notes/", params={"dedupe": "warn"}, json={"title": "Plan", "content": TEXT}).json()
+    assert calls == ["Plan"]
+    assert [note["id"] for note in api.get(f"/notes/{api.note('Plan', TEXT)['id']}/duplicates").json()] == [created["id"]]
+
+
+def test_index_loads_in_background(client, monkeypatch):
+    index = get_duplicate_index()
+    index.wait_until_loaded(5)
+    assert index._loaded.is_set()
+    
+    # A wildcard reloads on another thread; lookups keep using the current index meanwhile
+    threads = []
+    original = index.loader
+    
+    def recording(db, ids):
+        if ids is None:
+            threads.append(threading.current_thread())
+        return original(db, ids)
+    
+    monkeypatch.setattr(index, "loader", recording)
+    get_bus().publish(note_key("*"))
+    index.wait_until_loaded(5)
+    assert threads and threading.current_thread() not in threads
+
+
+def test_changes_during_a_load_are_reread(api, monkeypatch):
+    index = get_duplicate_index()
+    index.wait_until_loaded(5)
+    note = api.note("Bread", "flour water salt and a starter")
+    original = index.loader
+    
+    def stale(db, ids):
+        rows = list(original(db, ids))
+        if ids is None:
+            # Committed after the load read the old row
+            api.put(f"/notes/{note['id']}", json={"title": "Plan", "content": TEXT})
+        return rows
+    
+    monkeypatch.setattr(index, "loader", stale)
+    get_bus().publish(note_key("*"))
+    index.wait_until_loaded(5)
+    response = api.post("/notes/", params={"dedupe": "reject"}, json={"title": "Plan", "content": TEXT})
+    assert response.status_code == 409
+
+
+def test_import_flags_duplicates_within_the_import(api):
+    existing = api.note("Plan", TEXT)
+    body = _ndjson(
+        {"title": "Bread", "content": "flour water salt and a starter for the weekend loaf"},
+        {"title": "Plan", "content": TEXT},
+        {"title": "Bread", "content": "flour water salt and a starter for the weekend loaf"},
+    )
+    summary = api.post("/import", params={"dedupe": "reject", "batch_size": 10}, content=body).json()
+    assert summary["imported"] == 1
+    assert [(issue["line"], issue["duplicate_of"], issue["duplicate_of_line"]) for issue in summary["errors"]] == [
+        (2, existing["id"], None),
+        (3, None, 1),
+    ]
+
+
+def test_import_checks_rows_against_earlier_batches(api):
+    body = _ndjson(
+        {"title": "Plan", "content": TEXT},
+        {"title": "Plan", "content": TEXT},
+    )
+    summary = api.post("/import", params={"dedupe": "reject", "batch_size": 1}, content=body).json()
+    assert summary["imported"] == 1
+    assert [issue["line"] for issue in summary["errors"]] == [2]
+
+
+def test_import_keeps_only_the_current_batch_locally(api, monkeypatch):
+    index = get_duplicate_index()
+    # The first load builds its index with new_index() too
+    index.wait_until_loaded(5)
+    local = []
+    original = index.new_index
+
+    def recording_new_index():
+        local.append(original())
+        return local[-1]
+
+    monkeypatch.setattr(index, "new_index", recording_new_index)
+    body = _ndjson(*({"title": f"Note {n}", "content": f"{TEXT} {n} {n * 7} {n * 13}"} for n in range(6)))
+    summary = api.post("/import", params={"dedupe": "reject", "batch_size": 2}, content=body).json()
+    assert summary["imported"] == 6
+    # One small index per batch; earlier batches are found through the shared index
+    assert [len(batch) for batch in local] == [2, 2, 2]
+    assert len(index._index) >= 6
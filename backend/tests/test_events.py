@@ -0,0 +1,105 @@
+import asyncio
+import json
+from app.database import engine
+from app.events import ChangeEvent, EventBroker, PostgresEventBroker, get_broker
+
+
+def _event(id, action="updated"):
+    return ChangeEvent(kind="note", action=action, id=id)
+
+
+async def _drain(subscriber):
+    """Everything queued for subscriber once pending callbacks have run"""
+    await asyncio.sleep(0)
+    items = []
+    while not subscriber.queue.empty():
+        items.append(subscriber.queue.get_nowait())
+    return items
+
+
+def test_publish_reaches_every_subscriber():
+    async def main():
+        broker = EventBroker()
+        first, second = broker.subscribe(), broker.subscribe()
+        broker.publish(_event(1), _event(2))
+        return await _drain(first), await _drain(second), broker
+
+    first, second, broker = asyncio.run(main())
+    assert first == second
+    assert [json.loads(payload)["id"] for _, _, payload in first] == [1, 2]
+    assert [id for id, _, _ in first] == [f"{broker.epoch}-1", f"{broker.epoch}-2"]
+
+
+def test_resume_from_last_event_id():
+    async def main():
+        broker = EventBroker(replay_size=2)
+        broker.publish(_event(1), _event(2), _event(3))
+        return broker, {
+            "fresh": broker.subscribe().backlog,
+            "recent": broker.subscribe(f"{broker.epoch}-2").backlog,
+            "expired": broker.subscribe(f"{broker.epoch}-0").backlog,
+            "other_epoch": broker.subscribe("elsewhere-3").backlog,
+            "garbage": broker.subscribe(f"{broker.epoch}-x").backlog
+        }
+
+    broker, backlogs = asyncio.run(main())
+    assert backlogs["fresh"] == []
+    assert [id for id, _, _ in backlogs["recent"]] == [f"{broker.epoch}-3"]
+    assert backlogs["expired"] is None and backlogs["other_epoch"] is None and backlogs["garbage"] is None
+
+
+def test_slow_subscriber_is_dropped():
+    async def main():
+        broker = EventBroker(queue_size=2)
+        subscriber = broker.subscribe()
+        broker.publish(_event(1), _event(2), _event(3))
+        return subscriber, await _drain(subscriber)
+
+    subscriber, items = asyncio.run(main())
+    assert subscriber.dropped and items == [None]
+
+
+def test_stop_ends_every_stream():
+    async def main():
+        broker = EventBroker()
+        subscriber = broker.subscribe()
+        broker.stop()
+        return await _drain(subscriber)
+
+    assert asyncio.run(main()) == [None]
+
+
+def test_writes_publish_change_events(api):
+    async def main():
+        subscriber = get_broker().subscribe()
+        note = await asyncio.to_thread(api.note, "Title")
+        await asyncio.to_thread(api.put, f"/notes/{note['id']}", json={"title": "Renamed"})
+        await asyncio.to_thread(api.delete, f"/notes/{note['id']}")
+        category = await asyncio.to_thread(api.category, "Work")
+        return note, category, await _drain(subscriber)
+
+    note, category, items = asyncio.run(main())
+    events = [json.loads(payload) for _, _, payload in items]
+    assert [(event["kind"], event["action"], event["id"]) for event in events] == [
+        ("note", "created", note["id"]),
+        ("note", "updated", note["id"]),
+        ("note", "deleted", note["id"]),
+        ("category", "created", category["id"])
+    ]
+    assert events[1]["fields"] == ["title"]
+
+
+def test_postgres_broker_skips_its_own_messages():
+    async def main():
+        broker = PostgresEventBroker(engine)
+        subscriber = broker.subscribe()
+        broker._on_message(json.dumps({"origin": broker.origin, "events": [_event(1).model_dump(mode="json")]}))
+        broker._on_message(json.dumps({"origin": "other", "events": [_event(2).model_dump(mode="json")]}))
+        # Reconnecting tells clients to refetch both kinds
+        broker._on_connect()
+        return await _drain(subscriber)
+
+    events = [json.loads(payload) for _, _, payload in asyncio.run(main())]
+    assert [(event["kind"], event["action"], event["id"]) for event in events] == [
+        ("note", "updated", 2), ("note", "reset", None), ("category", "reset", None)
+    ]
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def _seed(api):
+    work = api.category("Work, Inc")
+    first = api.note("First", "Line one\nline two, \"quoted\"", category_ids=[work["id"]])
+    second = api.note("Todo", "Ship it", note_type="todo", priority="high")
+    archived = api.note("Old", "Archived")
+    api.patch(f"/notes/{archived['id']}/archive")
+    return work, first, second, archived
+
+
+def test_ndjson_export(api):
+    work, first, second, archived = _seed(api)
+    response = api.get("/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["id"] for row in rows} == {first["id"], second["id"], archived["id"]}
+    exported = next(row for row in rows if row["id"] == first["id"])
+    assert exported["content"] == first["content"]
+    assert exported["categories"] == [{"id": work["id"], "name": "Work, Inc"}]
+
+
+def test_csv_export_round_trips_awkward_text(api):
+    work, first, _, _ = _seed(api)
+    response = api.get("/export", params={"format": "csv", "archived": False})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    exported = next(row for row in rows if int(row["id"]) == first["id"])
+    assert exported["content"] == first["content"]
+    assert json.loads(exported["categories"]) == ["Work, Inc"]
+
+
+def test_export_filters(api):
+    work, first, second, archived = _seed(api)
+    ids = lambda **params: {json.loads(line)["id"] for line in api.get("/export", params=params).text.splitlines()}
+    assert ids(archived=True) == {archived["id"]}
+    assert ids(note_type="todo") == {second["id"]}
+    assert ids(category_ids=[work["id"]]) == {first["id"]}
+
+
+def test_arrow_export_is_typed(api):
+    work, first, second, _ = _seed(api)
+    response = api.get("/export", params={"format": "arrow"})
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 3
+    assert table.schema.field("due_date").type == pa.timestamp("us", tz="UTC")
+    rows = {row["id"]: row for row in table.to_pylist()}
+    assert rows[first["id"]]["category_ids"] == [work["id"]]
+    assert rows[second["id"]]["priority"] == "high"
+
+
+def test_parquet_export_matches_arrow(api):
+    _seed(api)
+    arrow = pa.ipc.open_stream(api.get("/export", params={"format": "arrow"}).content).read_all()
+    parquet = pq.read_table(io.BytesIO(api.get("/export", params={"format": "parquet"}).content))
+    assert parquet.num_rows == arrow.num_rows
+    assert parquet.column("id").to_pylist() == arrow.column("id").to_pylist()
+
+
+def test_empty_export(api):
+    assert api.get("/export").text == ""
+    assert api.get("/export", params={"format": "csv"}).text.splitlines()[0].startswith("id,title")
+    assert pa.ipc.open_stream(api.get("/export", params={"format": "arrow"}).content).read_all().num_rows == 0
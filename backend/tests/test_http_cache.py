@@ -0,0 +1,96 @@
+from app.utils.http_cache import make_etag
+
+
+def test_note_read_carries_validators(api):
+    note = api.note()
+    response = api.get(f"/notes/{note['id']}")
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert "Last-Modified" in response.headers
+
+
+def test_matching_if_none_match_returns_304(api):
+    note = api.note()
+    etag = api.get(f"/notes/{note['id']}").headers["ETag"]
+    response = api.get(f"/notes/{note['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_weak_and_listed_etags_match(api):
+    note = api.note()
+    etag = api.get(f"/notes/{note['id']}").headers["ETag"]
+    assert api.get(f"/notes/{note['id']}", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert api.get(f"/notes/{note['id']}", headers={"If-None-Match": "*"}).status_code == 304
+    assert api.get(f"/notes/{note['id']}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since(api):
+    note = api.note()
+    last_modified = api.get(f"/notes/{note['id']}").headers["Last-Modified"]
+    assert api.get(f"/notes/{note['id']}", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert api.get(f"/notes/{note['id']}", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+    assert api.get(f"/notes/{note['id']}", headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+
+def test_update_changes_the_etag(api):
+    note = api.note()
+    etag = api.get(f"/notes/{note['id']}").headers["ETag"]
+    list_etag = api.get("/notes/active").headers["ETag"]
+    # Same second as the create: SQLite timestamps cannot tell the writes apart, the validators must
+    api.put(f"/notes/{note['id']}", json={"title": "Changed"})
+    response = api.get(f"/notes/{note['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Changed"
+    assert api.get("/notes/active", headers={"If-None-Match": list_etag}).status_code == 200
+
+
+def test_category_change_changes_note_etag(api):
+    category = api.category()
+    note = api.note(category_ids=[category["id"]])
+    etag = api.get(f"/notes/{note['id']}").headers["ETag"]
+    category_etag = api.get(f"/categories/{category['id']}").headers["ETag"]
+    api.put(f"/categories/{category['id']}", json={"color": "#000000"})
+    assert api.get(f"/notes/{note['id']}", headers={"If-None-Match": etag}).status_code == 200
+    assert api.get(f"/categories/{category['id']}", headers={"If-None-Match": category_etag}).status_code == 200
+
+
+def test_delete_changes_the_list_etag(api):
+    api.note()
+    newest = api.note(title="Newest")
+    etag = api.get("/notes/active").headers["ETag"]
+    # Count and newest timestamp could both come back to an earlier state; the change log only grows
+    api.delete(f"/notes/{newest['id']}")
+    api.note(title="Replacement")
+    assert api.get("/notes/active", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_list_etag_changes_with_collection(api):
+    api.note()
+    etag = api.get("/notes/active").headers["ETag"]
+    assert api.get("/notes/active", headers={"If-None-Match": etag}).status_code == 304
+    # Each page and filter has its own validator
+    assert api.get("/notes/active", params={"page": 2}, headers={"If-None-Match": etag}).status_code == 200
+    api.note(title="Another")
+    assert api.get("/notes/active", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_category_reads(api):
+    category = api.category()
+    etag = api.get(f"/categories/{category['id']}").headers["ETag"]
+    assert api.get(f"/categories/{category['id']}", headers={"If-None-Match": etag}).status_code == 304
+    list_etag = api.get("/categories/").headers["ETag"]
+    assert api.get("/categories/", headers={"If-None-Match": list_etag}).status_code == 304
+    api.category(name="Home")
+    assert api.get("/categories/", headers={"If-None-Match": list_etag}).status_code == 200
+
+
+def test_missing_note_is_404_not_304(api):
+    assert api.get("/notes/999", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_make_etag_is_stable():
+    assert make_etag("note", 1, None) == make_etag("note", 1, None)
+    assert make_etag("note", 1) != make_etag("note", 2)
@@ -0,0 +1,126 @@
+import json
+from app.cache import get_bus, note_key, category_key
+from app.cache.bus import WILDCARD
+from app.config import settings
+from app.repositories.note_repository import NoteRepository
+
+
+def _ndjson(*notes):
+    return "\n".join(json.dumps(note) for note in notes)
+
+
+def test_import_ndjson_and_csv(api):
+    summary = api.post("/import", content=_ndjson(
+        {"title": "One", "content": "first", "categories": ["work"]},
+        {"title": "Two", "content": "second", "categories": [{"id": 9, "name": "work"}, "home"]}
+    )).json()
+    assert summary["imported"] == 2 and summary["categories_created"] == 2 and summary["errors"] == []
+
+    body = 'title,content,categories\nThree,"spans\ntwo lines","[""work""]"\n'
+    summary = api.post("/import", params={"format": "csv"}, content=body).json()
+    assert summary["imported"] == 1 and summary["categories_created"] == 0
+    titles = {note["title"] for note in api.get("/notes/active", params={"page_size": 10}).json()["notes"]}
+    assert titles == {"One", "Two", "Three"}
+
+
+def test_import_reports_bad_records(api):
+    body = "\n".join([
+        json.dumps({"title": "Good", "content": "kept"}),
+        "{not json",
+        "[1, 2]",
+        json.dumps({"content": "no title"})
+    ])
+    summary = api.post("/import", content=body).json()
+    assert summary["received"] == 4 and summary["imported"] == 1 and summary["failed"] == 3
+    assert [error["line"] for error in summary["errors"]] == [2, 3, 4]
+    assert summary["errors"][0]["message"].startswith("Invalid JSON")
+    assert summary["errors"][1]["message"] == "Expected a JSON object"
+
+    body = 'title,content\nOk,fine\nToo,many,cells\nOpen,"never closed\n'
+    summary = api.post("/import", params={"format": "csv"}, content=body).json()
+    assert summary["imported"] == 1
+    assert [error["message"] for error in summary["errors"]] == ["Expected 2 columns, got 3", "Unterminated quoted field"]
+
+
+def test_import_issue_list_is_capped(api, monkeypatch):
+    monkeypatch.setattr(settings, "import_max_issues", 2)
+    summary = api.post("/import", content="x\ny\nz").json()
+    assert summary["failed"] == 3 and len(summary["errors"]) == 2 and summary["truncated"]
+
+
+def test_line_limit_counts_bytes(api, monkeypatch):
+    monkeypatch.setattr(settings, "import_max_line_bytes", 40)
+    # 16 characters but 48 bytes in UTF-8
+    line = json.dumps({"title": "ééé", "content": "€€€"}, ensure_ascii=False)
+    assert len(line) <= 40 < len(line.encode("utf-8"))
+    response = api.post("/import", content=line.encode("utf-8"))
+    assert response.status_code == 400
+    assert "longer than 40 bytes" in response.json()["detail"]
+
+
+def test_failed_batch_rolls_back_its_categories(api, monkeypatch):
+    original = NoteRepository.bulk_insert
+    calls = []
+
+    def failing_once(self, rows, category_ids):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        return original(self, rows, category_ids)
+
+    monkeypatch.setattr(NoteRepository, "bulk_insert", failing_once)
+    body = _ndjson(
+        {"title": "Lost", "content": "first batch", "categories": ["fresh"]},
+        {"title": "Kept", "content": "second batch", "categories": ["fresh"]}
+    )
+    summary = api.post("/import", params={"batch_size": 1}, content=body).json()
+    assert summary["imported"] == 1 and summary["failed"] == 1
+    assert summary["errors"][0]["message"].startswith("Batch failed")
+    # The rolled-back category is created again by the next batch, and only counted once
+    assert summary["categories_created"] == 1
+    categories = api.get("/categories/").json()
+    assert [category["name"] for category in categories] == ["fresh"]
+    notes = api.get("/notes/active").json()["notes"]
+    assert [note["title"] for note in notes] == ["Kept"]
+    assert [category["name"] for category in notes[0]["categories"]] == ["fresh"]
+
+
+def test_small_import_invalidates_per_note(api, monkeypatch):
+    published = []
+    get_bus().subscribe(published.append)
+    summary = api.post("/import", content=_ndjson(
+        {"title": "One", "content": "a", "categories": ["work"]},
+        {"title": "Two", "content": "b"}
+    )).json()
+    assert summary["imported"] == 2
+    ids = [note["id"] for note in api.get("/notes/active").json()["notes"]]
+    category_id = api.get("/categories/").json()[0]["id"]
+    assert sorted(published) == sorted([category_key(category_id)] + [note_key(id) for id in ids])
+
+    # Past the limit one wildcard replaces the per-note keys
+    monkeypatch.setattr(settings, "import_max_note_keys", 2)
+    published.clear()
+    body = _ndjson(*({"title": f"Bulk {n}", "content": "c"} for n in range(3)))
+    assert api.post("/import", params={"batch_size": 2}, content=body).json()["imported"] == 3
+    assert published == [note_key(WILDCARD)]
+
+
+def test_empty_import_publishes_nothing(api):
+    published = []
+    get_bus().subscribe(published.append)
+    summary = api.post("/import", content=b"").json()
+    assert summary["received"] == 0 and summary["imported"] == 0
+    assert published == []
+
+
+def test_unterminated_csv_quote_fails_one_bounded_record(api, monkeypatch):
+    monkeypatch.setattr(settings, "import_max_line_bytes", 60)
+    rows = [f"Row {n},content {n}" for n in range(20)]
+    body = "\n".join(["title,content", 'Broken,"never closed'] + rows) + "\n"
+    summary = api.post("/import", params={"format": "csv"}, content=body).json()
+    assert summary["errors"][0]["line"] == 2
+    assert summary["errors"][0]["message"].startswith("Record is longer than 60 bytes")
+    # Only the lines within the limit were swallowed; parsing resumed after them
+    assert 10 < summary["imported"] < 20
+    titles = {note["title"] for note in api.get("/notes/active", params={"page_size": 100}).json()["notes"]}
+    assert "Row 19" in titles
@@ -0,0 +1,72 @@
+import json
+from app.cache import InvalidationBus, PostgresInvalidationBus, get_bus, note_key, category_key
+from app.cache.bus import parse_key, WILDCARD
+from app.database import engine
+
+
+def test_keys_round_trip():
+    assert parse_key(note_key(7)) == ("note", "7")
+    assert parse_key(category_key(WILDCARD)) == ("category", WILDCARD)
+
+
+def test_publish_reaches_every_subscriber():
+    bus = InvalidationBus()
+    first, second = [], []
+    bus.subscribe(first.append)
+    bus.subscribe(second.append)
+    bus.publish(note_key(1), note_key(2))
+    assert first == second == ["note:1", "note:2"]
+
+
+def test_failing_handler_does_not_stop_delivery():
+    bus = InvalidationBus()
+    received = []
+    
+    def broken(key):
+        raise RuntimeError(key)
+    
+    bus.subscribe(broken)
+    bus.subscribe(received.append)
+    bus.publish(note_key(1))
+    assert received == ["note:1"]
+
+
+def test_postgres_bus_skips_its_own_messages():
+    bus = PostgresInvalidationBus(engine)
+    received = []
+    bus.subscribe(received.append)
+    
+    bus._on_message(json.dumps({"origin": bus.origin, "keys": ["note:1"]}))
+    assert received == []
+    
+    bus._on_message(json.dumps({"origin": "other-worker", "keys": ["note:1", "category:2"]}))
+    assert received == ["note:1", "category:2"]
+
+
+def test_postgres_bus_flushes_on_reconnect():
+    bus = PostgresInvalidationBus(engine)
+    received = []
+    bus.subscribe(received.append)
+    bus._on_connect()
+    assert received == ["note:*", "category:*"]
+
+
+def test_postgres_bus_delivers_locally_when_notify_fails():
+    # SQLite has no pg_notify; the local caches must still be invalidated
+    bus = PostgresInvalidationBus(engine)
+    received = []
+    bus.subscribe(received.append)
+    bus.publish(note_key(3))
+    assert received == ["note:3"]
+
+
+def test_process_bus_bumps_generations():
+    from app.cache import generations, NOTES_TABLE, CATEGORIES_TABLE
+    
+    notes, categories = generations.get(NOTES_TABLE), generations.get(CATEGORIES_TABLE)
+    get_bus().publish(note_key(1))
+    assert generations.get(NOTES_TABLE) > notes
+    assert generations.get(CATEGORIES_TABLE) == categories
+    
+    get_bus().publish(category_key(1))
+    assert generations.get(CATEGORIES_TABLE) > categories
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.config import settings
+from app.jobs import HANDLERS, JobHandler, Worker
+from app.jobs.handlers import NoteBatchHandler
+from app.models.job import Job, JobStatus
+from app.repositories.job_repository import JobRepository
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _claim(db, worker_id, now=None):
+    now = now or _now()
+    return JobRepository(db).claim(worker_id, now, now - timedelta(seconds=settings.jobs_lock_timeout_seconds))
+
+
+def _job(db, job_id):
+    db.expire_all()
+    return db.get(Job, job_id)
+
+
+def test_handlers_are_abstract():
+    with pytest.raises(TypeError):
+        JobHandler()
+
+    class Incomplete(NoteBatchHandler):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_archive_job_runs_in_chunks(api, db, monkeypatch):
+    monkeypatch.setattr(settings, "jobs_chunk_size", 2)
+    ids = [api.note(f"Note {n}")["id"] for n in range(5)]
+    job = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": ids[:4]}}).json()
+    assert job["status"] == "queued" and job["progress"] is None
+
+    worker = Worker("test-worker")
+    assert worker.run_once()
+    job = api.get(f"/jobs/{job['id']}").json()
+    assert job["status"] == "succeeded" and job["total"] == 4 and job["done"] == 4 and job["attempts"] == 1
+    assert [note["id"] for note in api.get("/notes/active").json()["notes"]] == [ids[4]]
+    assert not worker.run_once()
+
+
+def test_claim_takes_each_job_once(api, db):
+    first = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": [1]}}).json()
+    second = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": [2]}}).json()
+
+    assert _claim(db, "a").id == first["id"]
+    claimed = _claim(db, "b")
+    assert claimed.id == second["id"] and claimed.locked_by == "b" and claimed.attempts == 1
+    assert _claim(db, "c") is None
+
+
+def test_stale_job_is_reclaimed(api, db):
+    job_id = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": [1]}}).json()["id"]
+    job = _claim(db, "dead")
+    assert _claim(db, "other") is None
+
+    # The first worker stopped heartbeating
+    job.heartbeat_at = _now() - timedelta(seconds=settings.jobs_lock_timeout_seconds + 1)
+    db.commit()
+    reclaimed = _claim(db, "other")
+    assert reclaimed.id == job_id and reclaimed.locked_by == "other" and reclaimed.attempts == 2
+
+
+def test_reclaim_after_last_attempt_fails_the_job(api, db):
+    job_id = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": [1]}, "max_attempts": 1}).json()["id"]
+    job = _claim(db, "dead")
+    job.heartbeat_at = _now() - timedelta(seconds=settings.jobs_lock_timeout_seconds + 1)
+    db.commit()
+
+    assert Worker("other").run_once()
+    job = _job(db, job_id)
+    assert job.status == JobStatus.FAILED and job.error == "Worker stopped responding"
+
+
+def test_failed_run_is_retried_then_fails(api, db, monkeypatch):
+    def broken(self, db, notes, params):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(type(HANDLERS["archive"]), "apply", broken)
+    note = api.note()
+    job_id = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": [note["id"]]}, "max_attempts": 2}).json()["id"]
+
+    worker = Worker("test-worker")
+    assert worker.run_once()
+    job = _job(db, job_id)
+    assert job.status == JobStatus.QUEUED and job.error == "RuntimeError: boom" and job.locked_by is None
+    # Backing off: not due yet
+    assert not worker.run_once()
+
+    job.run_after = _now()
+    db.commit()
+    assert worker.run_once()
+    job = _job(db, job_id)
+    assert job.status == JobStatus.FAILED and job.attempts == 2
+
+
+def test_cancelled_job_stops(api, db):
+    job_id = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": [1]}}).json()["id"]
+    assert api.post(f"/jobs/{job_id}/cancel").json()["status"] == "cancelled"
+    assert api.post(f"/jobs/{job_id}/cancel").status_code == 400
+    assert not Worker("test-worker").run_once()
+
+
+def test_rebuild_related_heartbeats(api, db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "related_index_path", str(tmp_path / "related.npz"))
+    api.note("Alpha", "first note")
+    job_id = api.post("/jobs", json={"kind": "rebuild_related"}).json()["id"]
+
+    beats = []
+
+    def heartbeat(self, job_id):
+        beats.append(_job(db, job_id).heartbeat_at)
+        original(self, job_id)
+        beats.append(_job(db, job_id).heartbeat_at)
+
+    original = Worker._heartbeat
+    monkeypatch.setattr(Worker, "_heartbeat", heartbeat)
+    assert Worker("test-worker").run_once()
+    assert _job(db, job_id).status == JobStatus.SUCCEEDED
+    assert (tmp_path / "related.npz").exists()
+    assert len(beats) == 2 and beats[1] > beats[0]
+
+
+def test_heartbeat_leaves_other_workers_jobs_alone(api, db):
+    job_id = api.post("/jobs", json={"kind": "archive", "params": {"note_ids": [1]}}).json()["id"]
+    claimed_at = _claim(db, "owner").heartbeat_at
+    Worker("intruder")._heartbeat(job_id)
+    assert _job(db, job_id).heartbeat_at == claimed_at
+    Worker("owner")._heartbeat(job_id)
+    assert _job(db, job_id).heartbeat_at > claimed_at
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import random
+import httpx
+import pytest
+from app.main import app
+from app.tools.loadtest import CALLS_PER_VIEW, DEFAULT_MIX, Stats, Traffic, parse_mix
+
+
+def test_parse_mix():
+    assert parse_mix("active=60,search=40") == {"active": 60.0, "search": 40.0}
+    assert set(parse_mix(DEFAULT_MIX)) == set(CALLS_PER_VIEW)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("active=50,unknown=50")
+
+
+def test_stats_report():
+    stats = Stats()
+    for ms in range(1, 101):
+        stats.record("GET /a", ms / 1000, ok=True)
+    stats.record("GET /b", 0.5, ok=False)
+    report = stats.report(duration=2.0)
+    assert report["GET /a"]["requests"] == 100 and report["GET /a"]["rps"] == 50.0
+    assert report["GET /a"]["p50_ms"] == pytest.approx(50.5) and report["GET /a"]["error_rate"] == 0
+    assert report["GET /b"]["error_rate"] == 1.0
+    assert report["TOTAL"]["requests"] == 101 and report["TOTAL"]["error_rate"] == round(1 / 101, 4)
+
+
+def test_every_scenario_makes_its_calls(api):
+    category = api.category("Work")
+    api.note("Alpha note", category_ids=[category["id"]])
+    api.note("Beta todo", note_type="todo")
+
+    async def main():
+        stats = Stats()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            traffic = Traffic(client, stats, random.Random(1))
+            await traffic.discover()
+            calls = {}
+            for name in CALLS_PER_VIEW:
+                before = sum(len(latencies) for latencies in stats.latencies.values())
+                await getattr(traffic, name)()
+                calls[name] = sum(len(latencies) for latencies in stats.latencies.values()) - before
+        return traffic, stats, calls
+
+    traffic, stats, calls = asyncio.run(main())
+    assert traffic.category_ids == [category["id"]] and len(traffic.note_ids) == 3 and traffic.terms
+    # The request-rate model relies on these counts
+    assert calls == CALLS_PER_VIEW
+    assert not stats.errors
@@ -0,0 +1,56 @@
+from app.cache import GenerationCounters, get_cache, page_key
+from app.repositories.note_repository import NoteRepository
+
+
+def test_page_key_normalizes_filters():
+    first = page_key("active", (1, 2), page=1, category_ids=[3, 1, 3], cursor=None)
+    second = page_key("active", (1, 2), category_ids=[1, 3], page=1)
+    assert first == second
+    assert page_key("active", (2, 2), page=1, category_ids=[1, 3]) != first
+
+
+def test_generations_count_per_table():
+    counters = GenerationCounters()
+    counters.bump("notes")
+    counters.bump("notes")
+    counters.bump("categories")
+    assert counters.get("notes", "categories") == (2, 1)
+    assert counters.snapshot() == {"notes": 2, "categories": 1}
+
+
+def test_repeated_list_is_served_from_cache(api, monkeypatch):
+    api.note("First")
+    assert api.get("/notes/active").json()["total"] == 1
+    
+    calls = []
+    original = NoteRepository.get_active_notes
+    
+    def counting(self, *args, **kwargs):
+        calls.append(args)
+        return original(self, *args, **kwargs)
+    
+    monkeypatch.setattr(NoteRepository, "get_active_notes", counting)
+    assert api.get("/notes/active").json()["total"] == 1
+    assert calls == []
+    assert get_cache("pages").stats()["hits"] >= 1
+
+
+def test_write_makes_cached_pages_unreachable(api):
+    note = api.note("First")
+    assert api.get("/notes/active").json()["total"] == 1
+    
+    api.note("Second")
+    assert api.get("/notes/active").json()["total"] == 2
+    
+    api.patch(f"/notes/{note['id']}/archive")
+    assert api.get("/notes/active").json()["total"] == 1
+    assert api.get("/notes/archived").json()["total"] == 1
+
+
+def test_category_rename_reaches_cached_pages(api):
+    category = api.category("Work")
+    api.note("First", category_ids=[category["id"]])
+    assert api.get("/notes/active").json()["notes"][0]["categories"][0]["name"] == "Work"
+    
+    api.put(f"/categories/{category['id']}", json={"name": "Job"})
+    assert api.get("/notes/active").json()["notes"][0]["categories"][0]["name"] == "Job"
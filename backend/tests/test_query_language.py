@@ -0,0 +1,149 @@
+from datetime import date
+import pytest
+from sqlalchemy import event, text
+from app.database import engine
+from app.models.category import Category
+from app.models.note import Note, NoteType, TodoStatus, Priority
+from app.repositories.note_repository import NoteRepository
+from app.search.query_language import parse_query, TextTerm, KeywordTerm, DateTerm
+from app.utils.exceptions import ValidationError
+
+
+def test_parses_every_term_kind():
+    query = parse_query('title:"release notes" status:open priority:HIGH due<2026-11-01 cat:Work -cat:personal draft')
+    assert query.terms == (
+        TextTerm("release notes", "title"),
+        KeywordTerm("status", ("pending", "in_progress")),
+        KeywordTerm("priority", ("high",)),
+        DateTerm("due", "<", date(2026, 11, 1)),
+        KeywordTerm("cat", ("work",)),
+        KeywordTerm("cat", ("personal",), negated=True),
+        TextTerm("draft"),
+    )
+
+
+def test_is_maps_types_and_unknown_fields_stay_text():
+    assert parse_query("is:todo").terms == (KeywordTerm("type", ("todo",)),)
+    assert parse_query("-is:active").terms == (KeywordTerm("is", ("active",), negated=True),)
+    assert parse_query("https:example").terms == (TextTerm("https:example"),)
+    assert parse_query('"exact phrase"').terms == (TextTerm("exact phrase"),)
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "   ",
+    'title:"unterminated',
+    'release "notes',
+    "status:someday",
+    "priority:urgent",
+    "type:memo",
+    "is:deleted",
+    "due<tomorrow",
+    "priority>low",
+])
+def test_rejects_invalid_queries(query):
+    with pytest.raises(ValidationError):
+        parse_query(query)
+
+
+def test_invalid_query_is_a_client_error(api):
+    response = api.get("/notes/query", params={"q": 'title:"unterminated'})
+    assert response.status_code == 400
+    assert "quote" in response.json()["detail"]
+
+
+def test_query_endpoint_filters(api):
+    work = api.category("Work")
+    match = api.note("Release plan", note_type="todo", priority="high", category_ids=[work["id"]])
+    api.note("Release party", note_type="todo", priority="low", category_ids=[work["id"]])
+    api.note("Release retro", note_type="todo", priority="high")
+    archived = api.note("Release archive", note_type="todo", priority="high", category_ids=[work["id"]])
+    api.patch(f"/notes/{archived['id']}/archive")
+    
+    result = api.get("/notes/query", params={"q": "release priority:high cat:WORK"}).json()
+    assert [note["id"] for note in result["notes"]] == [match["id"]]
+    result = api.get("/notes/query", params={"q": "release -cat:work"}).json()
+    assert result["total"] == 1
+    result = api.get("/notes/query", params={"q": "is:archived cat:work"}).json()
+    assert [note["id"] for note in result["notes"]] == [archived["id"]]
+
+
+def test_query_endpoint_orders_like_the_other_lists(api):
+    edited = api.note("Release plan")
+    api.note("Release notes")
+    api.note("Release party")
+    api.put(f"/notes/{edited['id']}", json={"content": "edited"})
+    
+    # Never-updated notes (NULL updated_at) come first on every list
+    queried = [note["id"] for note in api.get("/notes/query", params={"q": "release"}).json()["notes"]]
+    active = [note["id"] for note in api.get("/notes/active").json()["notes"]]
+    assert queried == active and queried[-1] == edited["id"]
+
+
+@pytest.fixture
+def planner(db):
+    """
+    Enough rows for the planner to prefer the selective indexes, plus a
+    plan() helper returning EXPLAIN QUERY PLAN details of a structured query
+    """
+    categories = [Category(name=f"Category {i}") for i in range(20)]
+    db.add_all(categories)
+    db.flush()
+    statuses, priorities = list(TodoStatus), list(Priority)
+    for i in range(600):
+        db.add(Note(
+            title=f"Note {i}",
+            content="content",
+            note_type=NoteType.TODO,
+            todo_status=statuses[i % 3],
+            priority=priorities[i // 3 % 3],
+            is_archived=i % 2 == 0,
+            categories=[categories[i % 20]]
+        ))
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+    # Pooled connections keep the statistics they loaded; start over with fresh ones
+    db.close()
+    engine.dispose()
+    
+    def plan(query):
+        statements = []
+        
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+        
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            NoteRepository(db).query_notes(parse_query(query))
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        statement, parameters = statements[0]
+        cursor = db.connection().connection.cursor()
+        return [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    
+    return plan
+
+
+def _uses(plan, index):
+    return any(f"USING INDEX {index} " in step for step in plan)
+
+
+@pytest.mark.parametrize("query, index", [
+    ("status:done", "ix_notes_todo_status"),
+    ("priority:high", "ix_notes_priority"),
+    ("is:archived", "ix_notes_is_archived"),
+    ("title:release", "ix_notes_is_archived"),
+])
+def test_keyword_terms_use_their_index(planner, query, index):
+    plan = planner(query)
+    assert _uses(plan, index), plan
+    assert not any(step.startswith("SCAN notes") for step in plan), plan
+
+
+@pytest.mark.parametrize("query", ["cat:work", "-cat:work", "status:done cat:work"])
+def test_category_terms_use_name_and_link_indexes(planner, query):
+    plan = planner(query)
+    assert _uses(plan, "ix_categories_name_lower"), plan
+    assert _uses(plan, "ix_note_categories_category_id"), plan
+    assert not any(step.startswith("SCAN") for step in plan), plan
@@ -0,0 +1,77 @@
+import numpy as np
+from app.repositories.note_repository import NoteRepository
+from app.search import TfidfIndex, term_counts
+
+
+def _index(documents, delta_limit=1000):
+    index = TfidfIndex(delta_limit=delta_limit)
+    index.load((doc_id, term_counts(title, content)) for doc_id, title, content in documents)
+    return index
+
+
+DOCUMENTS = [
+    (1, "Python packaging", "wheels and source distributions for python packages"),
+    (2, "Python testing", "pytest fixtures for python packages"),
+    (3, "Sourdough bread", "flour water salt and a starter"),
+]
+
+
+def test_nearest_ranks_by_cosine_similarity():
+    index = _index(DOCUMENTS)
+    neighbours = index.nearest(index.vector(1), k=2, exclude=[1])[0]
+    assert [doc_id for doc_id, _ in neighbours] == [2]
+    assert 0 < neighbours[0][1] <= 1
+
+
+def test_delta_updates_match_a_full_load_after_compaction():
+    index = _index(DOCUMENTS, delta_limit=10)
+    index.upsert(3, term_counts("Python bread", "python packages and flour"))
+    index.remove(2)
+    reference = _index([DOCUMENTS[0], (3, "Python bread", "python packages and flour")])
+    expected = reference.nearest(reference.vectorize(term_counts("python packages", "")), k=5)[0]
+    
+    # Before compaction compacted rows keep their old weights, so only the ranking is exact
+    got = index.nearest(index.vectorize(term_counts("python packages", "")), k=5)[0]
+    assert [doc_id for doc_id, _ in got] == [doc_id for doc_id, _ in expected]
+    
+    index.compact()
+    got = index.nearest(index.vectorize(term_counts("python packages", "")), k=5)[0]
+    assert [doc_id for doc_id, _ in got] == [doc_id for doc_id, _ in expected]
+    np.testing.assert_allclose([score for _, score in got], [score for _, score in expected], rtol=1e-5)
+    assert len(index) == 2 and 2 not in index
+
+
+def test_state_round_trips():
+    index = _index(DOCUMENTS)
+    restored = TfidfIndex()
+    restored.restore(index.state())
+    assert restored.nearest(restored.vector(1), k=2, exclude=[1]) == index.nearest(index.vector(1), k=2, exclude=[1])
+
+
+def test_related_endpoint_follows_writes(api):
+    first = api.note("Python packaging", "wheels and source distributions for python packages")
+    second = api.note("Python testing", "pytest fixtures for python packages")
+    bread = api.note("Sourdough bread", "flour water salt and a starter")
+    
+    related = api.get(f"/notes/{first['id']}/related").json()
+    assert [note["id"] for note in related] == [second["id"]]
+    
+    api.put(f"/notes/{bread['id']}", json={"content": "python packages baked into bread"})
+    related = api.get(f"/notes/{first['id']}/related").json()
+    assert {note["id"] for note in related} == {second["id"], bread["id"]}
+    
+    api.patch(f"/notes/{second['id']}/archive")
+    related = api.get(f"/notes/{first['id']}/related").json()
+    assert [note["id"] for note in related] == [bread["id"]]
+
+
+def test_related_for_missing_note_is_404(api):
+    assert api.get("/notes/999/related").status_code == 404
+
+
+def test_snapshot_catch_up_includes_the_version_itself(api, db):
+    first = api.note("First", "alpha")
+    # The snapshot version is the newest timestamp; notes written in that same second must be re-read
+    _, version = NoteRepository(db).get_collection_version()
+    _, modified = NoteRepository(db).get_related_changes(version)
+    assert first["id"] in modified
@@ -0,0 +1,74 @@
+def _walk(api, path, **params):
+    """Follow next_cursor from the first page to the last, returning every ID seen"""
+    pages = [api.get(path, params=params).json()]
+    while pages[-1]["next_cursor"]:
+        response = api.get(path, params={**params, "cursor": pages[-1]["next_cursor"]})
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+    return [note["id"] for page in pages for note in page["notes"]], pages
+
+
+def test_search_pages_by_cursor(api):
+    ids = [api.note(f"Meeting {i}")["id"] for i in range(7)]
+    api.note("Unrelated")
+    # Updated notes come after never-updated ones; mix both in the order
+    api.put(f"/notes/{ids[2]}", json={"content": "edited"})
+    
+    seen, pages = _walk(api, "/notes/search/meeting", page_size=3)
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+    assert [len(page["notes"]) for page in pages] == [3, 3, 1]
+    assert all(page["total"] == 7 for page in pages)
+    assert seen[-1] == ids[2]
+
+
+def test_search_cursor_matches_offset_paging(api):
+    for i in range(5):
+        api.note(f"Meeting {i}")
+    by_cursor, _ = _walk(api, "/notes/search/meeting", page_size=2)
+    by_page = [
+        note["id"]
+        for page in (1, 2, 3)
+        for note in api.get("/notes/search/meeting", params={"page": page, "page_size": 2}).json()["notes"]
+    ]
+    assert by_cursor == by_page
+
+
+def test_fuzzy_search_pages_by_cursor(api):
+    ids = [api.note(f"Meeting notes {i}")["id"] for i in range(5)]
+    api.note("Groceries")
+    
+    seen, pages = _walk(api, "/notes/search/meetng", page_size=2, mode="fuzzy")
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_search_rejects_invalid_cursors(api):
+    for i in range(3):
+        api.note(f"Meeting {i}")
+    substring = api.get("/notes/search/meeting", params={"page_size": 1}).json()["next_cursor"]
+    fuzzy = api.get("/notes/search/meeting", params={"page_size": 1, "mode": "fuzzy"}).json()["next_cursor"]
+    
+    assert api.get("/notes/search/meeting", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert api.get("/notes/search/meeting", params={"cursor": fuzzy}).status_code == 400
+    assert api.get("/notes/search/meeting", params={"cursor": substring, "mode": "fuzzy"}).status_code == 400
+
+
+def test_search_filters_archived_and_categories(api):
+    work = api.category("Work")
+    tagged = api.note("Meeting", category_ids=[work["id"]])
+    archived = api.note("Meeting archived")
+    api.patch(f"/notes/{archived['id']}/archive")
+    
+    assert api.get("/notes/search/meeting").json()["total"] == 1
+    assert api.get("/notes/search/meeting", params={"include_archived": True}).json()["total"] == 2
+    result = api.get("/notes/search/meeting", params={"include_archived": True, "category_ids": [work["id"]]}).json()
+    assert [note["id"] for note in result["notes"]] == [tagged["id"]]
+
+
+def test_stream_search_returns_every_match(api):
+    for i in range(3):
+        api.note(f"Meeting {i}")
+    lines = api.get("/notes/search/meeting/stream").text.strip().splitlines()
+    assert len(lines) == 3
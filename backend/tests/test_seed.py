@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from app.tools.seed import ARCHIVED_RATIO, CATEGORY_NAMES, ensure_categories, generate_chunk, seed
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_chunks_are_deterministic():
+    first = generate_chunk(42, 3, 1000, 50, [1, 2, 3], NOW)
+    assert generate_chunk(42, 3, 1000, 50, [1, 2, 3], NOW) == first
+    assert generate_chunk(42, 4, 1000, 50, [1, 2, 3], NOW) != first
+    assert generate_chunk(43, 3, 1000, 50, [1, 2, 3], NOW) != first
+
+
+def test_chunk_shape_and_distributions():
+    rows, links = generate_chunk(1, 0, 1, 4000, [10, 20, 30, 40, 50, 60], NOW)
+    assert [row[0] for row in rows] == list(range(1, 4001))
+    assert all(1 <= len(row[1]) <= 200 and row[2].endswith(".") for row in rows)
+    archived = sum(row[7] for row in rows) / len(rows)
+    assert abs(archived - ARCHIVED_RATIO) < 0.03
+    # Updates happen after creation and never in the future
+    assert all(row[9] is None or row[8] <= row[9] <= NOW for row in rows)
+    # At most one link per note and category, popular categories first
+    assert len(links) == len(set(links))
+    counts = {category_id: sum(1 for _, linked in links if linked == category_id) for category_id in (10, 60)}
+    assert counts[10] > counts[60]
+
+
+def test_ensure_categories_reuses_existing(api):
+    existing = api.category(CATEGORY_NAMES[1])
+    ids = ensure_categories(len(CATEGORY_NAMES) + 2)
+    assert ids[1] == existing["id"] and len(set(ids)) == len(ids)
+    assert ensure_categories(len(CATEGORY_NAMES) + 2) == ids
+    names = {category["name"] for category in api.get("/categories/").json()}
+    assert f"{CATEGORY_NAMES[0]} 2" in names
+
+
+def test_seed_writes_notes_and_change_log(api):
+    api.note("Existing")
+    seed(250, 4, 7, workers=1, chunk_size=100)
+    active = api.get("/notes/active", params={"page_size": 1}).json()["total"]
+    archived = api.get("/notes/archived", params={"page_size": 1}).json()["total"]
+    assert active + archived == 251
+    assert len(api.get("/categories/").json()) == 4
+    # Seeded rows get change-log entries for /sync
+    result = api.get("/sync", params={"limit": 1000}).json()
+    assert len([change for change in result["changes"] if change["kind"] == "note"]) == 251
@@ -0,0 +1,104 @@
+import threading
+import time
+import pytest
+from app.cache.singleflight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    started = threading.Event()
+    results = []
+    
+    def slow():
+        started.set()
+        release.wait(5)
+        return "value"
+    
+    leader = _run_concurrently(1, lambda: results.append(flight.do("key", slow)))
+    started.wait(5)
+    followers = _run_concurrently(4, lambda: results.append(flight.do("key", slow)))
+    # Give the followers time to find the call in flight
+    time.sleep(0.2)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+    
+    assert results == ["value"] * 5
+    stats = flight.stats()
+    assert stats["in_flight"] == 0
+    assert stats["executions"] == 1
+    assert stats["shared"] == 4
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+    flight.do("key", lambda: calls.append(1))
+    flight.do("key", lambda: calls.append(2))
+    assert calls == [1, 2]
+
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    started = threading.Event()
+    errors = []
+    
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+    
+    def call():
+        try:
+            flight.do("key", failing)
+        except ValueError as e:
+            errors.append(str(e))
+    
+    leader = _run_concurrently(1, call)
+    started.wait(5)
+    followers = _run_concurrently(2, call)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+    assert errors == ["boom"] * 3
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_follower_runs_itself_after_timeout():
+    flight = SingleFlight(timeout=0.01)
+    release = threading.Event()
+    started = threading.Event()
+    
+    def slow():
+        started.set()
+        release.wait(5)
+        return "leader"
+    
+    leader = _run_concurrently(1, lambda: flight.do("key", slow))
+    started.wait(5)
+    assert flight.do("key", lambda: "follower") == "follower"
+    assert flight.stats()["timeouts"] == 1
+    release.set()
+    leader[0].join(5)
+
+
+def test_disabled_runs_every_call():
+    flight = SingleFlight(enabled=False)
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.stats()["executions"] == 0
+
+
+def test_errors_are_not_cached():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError()))
+    assert flight.do("key", lambda: "ok") == "ok"
@@ -0,0 +1,103 @@
+import threading
+from app.cache import get_bus, note_key
+from app.repositories.note_repository import NoteRepository
+from app.search import PrefixIndex, SuggestIndexes, get_suggest_indexes
+
+
+def _labels(api, path, prefix):
+    # Writes reach the indexes on a background thread
+    get_suggest_indexes().wait_until_idle(5)
+    return [suggestion["label"] for suggestion in api.get(path, params={"prefix": prefix}).json()]
+
+
+def test_load_matches_incremental_upserts():
+    labels = [(3, "beta"), (1, "Alpha"), (2, "alpine"), (4, "Gamma")]
+    loaded, upserted = PrefixIndex(), PrefixIndex()
+    loaded.load(labels)
+    for id, label in labels:
+        upserted.upsert(id, label)
+    assert loaded.suggest("al") == upserted.suggest("al") == [(1, "Alpha", 0), (2, "alpine", 0)]
+    assert len(loaded) == 4
+
+
+def test_load_keeps_usage_of_surviving_labels():
+    index = PrefixIndex()
+    index.load([(1, "Alpha"), (2, "Alpine")])
+    index.add_usage(2, 5)
+    index.load([(2, "Alpine"), (3, "Alps")])
+    assert index.suggest("alp") == [(2, "Alpine", 5), (3, "Alps", 0)]
+    
+    index.load([(2, "Alpine")], usage={2: 1})
+    assert index.suggest("alp") == [(2, "Alpine", 1)]
+
+
+def test_suggestions_follow_writes(api):
+    note = api.note("Release plan")
+    api.note("Retro")
+    assert _labels(api, "/notes/suggest", "rel") == ["Release plan"]
+    
+    api.put(f"/notes/{note['id']}", json={"title": "Launch plan"})
+    assert _labels(api, "/notes/suggest", "rel") == []
+    
+    api.patch(f"/notes/{note['id']}/archive")
+    assert _labels(api, "/notes/suggest", "lau") == []
+
+
+def test_categories_rank_by_usage(api):
+    work = api.category("Work")
+    api.category("Workshop")
+    api.note("One", category_ids=[work["id"]])
+    suggestions = api.get("/categories/suggest", params={"prefix": "wor"}).json()
+    assert [(s["label"], s["usage"]) for s in suggestions] == [("Work", 1), ("Workshop", 0)]
+
+
+def test_wildcard_rebuilds_off_the_publishing_thread(api, monkeypatch):
+    api.note("Release plan")
+    indexes = get_suggest_indexes()
+    threads = []
+    original = SuggestIndexes._build
+    
+    def recording(self):
+        threads.append(threading.current_thread())
+        original(self)
+    
+    monkeypatch.setattr(SuggestIndexes, "_build", recording)
+    get_bus().publish(note_key("*"))
+    indexes.wait_until_idle(5)
+    assert threads and threading.current_thread() not in threads
+    assert _labels(api, "/notes/suggest", "rel") == ["Release plan"]
+
+
+def test_rebuild_replays_changes_made_while_reading(api, monkeypatch):
+    note = api.note("Release plan")
+    indexes = get_suggest_indexes()
+    original = NoteRepository.iter_titles
+    
+    def stale(self, ids=None, batch_size=1000):
+        rows = list(original(self, ids, batch_size))
+        if ids is None:
+            # The rename commits after the build has read the old title
+            api.put(f"/notes/{note['id']}", json={"title": "Launch plan"})
+        return iter(rows)
+    
+    monkeypatch.setattr(NoteRepository, "iter_titles", stale)
+    indexes.build()
+    assert _labels(api, "/notes/suggest", "lau") == ["Launch plan"]
+    assert _labels(api, "/notes/suggest", "rel") == []
+
+
+def test_refreshes_run_off_the_writing_thread(api, monkeypatch):
+    indexes = get_suggest_indexes()
+    indexes.wait_until_idle(5)
+    threads = []
+    original = NoteRepository.iter_titles
+
+    def recording(self, ids=None, batch_size=1000):
+        threads.append(threading.current_thread().name)
+        return original(self, ids, batch_size)
+
+    monkeypatch.setattr(NoteRepository, "iter_titles", recording)
+    note = api.note("Release plan")
+    api.put(f"/notes/{note['id']}", json={"title": "Launch plan"})
+    assert _labels(api, "/notes/suggest", "lau") == ["Launch plan"]
+    assert threads and set(threads) == {"suggest-rebuild"}
@@ -0,0 +1,117 @@
+from app.config import settings
+from app.repositories.note_repository import NoteRepository
+from app.search.trigram import TrigramIndex, substring_trigrams, trigrams
+
+
+def test_trigrams_pad_words_like_pg_trgm():
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+    assert trigrams("!!") == set()
+
+
+def test_substring_trigrams_are_unpadded_and_skip_wildcards():
+    assert substring_trigrams("Meet") == {"mee", "eet"}
+    assert substring_trigrams("ab cdef") == {"cde", "def"}
+    # LIKE wildcards split the literal parts
+    assert substring_trigrams("abc_def%x") == {"abc", "def"}
+    assert substring_trigrams("ab") == set()
+
+
+def test_candidates_hold_every_substring_match():
+    index = TrigramIndex()
+    index.add(1, "Team meeting")
+    index.add(2, "Meet and greet")
+    index.add(3, "Grocery list")
+    assert index.candidates("eeting") == {1}
+    assert index.candidates("MEET") == {1, 2}
+    assert index.candidates("xyz") == set()
+    assert index.candidates("me") is None
+
+
+def test_index_tolerates_typos_and_ranks_best_first():
+    index = TrigramIndex()
+    index.add(1, "Meeting notes")
+    index.add(2, "Grocery list")
+    index.add(3, "Meeting")
+    results = index.search("meetng", threshold=0.3)
+    assert [doc_id for doc_id, _ in results] == [3, 1]
+    assert results[0][1] == results[1][1]
+    assert index.search("zzzz", threshold=0.3) == []
+
+
+def test_index_replaces_and_removes_documents():
+    index = TrigramIndex()
+    index.add(1, "Meeting")
+    index.add(1, "Groceries")
+    assert index.search("meeting", threshold=0.5) == []
+    assert [doc_id for doc_id, _ in index.search("groceries", threshold=0.5)] == [1]
+    
+    index.remove(1)
+    assert 1 not in index
+    assert index.search("groceries", threshold=0.5) == []
+
+
+def test_fuzzy_note_search_follows_writes(api):
+    note = api.note("Quarterly report")
+    assert api.get("/notes/search/quartrly", params={"mode": "fuzzy"}).json()["total"] == 1
+    
+    api.put(f"/notes/{note['id']}", json={"title": "Holiday plan", "content": "Beach"})
+    assert api.get("/notes/search/quartrly", params={"mode": "fuzzy"}).json()["total"] == 0
+    assert api.get("/notes/search/holidy", params={"mode": "fuzzy"}).json()["total"] == 1
+    
+    api.delete(f"/notes/{note['id']}")
+    assert api.get("/notes/search/holidy", params={"mode": "fuzzy"}).json()["total"] == 0
+
+
+def test_fuzzy_category_search(api):
+    api.category("Personal")
+    api.category("Work")
+    response = api.get("/categories/search/persnal", params={"mode": "fuzzy"})
+    assert response.status_code == 200
+    assert [category["name"] for category in response.json()] == ["Personal"]
+    
+    strict = api.get("/categories/search/persnal", params={"mode": "fuzzy", "threshold": 1.0})
+    assert strict.json() == []
+
+
+def test_substring_search_uses_the_index_and_matches_a_scan(api, monkeypatch):
+    api.note("Team meeting", "Agenda: budget_2026 review")
+    api.note("Meet and greet", "Coffee at 10%")
+    api.note("Grocery list", "Eggs, milk")
+    api.category("Meetings")
+    api.category("Home")
+    terms = ["meet", "EETING", "get_2026", "10%", "me", "t a", "nothing here"]
+    
+    narrowed = []
+    original = NoteRepository.search_notes
+    
+    def spy(self, *args, **kwargs):
+        narrowed.append(kwargs.get("candidate_ids"))
+        return original(self, *args, **kwargs)
+    
+    monkeypatch.setattr(NoteRepository, "search_notes", spy)
+    
+    def results():
+        notes = {term: [note["id"] for note in api.get(f"/notes/search/{term}").json()["notes"]] for term in terms}
+        categories = {term: [category["id"] for category in api.get(f"/categories/search/{term}").json()] for term in terms}
+        return notes, categories
+    
+    indexed = results()
+    assert indexed[0]["meet"] and indexed[0]["EETING"] and indexed[1]["meet"]
+    assert narrowed[0] is not None and len(narrowed[0]) == 2
+    # Terms without trigrams search every row
+    assert narrowed[terms.index("me")] is None
+    
+    # The same results when every search scans
+    monkeypatch.setattr(settings, "substring_candidate_limit", -1)
+    api.note("Cache buster", "bumps the page generation")
+    scanned = results()
+    assert scanned == indexed
+
+
+def test_substring_search_follows_writes(api):
+    note = api.note("Quarterly report")
+    assert api.get("/notes/search/arterl").json()["total"] == 1
+    api.put(f"/notes/{note['id']}", json={"title": "Holiday plan"})
+    assert api.get("/notes/search/arterl").json()["total"] == 0
+    assert api.get("/notes/search/oliday").json()["total"] == 1
@@ -1,11 +1,28 @@
 import streamlit as st
 import requests
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from urllib3.util.retry import Retry
 import json
+import logging
+import time
+import pandas as pd
 
 # Configuration
 API_BASE_URL = "http://localhost:8000/api/v1"
+# (connect, read) timeouts in seconds for every API call
+REQUEST_TIMEOUT = (3.05, 15)
+# Worker threads for the independent calls of one render, shared by all sessions
+MAX_PARALLEL_REQUESTS = 16
+# Notes per API page, and note cards rendered at once (cards are widget-heavy)
+LIST_PAGE_SIZE = 50
+CARDS_PER_WINDOW = 20
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+logger = logging.getLogger("notes_frontend")
 
 st.set_page_config(
     page_title="Notes App",
@@ -14,25 +31,97 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# HTTP client
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Keep-alive connection pool shared by every session of this server"""
+    session = requests.Session()
+    # Connection failures are retried for any method (nothing was sent); gateway
+    # errors only for idempotent ones, so a create is never applied twice
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET", "HEAD", "PUT", "DELETE"]
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_PARALLEL_REQUESTS * 2, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS, thread_name_prefix="notes-api")
+
+def api_request(method, path, **kwargs):
+    return get_http_session().request(method, f"{API_BASE_URL}{path}", timeout=REQUEST_TIMEOUT, **kwargs)
+
+# Response cache, shared by all sessions. Each kind of data has its own TTL
+# and is cleared by the NotesAPI methods that change it.
+CATEGORIES_TTL = 300
+LISTS_TTL = 60  # note and todo pages, search results and the Quick Stats counts
+NOTE_TTL = 60
+
+def get_json(path, params=None):
+    # Raises rather than returning None, so failures are not cached
+    response = api_request("GET", path, params=params)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=CATEGORIES_TTL, show_spinner=False)
+def cached_categories():
+    return get_json("/categories/")
+
+@st.cache_data(ttl=LISTS_TTL, show_spinner=False)
+def cached_list(path, params):
+    return get_json(path, params)
+
+@st.cache_data(ttl=NOTE_TTL, show_spinner=False)
+def cached_note(note_id):
+    return get_json(f"/notes/{note_id}")
+
+def invalidate_notes():
+    """Drop everything a note change can show up in"""
+    cached_list.clear()
+    cached_note.clear()
+
 # API Helper Functions
 class NotesAPI:
     @staticmethod
-    def get_notes(archived=False, category_ids=None, page=1, page_size=50):
+    def fetch_all(calls: Dict[str, Callable]) -> Dict:
+        """Run independent calls in parallel and return their results by name"""
+        futures = {name: NotesAPI.submit(call) for name, call in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+    
+    @staticmethod
+    def submit(call: Callable) -> Future:
+        """Run a call on the shared thread pool"""
+        ctx = get_script_run_ctx()
+        
+        def run():
+            # Lets the worker use st.cache_* and session state like the script thread
+            add_script_run_ctx(ctx=ctx)
+            return call()
+        
+        return get_executor().submit(run)
+    
+    @staticmethod
+    def get_notes(archived=False, category_ids=None, page=1, page_size=LIST_PAGE_SIZE, cursor=None):
         endpoint = "archived" if archived else "active"
         params = {"page": page, "page_size": page_size}
         if category_ids:
             params["category_ids"] = category_ids
+        if cursor:
+            params["cursor"] = cursor
         try:
-            response = requests.get(f"{API_BASE_URL}/notes/{endpoint}", params=params)
-            return response.json() if response.status_code == 200 else None
+            return held_page(f"/notes/{endpoint}", params)
         except:
             return None
     
     @staticmethod
     def get_note(note_id):
         try:
-            response = requests.get(f"{API_BASE_URL}/notes/{note_id}")
-            return response.json() if response.status_code == 200 else None
+            return cached_note(note_id)
         except:
             return None
     
@@ -47,10 +136,12 @@ class NotesAPI:
             "category_ids": category_ids or []
         }
         try:
-            response = requests.post(f"{API_BASE_URL}/notes/", json=data)
+            response = api_request("POST", "/notes/", json=data)
             return response.status_code == 201
         except:
             return False
+        finally:
+            invalidate_notes()
     
     @staticmethod
     def update_note(note_id, title=None, content=None, note_type=None, priority=None, due_date=None, category_ids=None):
@@ -62,89 +153,334 @@ class NotesAPI:
         if due_date is not None: data["due_date"] = due_date.isoformat() if due_date else None
         if category_ids is not None: data["category_ids"] = category_ids
         try:
-            response = requests.put(f"{API_BASE_URL}/notes/{note_id}", json=data)
+            response = api_request("PUT", f"/notes/{note_id}", json=data)
             return response.status_code == 200
         except:
             return False
+        finally:
+            invalidate_notes()
     
     @staticmethod
     def delete_note(note_id):
         try:
-            response = requests.delete(f"{API_BASE_URL}/notes/{note_id}")
+            response = api_request("DELETE", f"/notes/{note_id}")
             return response.status_code == 204
         except:
             return False
+        finally:
+            invalidate_notes()
     
     @staticmethod
     def archive_note(note_id):
         try:
-            response = requests.patch(f"{API_BASE_URL}/notes/{note_id}/archive")
+            response = api_request("PATCH", f"/notes/{note_id}/archive")
             return response.status_code == 200
         except:
             return False
+        finally:
+            invalidate_notes()
     
     @staticmethod
     def unarchive_note(note_id):
         try:
-            response = requests.patch(f"{API_BASE_URL}/notes/{note_id}/unarchive")
+            response = api_request("PATCH", f"/notes/{note_id}/unarchive")
             return response.status_code == 200
         except:
             return False
+        finally:
+            invalidate_notes()
     
     @staticmethod
     def get_categories():
         try:
-            response = requests.get(f"{API_BASE_URL}/categories/")
-            return response.json() if response.status_code == 200 else []
+            return cached_categories()
         except:
             return []
     
     @staticmethod
-    def get_todos(status=None, priority=None, category_ids=None, page=1, page_size=50):
+    def get_todos(status=None, priority=None, category_ids=None, page=1, page_size=LIST_PAGE_SIZE, cursor=None):
         params = {"page": page, "page_size": page_size}
         if status: params["status"] = status
         if priority: params["priority"] = priority
         if category_ids: params["category_ids"] = category_ids
+        if cursor: params["cursor"] = cursor
         try:
-            response = requests.get(f"{API_BASE_URL}/notes/todos", params=params)
-            return response.json() if response.status_code == 200 else None
+            return held_page("/notes/todos", params)
         except:
             return None
     
     @staticmethod
     def update_todo_status(note_id, status):
         try:
-            response = requests.patch(f"{API_BASE_URL}/notes/{note_id}/status", params={"status": status})
+            response = api_request("PATCH", f"/notes/{note_id}/status", params={"status": status})
             return response.status_code == 200
         except:
             return False
+        finally:
+            invalidate_notes()
     
     @staticmethod
-    def search_notes(search_term, include_archived=False, category_ids=None):
-        params = {"include_archived": include_archived}
+    def search_notes(search_term, include_archived=False, category_ids=None, page=1, page_size=LIST_PAGE_SIZE, fuzzy=False, cursor=None):
+        params = {"include_archived": include_archived, "page": page, "page_size": page_size}
+        if fuzzy: params["mode"] = "fuzzy"
         if category_ids: params["category_ids"] = category_ids
+        if cursor: params["cursor"] = cursor
         try:
-            response = requests.get(f"{API_BASE_URL}/notes/search/{search_term}", params=params)
-            return response.json() if response.status_code == 200 else []
+            return held_page(f"/notes/search/{search_term}", params)
         except:
-            return []
+            return None
     
     @staticmethod
     def create_category(name, color="#3B82F6"):
         data = {"name": name, "color": color}
         try:
-            response = requests.post(f"{API_BASE_URL}/categories/", json=data)
+            response = api_request("POST", "/categories/", json=data)
             return response.status_code == 201
         except:
             return False
+        finally:
+            cached_categories.clear()
     
     @staticmethod
     def delete_category(category_id):
         try:
-            response = requests.delete(f"{API_BASE_URL}/categories/{category_id}")
+            response = api_request("DELETE", f"/categories/{category_id}")
             return response.status_code == 204
         except:
             return False
+        finally:
+            # Notes embed their categories
+            cached_categories.clear()
+            invalidate_notes()
+
+# Local view state
+# List pages this session has shown, kept (up to LISTS_TTL) so card actions can be applied to them
+# in place: the rerun after a click then renders without fetching anything.
+def held_pages() -> Dict:
+    if "held_pages" not in st.session_state:
+        st.session_state.held_pages = {}
+    return st.session_state.held_pages
+
+def held_page(path, params):
+    pages = held_pages()
+    key = (path, json.dumps(params, sort_keys=True))
+    entry = pages.get(key)
+    if entry is not None and time.monotonic() - entry[0] < LISTS_TTL:
+        return entry[1]
+    data = cached_list(path, params)
+    pages[key] = (time.monotonic(), data)
+    return data
+
+def drop_held_pages():
+    held_pages().clear()
+
+def page_includes(path, params, note) -> Optional[bool]:
+    """Whether a note belongs in a list by its filters; None for search results, which cannot be told"""
+    if path.startswith("/notes/search/"):
+        return None
+    category_ids = params.get("category_ids")
+    if category_ids and not {cat["id"] for cat in note.get("categories", [])} & set(category_ids):
+        return False
+    if path == "/notes/archived":
+        return note["is_archived"]
+    if path == "/notes/todos":
+        return (
+            note.get("note_type") == "todo" and not note["is_archived"]
+            and params.get("status") in (None, note.get("todo_status"))
+            and params.get("priority") in (None, note.get("priority"))
+        )
+    return not note["is_archived"]
+
+def patch_held_pages(before, after):
+    """Apply a note change (after is None for a delete) to every held page and its total"""
+    for (path, params_key), (_, data) in held_pages().items():
+        params = json.loads(params_key)
+        was = page_includes(path, params, before)
+        now = after is not None and page_includes(path, params, after)
+        notes = data["notes"]
+        index = next((i for i, held in enumerate(notes) if held["id"] == before["id"]), None)
+        if index is not None:
+            if now is False:
+                del notes[index]
+            else:
+                notes[index] = after
+        # Search results only lose deleted notes; a note entering a list is counted, and shown after a refresh
+        if was is None:
+            if index is not None and after is None:
+                data["total"] -= 1
+        elif was and not now:
+            data["total"] -= 1
+        elif now and not was:
+            data["total"] += 1
+
+def apply_change(note, changes, call, message=None):
+    """
+    Card action callback: show the change at once and send it in the background.
+    changes is the dict of updated fields, or None for a delete; call returns
+    whether the API accepted it. settle_changes() rolls back failures.
+    """
+    patch_held_pages(note, None if changes is None else {**note, **changes})
+    if "pending_changes" not in st.session_state:
+        st.session_state.pending_changes = []
+    st.session_state.pending_changes.append((NotesAPI.submit(call), note["title"]))
+    if message:
+        st.toast(message)
+
+def apply_to_selected(list_key, changes_by_note, message):
+    """Table action callback: apply_change for every selected row, then clear the selection"""
+    for note, changes, call in changes_by_note:
+        apply_change(note, changes, call)
+    st.toast(f"{message} ({len(changes_by_note)})")
+    table_versions = st.session_state.setdefault("table_versions", {})
+    table_versions[list_key] = table_versions.get(list_key, 0) + 1
+
+def settle_changes():
+    """Wait for background card actions; if any failed, drop the local state to show the server's"""
+    pending = st.session_state.get("pending_changes") or []
+    st.session_state.pending_changes = []
+    failed = [title for future, title in pending if not future.result()]
+    if failed:
+        drop_held_pages()
+        st.session_state.flash_error = f"Could not save changes to: {', '.join(failed)}"
+        st.rerun()
+
+def refresh_all():
+    drop_held_pages()
+    cached_categories.clear()
+    invalidate_notes()
+
+# Incremental list loading
+# A list shows its first page plus as many further pages as the user has asked for, each
+# fetched by cursor (and held like any page), so loading more never refetches what is shown.
+def loaded_notes(list_key, first_page, fetch_page):
+    """Notes of the pages loaded so far for list_key, and whether the API has more"""
+    wanted = st.session_state.setdefault("pages_wanted", {}).get(list_key, 1)
+    pages = [first_page]
+    while len(pages) < wanted and pages[-1].get("next_cursor"):
+        page = fetch_page(pages[-1]["next_cursor"])
+        if not page:
+            break
+        pages.append(page)
+    return [note for page in pages for note in page["notes"]], bool(pages[-1].get("next_cursor"))
+
+def load_more(list_key):
+    wanted = st.session_state.setdefault("pages_wanted", {})
+    wanted[list_key] = wanted.get(list_key, 1) + 1
+
+def move_window(list_key, start, needs_more):
+    st.session_state.setdefault("window_starts", {})[list_key] = start
+    if needs_more:
+        load_more(list_key)
+
+def display_note_list(list_key, first_page, fetch_page, noun, empty_message, group_by_status=False):
+    """
+    Cards for a window of CARDS_PER_WINDOW notes, paging through the loaded
+    notes and loading the next API page when the window reaches their end;
+    or a compact table of everything loaded, with actions on selected rows.
+    """
+    if not first_page or not first_page.get("notes"):
+        st.info(empty_message)
+        return
+    
+    notes, has_more = loaded_notes(list_key, first_page, fetch_page)
+    if not notes:
+        # Everything loaded was removed by actions since; a refresh brings in the rest
+        st.info(empty_message)
+        return
+    total = first_page["total"]
+    layout = st.radio("Layout", ["Cards", "Table"], horizontal=True, key=f"layout_{noun}", label_visibility="collapsed")
+    
+    if layout == "Table":
+        st.info(f"Showing {len(notes)} of {total} {noun}")
+        display_note_table(list_key, notes)
+        if has_more:
+            st.button(f"Load {LIST_PAGE_SIZE} more", key=f"more_{list_key}", on_click=load_more, args=(list_key,))
+        return
+    
+    last_window = (len(notes) - 1) // CARDS_PER_WINDOW * CARDS_PER_WINDOW
+    start = min(st.session_state.setdefault("window_starts", {}).get(list_key, 0), last_window)
+    window = notes[start:start + CARDS_PER_WINDOW]
+    st.info(f"Showing {start + 1}-{start + len(window)} of {total} {noun}")
+    
+    if group_by_status:
+        # Group todos by status for better organization
+        todos_by_status = {"pending": [], "in_progress": [], "completed": []}
+        for todo in window:
+            status_key = todo.get("todo_status", "pending")
+            todos_by_status[status_key].append(todo)
+        
+        # Display todos by status
+        for status_key, status_todos in todos_by_status.items():
+            if status_todos:
+                status_emoji = get_status_emoji(status_key)
+                st.subheader(f"{status_emoji} {status_key.replace('_', ' ').title()} ({len(status_todos)})")
+                for todo in status_todos:
+                    display_note_card(todo, show_archive_controls=True)
+    else:
+        for note in window:
+            display_note_card(note, show_archive_controls=True)
+    
+    previous_col, next_col = st.columns(2)
+    with previous_col:
+        if start > 0:
+            st.button("◀ Previous", key=f"previous_{list_key}", use_container_width=True,
+                      on_click=move_window, args=(list_key, start - CARDS_PER_WINDOW, False))
+    with next_col:
+        next_start = start + CARDS_PER_WINDOW
+        if next_start < len(notes) or has_more:
+            st.button("Next ▶", key=f"next_{list_key}", use_container_width=True,
+                      on_click=move_window, args=(list_key, next_start, next_start + CARDS_PER_WINDOW > len(notes) and has_more))
+
+def display_note_table(list_key, notes):
+    rows = [{
+        "Select": False,
+        "Title": f"{'✅' if note.get('note_type') == 'todo' else '📝'} {note['title']}",
+        "Status": note.get("todo_status", "").replace("_", " ") if note.get("note_type") == "todo" else "",
+        "Priority": f"{get_priority_emoji(note.get('priority', 'medium'))} {note.get('priority', 'medium')}",
+        "Due": (note.get("due_date") or "")[:10],
+        "Categories": ", ".join(cat["name"] for cat in note.get("categories", [])),
+        "Created": note["created_at"][:16].replace("T", " ")
+    } for note in notes]
+    version = st.session_state.get("table_versions", {}).get(list_key, 0)
+    edited = st.data_editor(
+        pd.DataFrame(rows),
+        column_config={"Select": st.column_config.CheckboxColumn("", default=False)},
+        disabled=[column for column in rows[0] if column != "Select"],
+        hide_index=True,
+        use_container_width=True,
+        key=f"table_{list_key}_{version}"
+    )
+    selected = [notes[i] for i in edited.index[edited["Select"]]]
+    if not selected:
+        st.caption("Select rows to archive, complete or delete them together.")
+        return
+    
+    archive_col, complete_col, delete_col = st.columns(3)
+    with archive_col:
+        archived = [note for note in selected if note["is_archived"]]
+        if archived:
+            st.button(f"📤 Unarchive ({len(archived)})", key=f"bulk_unarchive_{list_key}", use_container_width=True,
+                      on_click=apply_to_selected, args=(list_key, [
+                          (note, {"is_archived": False}, lambda id=note["id"]: NotesAPI.unarchive_note(id)) for note in archived
+                      ], "Unarchived"))
+        else:
+            st.button(f"📥 Archive ({len(selected)})", key=f"bulk_archive_{list_key}", use_container_width=True,
+                      on_click=apply_to_selected, args=(list_key, [
+                          (note, {"is_archived": True}, lambda id=note["id"]: NotesAPI.archive_note(id)) for note in selected
+                      ], "Archived"))
+    with complete_col:
+        open_todos = [note for note in selected if note.get("note_type") == "todo" and note.get("todo_status") != "completed"]
+        if open_todos:
+            st.button(f"✅ Complete ({len(open_todos)})", key=f"bulk_complete_{list_key}", use_container_width=True,
+                      on_click=apply_to_selected, args=(list_key, [
+                          (note, {"todo_status": "completed"}, lambda id=note["id"]: NotesAPI.update_todo_status(id, "completed"))
+                          for note in open_todos
+                      ], "Completed"))
+    with delete_col:
+        st.button(f"🗑️ Delete ({len(selected)})", key=f"bulk_delete_{list_key}", use_container_width=True,
+                  on_click=apply_to_selected, args=(list_key, [
+                      (note, None, lambda id=note["id"]: NotesAPI.delete_note(id)) for note in selected
+                  ], "Deleted"))
 
 # UI Functions
 def get_priority_emoji(priority):
@@ -198,20 +534,17 @@ def display_note_card(note, show_archive_controls=True):
                 # Quick status toggle for todos
                 current_status = note.get("todo_status", "pending")
                 if current_status == "pending":
-                    if st.button("▶️", key=f"start_{note['id']}", help="Start task"):
-                        if NotesAPI.update_todo_status(note["id"], "in_progress"):
-                            st.success("Task started!")
-                            st.rerun()
+                    st.button("▶️", key=f"start_{note['id']}", help="Start task", on_click=apply_change, args=(
+                        note, {"todo_status": "in_progress"}, lambda: NotesAPI.update_todo_status(note["id"], "in_progress"), "Task started!"
+                    ))
                 elif current_status == "in_progress":
-                    if st.button("✅", key=f"complete_{note['id']}", help="Complete task"):
-                        if NotesAPI.update_todo_status(note["id"], "completed"):
-                            st.success("Task completed!")
-                            st.rerun()
+                    st.button("✅", key=f"complete_{note['id']}", help="Complete task", on_click=apply_change, args=(
+                        note, {"todo_status": "completed"}, lambda: NotesAPI.update_todo_status(note["id"], "completed"), "Task completed!"
+                    ))
                 elif current_status == "completed":
-                    if st.button("↩️", key=f"reopen_{note['id']}", help="Reopen task"):
-                        if NotesAPI.update_todo_status(note["id"], "pending"):
-                            st.success("Task reopened!")
-                            st.rerun()
+                    st.button("↩️", key=f"reopen_{note['id']}", help="Reopen task", on_click=apply_change, args=(
+                        note, {"todo_status": "pending"}, lambda: NotesAPI.update_todo_status(note["id"], "pending"), "Task reopened!"
+                    ))
         
         with col3:
             if st.button("✏️", key=f"edit_{note['id']}", help="Edit"):
@@ -223,21 +556,18 @@ def display_note_card(note, show_archive_controls=True):
             with col4a:
                 if show_archive_controls:
                     if note["is_archived"]:
-                        if st.button("📤", key=f"unarchive_{note['id']}", help="Unarchive"):
-                            if NotesAPI.unarchive_note(note["id"]):
-                                st.success("Unarchived!")
-                                st.rerun()
+                        st.button("📤", key=f"unarchive_{note['id']}", help="Unarchive", on_click=apply_change, args=(
+                            note, {"is_archived": False}, lambda: NotesAPI.unarchive_note(note["id"]), "Unarchived!"
+                        ))
                     else:
-                        if st.button("📥", key=f"archive_{note['id']}", help="Archive"):
-                            if NotesAPI.archive_note(note["id"]):
-                                st.success("Archived!")
-                                st.rerun()
+                        st.button("📥", key=f"archive_{note['id']}", help="Archive", on_click=apply_change, args=(
+                            note, {"is_archived": True}, lambda: NotesAPI.archive_note(note["id"]), "Archived!"
+                        ))
             
             with col4b:
-                if st.button("🗑️", key=f"delete_{note['id']}", help="Delete"):
-                    if NotesAPI.delete_note(note["id"]):
-                        st.success("Deleted!")
-                        st.rerun()
+                st.button("🗑️", key=f"delete_{note['id']}", help="Delete", on_click=apply_change, args=(
+                    note, None, lambda: NotesAPI.delete_note(note["id"]), "Deleted!"
+                ))
         
         st.divider()
 
@@ -278,6 +608,7 @@ def create_note_form():
             if title and content:
                 if NotesAPI.create_note(title, content, note_type, priority, due_date, category_ids):
                     st.success(f"{'Todo' if note_type == 'todo' else 'Note'} created successfully!")
+                    drop_held_pages()
                     st.rerun()
                 else:
                     st.error("Failed to create item")
@@ -337,6 +668,7 @@ def edit_note_form(note):
                 if title and content:
                     if NotesAPI.update_note(note["id"], title, content, note_type, priority, due_date, category_ids):
                         st.success(f"{type_label} updated successfully!")
+                        drop_held_pages()
                         del st.session_state.editing_note
                         st.rerun()
                     else:
@@ -385,6 +717,7 @@ def manage_categories():
                 if st.button("🗑️", key=f"delete_cat_{category['id']}"):
                     if NotesAPI.delete_category(category["id"]):
                         st.success("Category deleted!")
+                        drop_held_pages()
                         st.rerun()
     else:
         st.info("No categories yet. Create your first category above!")
@@ -418,26 +751,14 @@ def display_todos():
     status = None if status_filter == "all" else status_filter
     priority = None if priority_filter == "all" else priority_filter
     
-    todos_data = NotesAPI.get_todos(status=status, priority=priority, category_ids=filter_category_ids)
-    
-    if todos_data and todos_data.get("notes"):
-        st.info(f"Showing {len(todos_data['notes'])} of {todos_data['total']} todos")
-        
-        # Group todos by status for better organization
-        todos_by_status = {"pending": [], "in_progress": [], "completed": []}
-        for todo in todos_data["notes"]:
-            status_key = todo.get("todo_status", "pending")
-            todos_by_status[status_key].append(todo)
-        
-        # Display todos by status
-        for status_key, status_todos in todos_by_status.items():
-            if status_todos:
-                status_emoji = get_status_emoji(status_key)
-                st.subheader(f"{status_emoji} {status_key.replace('_', ' ').title()} ({len(status_todos)})")
-                for todo in status_todos:
-                    display_note_card(todo, show_archive_controls=True)
-    else:
-        st.info("No todos found. Create your first todo!")
+    display_note_list(
+        f"todos:{status}:{priority}:{filter_category_ids}",
+        NotesAPI.get_todos(status=status, priority=priority, category_ids=filter_category_ids),
+        lambda cursor: NotesAPI.get_todos(status=status, priority=priority, category_ids=filter_category_ids, cursor=cursor),
+        "todos",
+        "No todos found. Create your first todo!",
+        group_by_status=True
+    )
 
 def search_interface():
     st.header("🔍 Search Notes & Todos")
@@ -448,6 +769,7 @@ def search_interface():
         col1, col2 = st.columns(2)
         with col1:
             include_archived = st.checkbox("Include archived items")
+            fuzzy = st.checkbox("Typo-tolerant matching")
         
         with col2:
             categories = NotesAPI.get_categories()
@@ -463,25 +785,36 @@ def search_interface():
         
         if st.form_submit_button("Search", use_container_width=True):
             if search_term:
-                results = NotesAPI.search_notes(search_term, include_archived, filter_category_ids)
-                
-                if results:
-                    st.success(f"Found {len(results)} results for '{search_term}'")
-                    for result in results:
-                        display_note_card(result, show_archive_controls=True)
-                else:
-                    st.info(f"No results found for '{search_term}'")
+                # Kept across reruns so loading more results does not need the form resubmitted
+                st.session_state.search = (search_term, include_archived, filter_category_ids, fuzzy)
             else:
+                st.session_state.pop("search", None)
                 st.error("Please enter a search term")
+    
+    if "search" in st.session_state:
+        search_term, include_archived, filter_category_ids, fuzzy = st.session_state.search
+        results = NotesAPI.search_notes(search_term, include_archived, filter_category_ids, fuzzy=fuzzy)
+        if results and results.get("notes"):
+            st.success(f"Found {results['total']} results for '{search_term}'")
+        display_note_list(
+            f"search:{st.session_state.search}",
+            results,
+            lambda cursor: NotesAPI.search_notes(search_term, include_archived, filter_category_ids, fuzzy=fuzzy, cursor=cursor),
+            "results",
+            f"No results found for '{search_term}'"
+        )
 
 # Main App
 def main():
+    started = time.perf_counter()
     st.title("📝 Notes App")
     st.markdown("---")
     
     # Initialize session state
     if "editing_note" not in st.session_state:
         st.session_state.editing_note = None
+    if "flash_error" in st.session_state:
+        st.error(st.session_state.pop("flash_error"))
     
     # Sidebar
     with st.sidebar:
@@ -494,9 +827,24 @@ def main():
             "➕ Create New", 
             "🏷️ Categories"
         ])
+        st.button("🔄 Refresh", help="Reload everything from the server", on_click=refresh_all, use_container_width=True)
+        
+        # Fetch what this render needs in parallel: categories, the Quick Stats counts and,
+        # for the note lists, the page itself (the filter widget's state is set before it renders)
+        list_archived = {"📋 Active Notes": False, "📦 Archived Items": True}.get(view)
+        calls = {
+            "categories": NotesAPI.get_categories,
+            "active_notes": lambda: NotesAPI.get_notes(archived=False, page_size=1),
+            "todos": lambda: NotesAPI.get_todos(page_size=1),
+            "archived_notes": lambda: NotesAPI.get_notes(archived=True, page_size=1)
+        }
+        prefetched_category_ids = [cat[0] for cat in st.session_state.get("category_filter") or []] or None
+        if list_archived is not None and not st.session_state.editing_note:
+            calls["notes"] = lambda: NotesAPI.get_notes(archived=list_archived, category_ids=prefetched_category_ids)
+        fetched = NotesAPI.fetch_all(calls)
         
         # Category filter for relevant views
-        categories = NotesAPI.get_categories()
+        categories = fetched["categories"]
         if categories and view in ["📋 Active Notes", "📦 Archived Items"]:
             st.markdown("---")
             st.subheader("Filter by Category")
@@ -514,9 +862,9 @@ def main():
         st.markdown("---")
         st.subheader("📊 Quick Stats")
         try:
-            active_notes = NotesAPI.get_notes(archived=False, page_size=1)
-            todos_data = NotesAPI.get_todos(page_size=1)
-            archived_notes = NotesAPI.get_notes(archived=True, page_size=1)
+            active_notes = fetched["active_notes"]
+            todos_data = fetched["todos"]
+            archived_notes = fetched["archived_notes"]
             
             if active_notes:
                 st.metric("Active Notes", active_notes.get('total', 0))
@@ -527,31 +875,37 @@ def main():
         except:
             st.caption("Stats unavailable")
     
+    def list_notes(archived):
+        # The prefetched page is only valid if the filter widget kept the selection it was fetched with
+        if "notes" in fetched and prefetched_category_ids == filter_category_ids:
+            return fetched["notes"]
+        return NotesAPI.get_notes(archived=archived, category_ids=filter_category_ids)
+    
     # Main content
     if st.session_state.editing_note:
         edit_note_form(st.session_state.editing_note)
     elif view == "📋 Active Notes":
         st.header("📋 Active Notes")
-        notes_data = NotesAPI.get_notes(archived=False, category_ids=filter_category_ids)
-        if notes_data and notes_data.get("notes"):
-            st.info(f"Showing {len(notes_data['notes'])} of {notes_data['total']} active notes")
-            for note in notes_data["notes"]:
-                display_note_card(note, show_archive_controls=True)
-        else:
-            st.info("No active notes found. Create your first note!")
+        display_note_list(
+            f"active:{filter_category_ids}",
+            list_notes(archived=False),
+            lambda cursor: NotesAPI.get_notes(archived=False, category_ids=filter_category_ids, cursor=cursor),
+            "active notes",
+            "No active notes found. Create your first note!"
+        )
     
     elif view == "✅ Todo List":
         display_todos()
     
     elif view == "📦 Archived Items":
         st.header("📦 Archived Items")
-        notes_data = NotesAPI.get_notes(archived=True, category_ids=filter_category_ids)
-        if notes_data and notes_data.get("notes"):
-            st.info(f"Showing {len(notes_data['notes'])} of {notes_data['total']} archived items")
-            for note in notes_data["notes"]:
-                display_note_card(note, show_archive_controls=True)
-        else:
-            st.info("No archived items found.")
+        display_note_list(
+            f"archived:{filter_category_ids}",
+            list_notes(archived=True),
+            lambda cursor: NotesAPI.get_notes(archived=True, category_ids=filter_category_ids, cursor=cursor),
+            "archived items",
+            "No archived items found."
+        )
     
     elif view == "🔍 Search":
         search_interface()
@@ -561,6 +915,9 @@ def main():
     
     elif view == "🏷️ Categories":
         manage_categories()
+    
+    logger.info("Rendered %s in %.0f ms", view, (time.perf_counter() - started) * 1000)
+    settle_changes()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file